@@ -1,10 +1,29 @@
+import time
+_script_started = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, timedelta
-import random
+from datetime import timedelta
+import copy
+import json
+import os
+
+# Modules du démarrage seulement ; ceux d'un onglet sont importés par ses chargeurs et sa branche
+from optimisation.cache import ComputeCache, data_key, source_fingerprint
+from optimisation.generation import generate_data, generate_menu_sales
+from optimisation.kpis import RollingKPIEngine, in_service, period_kpis
+from optimisation.periods import CUSTOM_PERIOD, PERIOD_DAYS, TimeSlicer, menu_for_period, period_bounds, previous_bounds
+from optimisation.startup import StartupTimer
+
+# Copie à l'écriture : les tables du cache sont partagées entre sessions et
+# jamais modifiées ; sélections et colonnes dérivées ne copient qu'au besoin
+pd.set_option('mode.copy_on_write', True)
+
+# Chronométrage du démarrage (imports, données, premier affichage, exécution complète)
+startup_timer = StartupTimer(_script_started)
+startup_timer.mark('imports')
 
 # Configuration de la page
 st.set_page_config(
@@ -91,14 +110,14 @@ st.markdown(f"""
         margin-bottom: 0.5rem;
     }}
     
-    .stTabs [data-baseweb="tab-list"] {{
+    section.main .stRadio [role="radiogroup"] {{
         gap: 1rem;
         background-color: {COLORS['light']};
         padding: 0.5rem;
         border-radius: 12px;
     }}
     
-    .stTabs [data-baseweb="tab"] {{
+    section.main .stRadio [role="radiogroup"] label {{
         padding: 0.75rem 1.5rem;
         font-size: 0.95rem;
         font-weight: 500;
@@ -106,11 +125,11 @@ st.markdown(f"""
         color: {COLORS['text']};
     }}
     
-    .stTabs [data-baseweb="tab"]:hover {{
+    section.main .stRadio [role="radiogroup"] label:hover {{
         background-color: white;
     }}
     
-    .stTabs [aria-selected="true"] {{
+    section.main .stRadio [role="radiogroup"] label:has(input:checked) {{
         background-color: white !important;
         box-shadow: 0 2px 8px rgba(0,0,0,0.08);
         color: {COLORS['primary']} !important;
@@ -130,255 +149,545 @@ st.markdown(f"""
 </style>
 """, unsafe_allow_html=True)
 
-# Génération de données fictives réalistes
-@st.cache_data
-def generate_data():
-    dates = pd.date_range(end=datetime.now(), periods=90, freq='D')
-    
-    sales_data = []
-    for date in dates:
-        day_of_week = date.dayofweek
-        is_weekend = day_of_week >= 5
-        
-        # Patterns réalistes : vendredi > samedi > jeudi > dimanche > mercredi > mardi > lundi
-        day_multipliers = {
-            0: 0.75,  # Lundi (faible)
-            1: 0.80,  # Mardi
-            2: 0.90,  # Mercredi
-            3: 1.05,  # Jeudi (pré-weekend)
-            4: 1.30,  # Vendredi (fort)
-            5: 1.25,  # Samedi (fort)
-            6: 1.00   # Dimanche (moyen)
-        }
-        
-        base_revenue = 2000 * day_multipliers[day_of_week]
-        revenue = base_revenue + np.random.normal(0, 150)
-        
-        # Ticket moyen réaliste entre 45-65$
-        avg_ticket = np.random.uniform(48, 58)
-        covers = int(revenue / avg_ticket)
-        
-        # Calcul des coûts réalistes
-        food_cost_pct = np.random.uniform(0.28, 0.32)  # 28-32% food cost
-        labor_cost_pct = np.random.uniform(0.30, 0.35)  # 30-35% labor cost
-        
-        food_cost = revenue * food_cost_pct
-        labor_cost = revenue * labor_cost_pct
-        other_costs = revenue * 0.15  # Autres coûts fixes
-        
-        sales_data.append({
-            'date': date,
-            'revenue': max(0, revenue),
-            'covers': max(0, covers),
-            'avg_ticket': avg_ticket,
-            'day_of_week': date.strftime('%A'),
-            'food_cost': food_cost,
-            'labor_cost': labor_cost,
-            'other_costs': other_costs,
-            'total_costs': food_cost + labor_cost + other_costs,
-            'gross_profit': revenue - (food_cost + labor_cost + other_costs)
-        })
-    
-    df_sales = pd.DataFrame(sales_data)
-    
-    # Données horaires réalistes avec rush du midi et du soir
-    hours = list(range(11, 23))
-    hourly_data = []
-    for hour in hours:
-        # Lunch rush: 11h30-13h30 avec pic à 12h30
-        if hour == 11:
-            covers = np.random.randint(15, 25)
-        elif hour == 12:
-            covers = np.random.randint(45, 60)  # Peak lunch
-        elif hour == 13:
-            covers = np.random.randint(35, 50)
-        elif hour == 14:
-            covers = np.random.randint(10, 20)
-        # Creux de l'après-midi
-        elif 15 <= hour <= 17:
-            covers = np.random.randint(5, 15)
-        # Dinner rush: 18h-21h avec pic à 19h-20h
-        elif hour == 18:
-            covers = np.random.randint(35, 50)
-        elif hour == 19:
-            covers = np.random.randint(65, 85)  # Peak dinner
-        elif hour == 20:
-            covers = np.random.randint(55, 75)
-        elif hour == 21:
-            covers = np.random.randint(30, 45)
-        else:
-            covers = np.random.randint(10, 20)
-        
-        # Ticket moyen légèrement plus élevé le soir
-        ticket_multiplier = 1.15 if hour >= 18 else 1.0
-        avg_ticket = np.random.uniform(48, 58) * ticket_multiplier
-        
-        hourly_data.append({
-            'hour': f"{hour}h-{hour+1}h",
-            'hour_num': hour,
-            'covers': covers,
-            'revenue': covers * avg_ticket,
-            'avg_ticket': avg_ticket
-        })
-    
-    df_hourly = pd.DataFrame(hourly_data)
-    
-    # Menu items avec catégories et marges réalistes
-    menu_items = [
-        # Entrées (marge élevée)
-        {'name': 'Salade César', 'category': 'Entrées', 'qty': 420, 'price': 17, 'cost': 3.80, 'revenue': 7140, 'margin': 78},
-        {'name': 'Soupe du jour', 'category': 'Entrées', 'qty': 280, 'price': 9, 'cost': 1.80, 'revenue': 2520, 'margin': 80},
-        
-        # Plats principaux (marge moyenne)
-        {'name': 'Steak-Frites', 'category': 'Viandes', 'qty': 760, 'price': 30, 'cost': 13.50, 'revenue': 22800, 'margin': 55},
-        {'name': 'Saumon Atlantique', 'category': 'Poissons', 'qty': 540, 'price': 35, 'cost': 16.80, 'revenue': 18900, 'margin': 52},
-        {'name': 'Poulet Rôti', 'category': 'Viandes', 'qty': 350, 'price': 22, 'cost': 7.70, 'revenue': 7700, 'margin': 65},
-        
-        # Pâtes et pizzas (marge très élevée)
-        {'name': 'Pâtes Carbonara', 'category': 'Pâtes', 'qty': 890, 'price': 20, 'cost': 5.60, 'revenue': 17800, 'margin': 72},
-        {'name': 'Pizza Margherita', 'category': 'Pizzas', 'qty': 470, 'price': 18, 'cost': 4.50, 'revenue': 8460, 'margin': 75},
-        {'name': 'Risotto Champignons', 'category': 'Pâtes', 'qty': 380, 'price': 22, 'cost': 6.60, 'revenue': 8360, 'margin': 70},
-        
-        # Burgers (marge bonne)
-        {'name': 'Burger Signature', 'category': 'Burgers', 'qty': 680, 'price': 20, 'cost': 6.40, 'revenue': 13600, 'margin': 68},
-    ]
-    
-    df_menu = pd.DataFrame(menu_items)
-    df_menu['food_cost_pct'] = (df_menu['cost'] / df_menu['price'] * 100).round(1)
-    
-    future_dates = pd.date_range(start=datetime.now() + timedelta(days=1), periods=30, freq='D')
-    forecast_data = []
-    for date in future_dates:
-        day_of_week = date.dayofweek
-        is_weekend = day_of_week >= 5
-        
-        base_revenue = 2700 if is_weekend else 1950
-        revenue = base_revenue + np.random.normal(0, 200)
-        
-        forecast_data.append({
-            'date': date,
-            'predicted_revenue': max(0, revenue),
-            'confidence_lower': revenue * 0.9,
-            'confidence_upper': revenue * 1.1
-        })
-    
-    df_forecast = pd.DataFrame(forecast_data)
-    
-    # Prévision prochaine journée (en heures)
-    next_day_hours = []
-    for hour in range(11, 23):
-        if 12 <= hour <= 14:
-            base_covers = 42
-        elif 18 <= hour <= 21:
-            base_covers = 58
-        else:
-            base_covers = 18
-        
-        covers = base_covers + np.random.randint(-5, 5)
-        next_day_hours.append({
-            'hour': hour,
-            'hour_label': f"{hour}h",
-            'predicted_covers': max(0, covers)
-        })
-    
-    df_next_day = pd.DataFrame(next_day_hours)
-    
-    # Prévision 7 prochains jours
-    next_7_days = []
-    for i in range(1, 8):
-        date = datetime.now() + timedelta(days=i)
-        day_of_week = date.weekday()
-        is_weekend = day_of_week >= 5
-        
-        base_covers = 85 if is_weekend else 65
-        covers = base_covers + np.random.randint(-8, 8)
-        
-        next_7_days.append({
-            'date': date,
-            'day_name': date.strftime('%A'),
-            'day_short': date.strftime('%a %d'),
-            'predicted_covers': max(0, covers)
-        })
-    
-    df_next_7_days = pd.DataFrame(next_7_days)
-    
-    # Prévision 3 prochains mois
-    next_3_months = []
-    for i in range(1, 4):
-        date = datetime.now() + timedelta(days=30*i)
-        month_name = date.strftime('%B')
-        
-        base_covers_month = 2100 + (i * 120)
-        covers = base_covers_month + np.random.randint(-100, 100)
-        
-        next_3_months.append({
-            'month': month_name,
-            'month_short': date.strftime('%b'),
-            'predicted_covers': max(0, covers)
-        })
-    
-    df_next_3_months = pd.DataFrame(next_3_months)
-    
-    staff_data = {
-        'position': ['Serveurs', 'Cuisiniers', 'Aide-cuisine', 'Plongeurs', 'Bar', 'Gérance'],
-        'headcount': [8, 6, 4, 2, 2, 2],
-        'avg_hourly_rate': [15, 24, 16, 15, 18, 40],
-        'weekly_hours': [320, 240, 180, 80, 90, 80],  # Heures par semaine
-        'productive_pct': [85, 90, 85, 80, 85, 70]  # % temps productif
-    }
-    df_staff = pd.DataFrame(staff_data)
-    df_staff['monthly_hours'] = df_staff['weekly_hours'] * 4.33  # Moyenne mois
-    df_staff['monthly_cost'] = (df_staff['avg_hourly_rate'] * df_staff['monthly_hours']).round(0)
-    df_staff['productive_hours'] = (df_staff['monthly_hours'] * df_staff['productive_pct'] / 100).round(0)
-    
-    # Calcul du RevPASH (Revenue Per Available Seat Hour) - métrique clé en restauration
-    total_seats = 80
-    hours_open_per_day = 12
-    days_per_month = 30
-    available_seat_hours = total_seats * hours_open_per_day * days_per_month
-    monthly_revenue = df_sales['revenue'].tail(30).sum()
-    revpash = monthly_revenue / available_seat_hours
-    
-    return df_sales, df_hourly, df_menu, df_forecast, df_staff, df_next_day, df_next_7_days, df_next_3_months, revpash
-
-df_sales, df_hourly, df_menu, df_forecast, df_staff, df_next_day, df_next_7_days, df_next_3_months, revpash = generate_data()
+# Génération de données fictives réalistes (reproductibles grâce à une graine fixe)
+DEMO_SEED = 42
+
+# Export de tickets POS réel (CSV ou Parquet) : remplace les ventes, heures et menu simulés
+TICKETS_PATH = os.environ.get('OPTIMISATION_TICKETS')
+LOCATION = os.environ.get('OPTIMISATION_LOCATION')
+
+# Magasin de prévisions produit la nuit par `python -m optimisation.batch`
+FORECASTS_PATH = os.environ.get('OPTIMISATION_FORECASTS')
+
+# Écart à la journée moyenne (%) au-delà duquel une journée prévue est signalée (affluence ou creux)
+AFFLUENCE_ALERT_PCT = 15
+
+# Cache des calculs partagé par les sessions : borné en entrées et en mémoire, durée de vie optionnelle
+@st.cache_resource
+def get_compute_cache():
+    ttl = os.environ.get('OPTIMISATION_CACHE_TTL')
+    return ComputeCache(
+        max_entries=int(os.environ.get('OPTIMISATION_CACHE_ENTRIES', 64)),
+        max_bytes=int(os.environ.get('OPTIMISATION_CACHE_MB', 512)) * 2**20,
+        ttl=float(ttl) if ttl else None,
+    )
+
+compute_cache = get_compute_cache()
+
+# Empreinte de la source : une nouvelle ingestion invalide tous les résultats dérivés
+DATA_VERSION = source_fingerprint(TICKETS_PATH, DEMO_SEED)
+
+@compute_cache.memoize
+def load_data(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    data = generate_data(days=90, locations=1, seats=80, seed=DEMO_SEED)
+    if not tickets_path:
+        df_menu_sales = generate_menu_sales(days=90, locations=1, seats=80, seed=DEMO_SEED)
+        return data + (df_menu_sales,)
+    
+    from optimisation.ingestion import TicketAggregator, read_ticket_chunks
+    
+    aggregator = TicketAggregator(location=location)
+    for chunk in read_ticket_chunks(tickets_path):
+        aggregator.update(chunk)
+    df_sales, df_hourly, df_menu = aggregator.frames()
+    df_menu_sales = aggregator.menu_sales()
+    
+    # Un seul établissement affiché : le premier de l'export si aucun n'est choisi
+    if location is None:
+        location = df_sales['location'].cat.categories[0]
+        df_sales = df_sales[df_sales['location'] == location].reset_index(drop=True)
+        df_hourly = df_hourly[df_hourly['location'] == location].reset_index(drop=True)
+        df_menu = df_menu[df_menu['location'] == location].reset_index(drop=True)
+        df_menu_sales = df_menu_sales[df_menu_sales['location'] == location].reset_index(drop=True)
+    
+    df_forecast, df_staff, df_next_day, df_next_7_days, df_next_3_months, revpash = data[3:]
+    return df_sales, df_hourly, df_menu, df_forecast, df_staff, df_next_day, df_next_7_days, df_next_3_months, revpash, df_menu_sales
+
+df_sales, df_hourly, df_menu, df_forecast, df_staff, df_next_day, df_next_7_days, df_next_3_months, revpash, df_menu_sales = load_data()
+
+# Cube d'agrégats (date × heure × catégorie × canal × établissement), construit une fois par chargement
+@compute_cache.memoize
+def load_cube(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.cube import AggregateCube
+    data = load_data(data_version, tickets_path, location)
+    return AggregateCube.from_frames(data[0], data[1], data[-1])
+
+cube = load_cube()
+
+# Tables datées triées une fois : chaque période se découpe par recherche binaire
+@compute_cache.memoize
+def load_slicers(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    data = load_data(data_version, tickets_path, location)
+    return TimeSlicer(data[0]), TimeSlicer(data[1])
+
+sales_slicer, hourly_slicer = load_slicers()
+
+# Moteur de KPIs sur fenêtres glissantes, un par version des données. À l'arrivée de nouveaux jours,
+# le moteur de la version précédente est copié puis prolongé jour par jour (append_day) si
+# l'historique qu'il a intégré est inchangé ; un historique corrigé ou complété le reconstruit
+@compute_cache.memoize
+def load_kpi_engine(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    df_sales, df_hourly = load_data(data_version, tickets_path, location)[:2]
+    latest_key = ('kpi_engine_latest', tickets_path, location)
+
+    found, latest = compute_cache.get(latest_key)
+    engine = None
+    if found:
+        previous, history = latest
+        known_sales = df_sales[df_sales['date'] <= previous.last_date]
+        known_hourly = df_hourly[df_hourly['date'] <= previous.last_date]
+        if data_key(known_sales, known_hourly) == history:
+            engine = copy.deepcopy(previous).update(df_sales, df_hourly)
+    if engine is None:
+        engine = RollingKPIEngine.from_frames(df_sales, df_hourly)
+
+    compute_cache.put(latest_key, (engine, data_key(df_sales, df_hourly)))
+    return engine
 
 # Calcul des KPIs essentiels de restaurant
-def calculate_restaurant_kpis(df_sales, df_staff):
-    # Prime Cost (Food + Labor) - doit être < 60% idéalement
-    recent_revenue = df_sales['revenue'].tail(30).sum()
-    recent_food_cost = df_sales['food_cost'].tail(30).sum()
-    recent_labor_cost = df_staff['monthly_cost'].sum()
-    prime_cost = recent_food_cost + recent_labor_cost
-    prime_cost_pct = (prime_cost / recent_revenue * 100) if recent_revenue > 0 else 0
-    
-    # Table Turn Rate (rotation des tables) - cible 1.5-2.5 par service
-    avg_daily_covers = df_sales['covers'].tail(30).mean()
-    total_seats = 80
-    lunch_turns = (df_hourly[df_hourly['hour_num'].between(11, 15)]['covers'].sum() / total_seats)
-    dinner_turns = (df_hourly[df_hourly['hour_num'].between(18, 22)]['covers'].sum() / total_seats)
-    
-    # Seat Occupancy (taux d'occupation) - cible 65-75%
-    hours_open_per_day = 12
-    max_possible_covers = total_seats * hours_open_per_day
-    seat_occupancy = (avg_daily_covers / max_possible_covers * 100) if max_possible_covers > 0 else 0
-    
-    # Break-even covers
-    total_monthly_costs = df_sales['total_costs'].tail(30).sum()
-    avg_contribution_margin = df_sales['avg_ticket'].mean() * 0.60  # 60% contribution
-    break_even_covers_daily = (total_monthly_costs / 30) / avg_contribution_margin if avg_contribution_margin > 0 else 0
-    
-    return {
-        'prime_cost_pct': prime_cost_pct,
-        'lunch_turns': lunch_turns,
-        'dinner_turns': dinner_turns,
-        'seat_occupancy': seat_occupancy,
-        'break_even_covers': break_even_covers_daily,
-        'recent_revenue': recent_revenue,
-        'recent_profit': df_sales['gross_profit'].tail(30).sum()
-    }
-
-kpis = calculate_restaurant_kpis(df_sales, df_staff)
+def calculate_restaurant_kpis(engine):
+    return engine.kpis()
+
+live_kpis = calculate_restaurant_kpis(load_kpi_engine())
+
+# Prévisions de revenus ajustées sur l'historique : un modèle ajusté par version des données,
+# jamais modifié hors de cette fonction
+@compute_cache.memoize
+def load_forecaster(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.forecast import RevenueForecaster
+    return RevenueForecaster().fit(load_data(data_version, tickets_path, location)[0])
+
+# Magasin de prévisions de nuit, lu pour l'établissement affiché (clé : date du manifeste)
+@compute_cache.memoize
+def load_stored_forecasts(forecasts_path, location, manifest_version):
+    from optimisation.batch import read_forecasts
+    return read_forecasts(forecasts_path, location)
+
+# Backtest à origine glissante : précision affichée et comparaison des modèles
+@compute_cache.memoize
+def load_backtest(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.backtest import backtest, summarize
+    folds, scores = backtest(load_data(data_version, tickets_path, location)[0])
+    return summarize(folds, scores)
+
+# Profils jour de semaine × heure, construits une fois par version des données
+@compute_cache.memoize
+def load_demand_profiles(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.profiles import DemandProfiles
+    return DemandProfiles().update(load_data(data_version, tickets_path, location)[1])
+
+# Plan d'effectifs de la semaine à venir pour les hypothèses choisies (productivité, affluence, quart minimal)
+@compute_cache.memoize
+def load_staffing_plan(data_version, server_covers, demand_pct, min_paid_hours, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.staffing import COVERS_PER_HOUR, plan_staffing, staffing_summary, week_forecast
+    data = load_data(data_version, tickets_path, location)
+    forecast = week_forecast(load_demand_profiles(data_version, tickets_path, location))
+    forecast['predicted_covers'] = forecast['predicted_covers'] * demand_pct / 100
+    plan, shifts = plan_staffing(forecast, data[4], covers_per_hour={**COVERS_PER_HOUR, 'Serveurs': server_covers},
+                                 min_paid_hours=min_paid_hours)
+    return plan, shifts, staffing_summary(plan, shifts, data[4], days=7)
+
+# Dérivations d'une période (tranches, KPIs, carte) : calculées une fois par période et version des données
+@compute_cache.memoize
+def load_period(data_version, period_start, period_end, tickets_path=TICKETS_PATH, location=LOCATION):
+    data = load_data(data_version, tickets_path, location)
+    sales_slicer, hourly_slicer = load_slicers(data_version, tickets_path, location)
+    prev_start, prev_end = previous_bounds(period_start, period_end)
+
+    period_sales = sales_slicer.slice(period_start, period_end)
+    period_hourly = hourly_slicer.slice(period_start, period_end)
+    prev_sales = sales_slicer.slice(prev_start, prev_end)
+    kpis = period_kpis(period_sales, period_hourly, previous_sales=prev_sales)
+    menu = menu_for_period(load_cube(data_version, tickets_path, location), data[2], period_start, period_end)
+    return period_sales, period_hourly, prev_sales, kpis, menu
+
+# Classification de la carte de la période selon les seuils choisis
+@compute_cache.memoize
+def load_menu_classes(data_version, period_start, period_end, threshold_choice, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.menu import THRESHOLD_GROUPS, class_summary, classify_menu
+    menu = load_period(data_version, period_start, period_end, tickets_path, location)[-1]
+    menu = classify_menu(menu, by=THRESHOLD_GROUPS[threshold_choice])
+    return menu, class_summary(menu)
+
+# Meilleure variation de prix de chaque plat Populaire (Monte Carlo, tirages reproductibles)
+@compute_cache.memoize
+def load_price_opportunities(data_version, period_start, period_end, threshold_choice, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.pricing import best_prices, simulate_prices
+    menu = load_menu_classes(data_version, period_start, period_end, threshold_choice, tickets_path, location)[0]
+    populaires = menu[menu['classification'] == 'Populaire'].reset_index(drop=True)
+    if populaires.empty:
+        return populaires, None
+    best = best_prices(populaires, seed=DEMO_SEED)
+    # Ensemble des nouveaux prix simulé comme un seul scénario (mêmes tirages) : bande du total
+    total = simulate_prices(populaires, best['best_change'].to_numpy()[None, :], seed=DEMO_SEED).iloc[0]
+    return best, total
+
+# Grille de variations de prix appliquées à une partie de la carte : tous les pas du curseur
+# sont simulés d'un coup, le déplacer ne fait que choisir une ligne
+@compute_cache.memoize
+def load_price_simulation(data_version, period_start, period_end, threshold_choice, scope, sensitivity,
+                          tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.pricing import PRICE_STEPS, price_changes, scaled_elasticity, simulate_prices
+    menu = load_menu_classes(data_version, period_start, period_end, threshold_choice, tickets_path, location)[0]
+    if scope == 'Toute la carte':
+        selected = None
+    elif scope == 'Plats populaires':
+        selected = (menu['classification'] == 'Populaire').to_numpy()
+    else:
+        selected = [scope]
+    grid = simulate_prices(
+        menu, price_changes(menu, PRICE_STEPS, selected), elasticity=scaled_elasticity(sensitivity), seed=DEMO_SEED
+    )
+    grid.insert(0, 'change', PRICE_STEPS)
+    return grid
+
+# Grille de scénarios budgétaires autour des hypothèses de la période ; les curseurs ne font
+# que lire une tranche de la grille mise en cache
+@compute_cache.memoize
+def load_scenario_grid(data_version, period_start, period_end, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.scenarios import ScenarioGrid, baseline
+    period_sales = load_period(data_version, period_start, period_end, tickets_path, location)[0]
+    return ScenarioGrid(baseline(period_sales, load_data(data_version, tickets_path, location)[4]))
+
+# Coût de main d'œuvre heure par heure tiré des pointages, joint aux ventes horaires ; en démonstration,
+# les pointages sont simulés à partir du plan d'effectifs calé sur les couverts réels
+@compute_cache.memoize
+def load_labor(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.generation import generate_punches
+    from optimisation.labor import hourly_labor, labor_efficiency
+    from optimisation.staffing import plan_staffing
+    _, df_hourly, _, _, df_staff = load_data(data_version, tickets_path, location)[:5]
+    covers = df_hourly[['date', 'location', 'hour_num', 'covers']].rename(columns={'hour_num': 'hour', 'covers': 'predicted_covers'})
+    punches = generate_punches(plan_staffing(covers, df_staff)[1], df_staff, seed=DEMO_SEED)
+    return TimeSlicer(labor_efficiency(hourly_labor(punches), df_hourly))
+
+# Consommation théorique d'ingrédients (recettes × ventes de plats) et journal d'inventaire ;
+# en démonstration, réceptions, pertes et comptages sont simulés à partir de la consommation
+@compute_cache.memoize
+def load_inventory(data_version=DATA_VERSION, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.generation import generate_inventory_events
+    from optimisation.inventory import INGREDIENTS, RecipeMatrix, reorder_alerts
+    from optimisation.ledger import InventoryLedger
+    daily_usage = RecipeMatrix.from_recipes().usage(load_data(data_version, tickets_path, location)[-1])
+    ledger = InventoryLedger().append(generate_inventory_events(daily_usage, INGREDIENTS, seed=DEMO_SEED))
+    return TimeSlicer(daily_usage), ledger, reorder_alerts(daily_usage, ledger.positions())
+
+# Écart de coût matière théorique vs réel et pertes de la période, tirés du journal
+@compute_cache.memoize
+def load_inventory_period(data_version, period_start, period_end, tickets_path=TICKETS_PATH, location=LOCATION):
+    from optimisation.inventory import food_cost_variance
+    usage_slicer, ledger, _ = load_inventory(data_version, tickets_path, location)
+    variance = food_cost_variance(usage_slicer.slice(period_start, period_end), ledger.actual_usage(period_start, period_end))
+    return variance, ledger.losses(period_start, period_end)
+
+# Figures servies par le cache des calculs : clé = constructeur, empreinte des données et
+# paramètres de mise en page ; la figure est conservée sous sa forme sérialisée (listes JSON),
+# ce qui rend aussi sa transmission au navigateur bien moins coûteuse
+def cached_figure(build, *inputs, **params):
+    import plotly.io as pio
+    key = ('figure', build.__qualname__, data_key(*inputs), tuple(sorted(params.items())))
+    return compute_cache.get_or_compute(
+        key, lambda: go.Figure(json.loads(pio.to_json(build(*inputs, **params), validate=False)))
+    )
+
+# Séries longues réduites (minimum et maximum par intervalle : les pics restent visibles) ;
+# le détail revient en choisissant une période plus courte
+def downsampled_caption(points):
+    from optimisation.downsample import CHART_POINTS
+    if points > CHART_POINTS:
+        st.caption(f"Série réduite à ~{CHART_POINTS} points sur {points:,} (pics et creux conservés) – "
+                   "choisir une période plus courte pour tout le détail")
+
+def trend_figure(metric_series, name):
+    """Tendance quotidienne de la métrique choisie."""
+    from optimisation.downsample import downsample
+    metric_series = downsample(metric_series, method='minmax')
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=metric_series.index,
+        y=metric_series.values,
+        mode='lines+markers',
+        name=name,
+        line=dict(color=COLORS['primary'], width=2)
+    ))
+
+    fig.update_layout(
+        height=300,
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', size=11)
+    )
+
+    fig.update_xaxes(showgrid=False)
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
+    return fig
+
+def next_day_figure(df_next_day):
+    """Couverts prévus par heure pour la prochaine journée."""
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=df_next_day['hour_label'],
+        y=df_next_day['predicted_covers'],
+        marker_color=[
+            COLORS['success'] if 12 <= h <= 14 or 18 <= h <= 21 
+            else COLORS['primary'] 
+            for h in df_next_day['hour']
+        ],
+        text=df_next_day['predicted_covers'],
+        textposition='outside',
+        name='Couverts prévus'
+    ))
+
+    fig.update_layout(
+        height=350,
+        yaxis_title="Nombre de couverts prévus",
+        xaxis_title="Heure",
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', size=11)
+    )
+
+    fig.update_xaxes(showgrid=False, tickangle=-45)
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
+    return fig
+
+def category_figure(category_stats):
+    """Revenus par catégorie de la période."""
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=category_stats.index,
+        y=category_stats['revenue'],
+        name='Revenus',
+        marker_color=COLORS['primary'],
+        text=category_stats['revenue'].apply(lambda x: f"{x:,.0f}$"),
+        textposition='outside'
+    ))
+
+    fig.update_layout(
+        height=300,
+        yaxis_title="Revenus ($)",
+        xaxis_title="Catégorie",
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', size=11)
+    )
+    return fig
+
+def price_simulation_figure(grid, change):
+    """Écart de marge attendu selon la variation de prix, avec bande 5 %–95 %."""
+    fig = go.Figure()
+
+    x = grid['change'] * 100
+    fig.add_trace(go.Scatter(
+        x=pd.concat([x, x[::-1]]),
+        y=pd.concat([grid['margin_delta_high'], grid['margin_delta_low'][::-1]]),
+        fill='toself',
+        fillcolor='rgba(59, 130, 246, 0.15)',
+        line=dict(width=0),
+        hoverinfo='skip',
+        name='Bande 5 %–95 %'
+    ))
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=grid['margin_delta'],
+        mode='lines',
+        name='Écart de marge attendu',
+        line=dict(color=COLORS['primary'], width=3)
+    ))
+    fig.add_hline(y=0, line_color='#9ca3af', line_width=1)
+    fig.add_vline(x=change * 100, line_dash='dash', line_color=COLORS['warning'])
+
+    fig.update_layout(
+        height=300,
+        xaxis_title="Variation de prix (%)",
+        yaxis_title="Écart de marge ($)",
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', size=11),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+def labor_hourly_figure(by_position, by_hour, days):
+    """Coût de main d'œuvre moyen par heure de la journée (par poste) et % des ventes."""
+    fig = go.Figure()
+
+    for position, rows in by_position.groupby('position', observed=True):
+        fig.add_trace(go.Bar(
+            x=rows['hour_num'],
+            y=rows['labor_cost'] / days,
+            name=position
+        ))
+    fig.add_trace(go.Scatter(
+        x=by_hour['hour_num'],
+        y=by_hour['labor_pct'],
+        mode='lines+markers',
+        name='% des ventes',
+        yaxis='y2',
+        line=dict(color=COLORS['secondary'], width=3)
+    ))
+
+    fig.update_layout(
+        height=400,
+        barmode='stack',
+        xaxis=dict(title="Heure", dtick=1, ticksuffix='h'),
+        yaxis=dict(title="Coût moyen par jour ($)"),
+        yaxis2=dict(title="% des ventes", overlaying='y', side='right', showgrid=False, rangemode='tozero'),
+        hovermode='x unified',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', size=11),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+def staff_cost_figure(df_staff, height=400, font_size=11):
+    """Répartition des coûts de personnel par poste."""
+    fig = go.Figure(data=[go.Pie(
+        labels=df_staff['position'],
+        values=df_staff['monthly_cost'],
+        hole=0.4,
+        marker_colors=[COLORS['primary'], COLORS['secondary'], COLORS['accent'], COLORS['success'], COLORS['warning'], COLORS['text']]
+    )])
+
+    fig.update_layout(
+        height=height,
+        font=dict(family='Inter', size=font_size)
+    )
+    return fig
+
+def margin_donut_figure(estimated_margin, estimated_costs):
+    """Répartition des revenus entre marge nette et coûts."""
+    fig = go.Figure(data=[go.Pie(
+        labels=['Marge nette', 'Coûts opérationnels'],
+        values=[estimated_margin, estimated_costs],
+        hole=0.5,
+        marker_colors=[COLORS['success'], COLORS['warning']],
+        textinfo='label+percent',
+        textposition='outside'
+    )])
+
+    fig.update_layout(
+        height=400,
+        annotations=[dict(text=f'{(estimated_margin/(estimated_margin + estimated_costs)*100):.1f}%<br>Marge', 
+                         x=0.5, y=0.5, font_size=20, showarrow=False)],
+        font=dict(family='Inter', size=11)
+    )
+    return fig
+
+def scenario_heatmap_figure(table, metric_label, x_title, y_title, reverse, current_x, current_y):
+    """Indicateur d'une tranche de la grille de scénarios, avec les hypothèses actuelles."""
+    fig = go.Figure(data=go.Heatmap(
+        z=table.to_numpy(),
+        x=table.columns,
+        y=table.index,
+        colorscale='RdYlGn_r' if reverse else 'RdYlGn',
+        colorbar=dict(title=metric_label),
+        hovertemplate='%{x}<br>%{y}<br>%{z:.1f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[current_x],
+        y=[current_y],
+        mode='markers',
+        name='Actuel',
+        marker=dict(symbol='x', size=12, color=COLORS['text'])
+    ))
+
+    fig.update_layout(
+        height=420,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', size=11)
+    )
+    return fig
+
+def forecast_figure(df_forecast):
+    """Revenus prévus et intervalle de prévision."""
+    from optimisation.downsample import downsample
+    df_forecast = downsample(df_forecast, 'date', ['predicted_revenue', 'confidence_lower', 'confidence_upper'], method='minmax')
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=df_forecast['date'],
+        y=df_forecast['predicted_revenue'],
+        mode='lines',
+        name='Revenus prévus',
+        line=dict(color=COLORS['success'], width=3)
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=df_forecast['date'],
+        y=df_forecast['confidence_upper'],
+        mode='lines',
+        name='Intervalle confiance',
+        line=dict(width=0),
+        showlegend=False
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=df_forecast['date'],
+        y=df_forecast['confidence_lower'],
+        mode='lines',
+        fill='tonexty',
+        fillcolor='rgba(16, 185, 129, 0.1)',
+        line=dict(width=0),
+        name='Intervalle de prévision (90%)',
+        showlegend=True
+    ))
+
+    fig.update_layout(
+        height=400,
+        hovermode='x unified',
+        yaxis_title="Revenus ($)",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', size=11)
+    )
+
+    fig.update_xaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
+    return fig
+
+def revenue_trend_figure(trend_data, trend_grain, trend_name):
+    """Revenus de la période au grain quotidien ou hebdomadaire."""
+    from optimisation.downsample import downsample
+    trend_data = downsample(trend_data, trend_grain, ['revenue'], method='minmax')
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=trend_data[trend_grain],
+        y=trend_data['revenue'],
+        name=trend_name,
+        mode='lines+markers',
+        line=dict(color=COLORS['primary'], width=3),
+        marker=dict(size=8)
+    ))
+
+    fig.update_layout(
+        height=400,
+        hovermode='x unified',
+        yaxis=dict(title="Revenus ($)"),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', size=11)
+    )
+
+    fig.update_xaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)', title="Jour" if trend_grain == 'date' else "Semaine")
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
+    return fig
+
+# Les prévisions, le backtest et les profils sont calculés dans l'onglet qui les affiche,
+# après le premier affichage
 
 # Sidebar
 with st.sidebar:
@@ -397,10 +706,24 @@ with st.sidebar:
     
     period_choice = st.radio(
         "Choisir une période",
-        ["Aujourd'hui", "Cette semaine", "4 semaines roulantes"],
+        list(PERIOD_DAYS) + [CUSTOM_PERIOD],
         index=1
     )
     
+    custom_range = None
+    if period_choice == CUSTOM_PERIOD:
+        first_day = sales_slicer.first_date.date()
+        last_day = sales_slicer.last_date.date()
+        custom_range = st.date_input(
+            "Dates",
+            value=(last_day - timedelta(days=27), last_day),
+            min_value=first_day,
+            max_value=last_day
+        )
+        # Tant que la seconde date n'est pas choisie, la période ne couvre qu'un jour
+        if len(custom_range) == 1:
+            custom_range = (custom_range[0], custom_range[0])
+    
     st.markdown("---")
     
     st.markdown("### 🎯 Filtres rapides")
@@ -414,51 +737,53 @@ with st.sidebar:
     
     st.markdown("### 📈 KPIs en temps réel")
     
-    current_revenue = df_sales['revenue'].tail(7).sum()
-    previous_revenue = df_sales['revenue'].tail(14).head(7).sum()
-    revenue_change = ((current_revenue - previous_revenue) / previous_revenue) * 100
-    
     st.metric(
         "Revenus (7 derniers jours)",
-        f"{current_revenue:,.0f} $",
-        f"{revenue_change:+.1f}%"
+        f"{live_kpis['revenue_7d']:,.0f} $",
+        f"{live_kpis['revenue_change']:+.1f}%"
     )
     
-    current_covers = df_sales['covers'].tail(7).sum()
-    previous_covers = df_sales['covers'].tail(14).head(7).sum()
-    covers_change = ((current_covers - previous_covers) / previous_covers) * 100
-    
     st.metric(
         "Couverts (7 derniers jours)",
-        f"{current_covers:,.0f}",
-        f"{covers_change:+.1f}%"
+        f"{live_kpis['covers_7d']:,.0f}",
+        f"{live_kpis['covers_change']:+.1f}%"
     )
     
-    avg_ticket = current_revenue / current_covers if current_covers > 0 else 0
-    prev_avg_ticket = previous_revenue / previous_covers if previous_covers > 0 else 0
-    ticket_change = ((avg_ticket - prev_avg_ticket) / prev_avg_ticket * 100) if prev_avg_ticket > 0 else 0
-    
     st.metric(
         "Ticket moyen",
-        f"{avg_ticket:.2f} $",
-        f"{ticket_change:+.1f}%"
+        f"{live_kpis['avg_ticket_7d']:.2f} $",
+        f"{live_kpis['ticket_change']:+.1f}%"
     )
+    
+    # Rempli en fin de script, une fois toutes les phases mesurées
+    startup_panel = st.empty()
+
+# Période d'analyse : tranches des tables datées et KPIs de la période
+period_start, period_end = period_bounds(period_choice, sales_slicer.last_date, custom_range)
+prev_start, prev_end = previous_bounds(period_start, period_end)
+period_sales, period_hourly, prev_sales, kpis, df_menu = load_period(DATA_VERSION, period_start, period_end)
+period_label = f"{period_start:%d/%m} – {period_end:%d/%m}"
+startup_timer.mark('data')
 
 # Header
 st.markdown('<h1 class="main-header">Optimisation+ | Intelligence d\'Affaires</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Tableaux de bord en temps réel pour optimiser votre restaurant</p>', unsafe_allow_html=True)
 
-# Navigation par onglets selon la nouvelle structure
-tab1, tab2, tab3, tab4 = st.tabs([
+# Navigation par sections : seule la section affichée est calculée à chaque exécution
+# (st.tabs exécute le contenu de tous les onglets, même masqués)
+SECTIONS = [
     "📊 Mon Tableau de bord", 
     "⚙️ Suivi des opérations",
     "📈 Analyses",
     "💰 Suivi des coûts et revenus"
-])
+]
+section = st.radio("Section", SECTIONS, horizontal=True, label_visibility="collapsed", key="section")
 
 # TAB 1: Mon Tableau de bord
-with tab1:
-    st.markdown("### 📊 Vue d'ensemble des performances")
+if section == SECTIONS[0]:
+    from optimisation.insights import finances_status, operations_status, opportunities, priority_actions, profit_margin
+    
+    st.markdown(f"### 📊 Vue d'ensemble des performances – {period_choice} ({period_label})")
     
     # KPIs critiques essentiels seulement
     col1, col2, col3, col4 = st.columns(4)
@@ -473,32 +798,43 @@ with tab1:
         )
     
     with col2:
-        avg_ticket = df_sales['avg_ticket'].tail(30).mean()
         st.metric(
             "Ticket moyen",
-            f"{avg_ticket:.2f}$",
-            "+2.1%",
-            help="Montant moyen dépensé par client"
+            f"{kpis['avg_ticket']:.2f}$",
+            f"{kpis['ticket_change']:+.1f}%",
+            help="Montant moyen dépensé par client (évolution vs période précédente)"
         )
     
     with col3:
-        profit_margin = (kpis['recent_profit'] / kpis['recent_revenue'] * 100) if kpis['recent_revenue'] > 0 else 0
         st.metric(
             "Marge nette",
-            f"{profit_margin:.1f}%",
+            f"{profit_margin(kpis):.1f}%",
             "Cible: 15-20%",
             help="Profit après tous les coûts"
         )
     
     with col4:
-        daily_covers = df_sales['covers'].tail(7).mean()
         st.metric(
             "Couverts/jour",
-            f"{daily_covers:.0f}",
-            "+5.2%",
-            help="Nombre moyen de clients par jour"
+            f"{kpis['daily_covers']:.0f}",
+            f"{kpis['daily_covers_change']:+.1f}%",
+            help="Nombre moyen de clients par jour (évolution vs période précédente)"
         )
     
+    startup_timer.mark('first_paint')
+    
+    st.markdown("---")
+    
+    # Tendance de la métrique choisie dans la barre latérale (servie par le cube)
+    st.markdown(f"#### 📈 Tendance quotidienne – {selected_metric}")
+    
+    metric_series = cube.metric(selected_metric, by=['date'], where={'date': (period_start, period_end)})
+    
+    fig = cached_figure(trend_figure, metric_series, name=selected_metric)
+    
+    st.plotly_chart(fig, use_container_width=True)
+    downsampled_caption(len(metric_series))
+    
     st.markdown("---")
     
     col1, col2 = st.columns(2)
@@ -507,19 +843,7 @@ with tab1:
         st.markdown("#### 🏢 Mes opérations")
         
         # Détermination des statuts basés sur les KPIs réels
-        lunch_status = 'VERT' if kpis['lunch_turns'] >= 1.5 else 'JAUNE'
-        dinner_status = 'VERT' if kpis['dinner_turns'] >= 1.8 else 'JAUNE'
-        menu_status = 'VERT' if df_menu['margin'].mean() >= 65 else 'JAUNE'
-        occupancy_status = 'VERT' if 65 <= kpis['seat_occupancy'] <= 75 else 'JAUNE'
-        
-        operations_status = {
-            f'Rotation midi ({kpis["lunch_turns"]:.1f}x)': lunch_status,
-            f'Rotation soir ({kpis["dinner_turns"]:.1f}x)': dinner_status,
-            f'Performance menu': menu_status,
-            f'Taux d\'occupation ({kpis["seat_occupancy"]:.0f}%)': occupancy_status
-        }
-        
-        for item, status in operations_status.items():
+        for item, status in operations_status(kpis, df_menu).items():
             if status == 'VERT':
                 st.markdown(f'<div class="status-card status-green">✅ <strong>{item}</strong></div>', unsafe_allow_html=True)
             elif status == 'JAUNE':
@@ -531,23 +855,7 @@ with tab1:
         st.markdown("#### 💰 Mes finances")
         
         # Détermination des statuts financiers
-        prime_status = 'VERT' if kpis['prime_cost_pct'] < 60 else 'JAUNE' if kpis['prime_cost_pct'] < 65 else 'ROUGE'
-        profit_status = 'VERT' if profit_margin >= 15 else 'JAUNE' if profit_margin >= 10 else 'ROUGE'
-        
-        food_cost_pct = (df_sales['food_cost'].tail(30).sum() / df_sales['revenue'].tail(30).sum() * 100)
-        food_cost_status = 'VERT' if food_cost_pct < 32 else 'JAUNE'
-        
-        labor_cost_pct = (df_staff['monthly_cost'].sum() / df_sales['revenue'].tail(30).sum() * 100)
-        labor_cost_status = 'VERT' if labor_cost_pct < 35 else 'JAUNE'
-        
-        finances_status = {
-            f'Coût principal ({kpis["prime_cost_pct"]:.1f}%)': prime_status,
-            f'Marge nette ({profit_margin:.1f}%)': profit_status,
-            f'Coût nourriture ({food_cost_pct:.1f}%)': food_cost_status,
-            f'Coût main d\'œuvre ({labor_cost_pct:.1f}%)': labor_cost_status
-        }
-        
-        for item, status in finances_status.items():
+        for item, status in finances_status(kpis).items():
             if status == 'VERT':
                 st.markdown(f'<div class="status-card status-green">✅ <strong>{item}</strong></div>', unsafe_allow_html=True)
             elif status == 'JAUNE':
@@ -571,14 +879,11 @@ with tab1:
         st.caption("Nombre de clients minimum pour couvrir les coûts")
     
     with col3:
-        st.markdown("#### 📊 Cette semaine")
-        week_revenue = df_sales['revenue'].tail(7).sum()
-        prev_week = df_sales['revenue'].tail(14).head(7).sum()
-        change = ((week_revenue - prev_week) / prev_week * 100) if prev_week > 0 else 0
-        st.metric("Revenus (7j)", f"{week_revenue:,.0f}$", f"{change:+.1f}%")
+        st.markdown(f"#### 📊 {period_choice}")
+        st.metric("Revenus", f"{kpis['recent_revenue']:,.0f}$", f"{kpis['revenue_change']:+.1f}%")
         
-        week_profit = df_sales['gross_profit'].tail(7).sum()
-        st.metric("Profit (7j)", f"{week_profit:,.0f}$", f"{change:+.1f}%")
+        st.metric("Profit", f"{kpis['recent_profit']:,.0f}$", f"{kpis['profit_change']:+.1f}%")
+        st.caption("Évolution vs période précédente de même durée")
     
     st.markdown("---")
     
@@ -587,65 +892,38 @@ with tab1:
     with col1:
         st.markdown("### 🎯 Actions prioritaires cette semaine")
         
-        actions = []
-        
-        # Actions basées sur les KPIs
-        if kpis['prime_cost_pct'] > 60:
-            actions.append("🔴 **URGENT**: Prime Cost à {:.1f}% - Réduire coûts nourriture ou main d'œuvre".format(kpis['prime_cost_pct']))
-        
-        if kpis['lunch_turns'] < 1.5:
-            actions.append("🟡 Rotation midi faible ({:.1f}x) - Accélérer le service ou promotions lunch".format(kpis['lunch_turns']))
-        
-        if kpis['seat_occupancy'] < 65:
-            actions.append("🟡 Taux occupation bas ({:.1f}%) - Renforcer marketing et réservations".format(kpis['seat_occupancy']))
-        
-        # Identifier les plats peu performants
-        low_performers = df_menu[df_menu['qty'] < df_menu['qty'].quantile(0.3)]
-        if len(low_performers) > 0:
-            actions.append(f"📋 Revoir {len(low_performers)} plats peu vendus: {', '.join(low_performers['name'].head(2).tolist())}")
-        
-        # Identifier les plats à faible marge
-        low_margin = df_menu[df_menu['margin'] < 60]
-        if len(low_margin) > 0:
-            actions.append(f"💰 Améliorer marge de: {', '.join(low_margin['name'].head(2).tolist())}")
-        
-        actions.append("✅ Réviser planning personnel semaine prochaine")
-        actions.append("✅ Vérifier inventaire produits frais")
-        
-        for action in actions:
+        for action in priority_actions(kpis, df_menu):
             st.markdown(f"- {action}")
     
     with col2:
         st.markdown("### 💡 Opportunités identifiées")
         
-        opportunities = []
-        
-        # Opportunités basées sur les données
-        best_dish = df_menu.loc[df_menu['revenue'].idxmax()]
-        opportunities.append(f"⭐ **{best_dish['name']}** cartonne! Considérer une variation ou augmenter le prix de 1-2$")
-        
-        high_margin_dishes = df_menu[df_menu['margin'] > 70].sort_values('qty', ascending=False)
-        if len(high_margin_dishes) > 0:
-            top_margin = high_margin_dishes.iloc[0]
-            opportunities.append(f"💎 Promouvoir **{top_margin['name']}** (marge {top_margin['margin']:.0f}%) - potentiel +{top_margin['revenue']*0.2:.0f}$/mois")
-        
-        # Heures creuses
-        slow_hours = df_hourly[df_hourly['covers'] < 20]
-        if len(slow_hours) > 0:
-            opportunities.append(f"⏰ {len(slow_hours)} périodes creuses - Lancer happy hour ou promotions")
-        
-        if kpis['dinner_turns'] > 2.0:
-            opportunities.append("🎉 Excellente rotation soir! Possibilité d'augmenter capacité ou prix")
-        
-        opportunities.append("📱 Lancer campagne réseaux sociaux pour lundi-mardi")
-        opportunities.append("🎁 Programme fidélité pourrait augmenter revenus de 8-12%")
-        
-        for opp in opportunities:
+        for opp in opportunities(kpis, df_menu, period_hourly):
             st.markdown(f"- {opp}")
 
 # TAB 2: Suivi des opérations
-with tab2:
-    st.markdown(f"### Suivi des opérations - **{period_choice}**")
+if section == SECTIONS[1]:
+    st.markdown(f"### Suivi des opérations - **{period_choice}** ({period_label})")
+    
+    # Bilan de la période vs période précédente de même durée
+    period_covers = period_sales['covers'].sum()
+    period_ticket = kpis['recent_revenue'] / period_covers if period_covers > 0 else 0
+    prev_covers = prev_sales['covers'].sum()
+    prev_ticket = prev_sales['revenue'].sum() / prev_covers if prev_covers > 0 else 0
+    ticket_change = (period_ticket - prev_ticket) / prev_ticket * 100 if prev_ticket > 0 else 0
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Revenus de la période", f"{kpis['recent_revenue']:,.0f} $", f"{kpis['revenue_change']:+.1f}%")
+    
+    with col2:
+        st.metric("Couverts de la période", f"{period_covers:,.0f}", f"{kpis['covers_change']:+.1f}%")
+    
+    with col3:
+        st.metric("Ticket moyen de la période", f"{period_ticket:.2f} $", f"{ticket_change:+.1f}%")
+    
+    st.markdown("---")
     
     st.markdown("""
     <div style='background: #f8fafc; padding: 1rem; border-radius: 8px; margin: 1rem 0;'>
@@ -656,85 +934,72 @@ with tab2:
     </div>
     """, unsafe_allow_html=True)
     
-    # Métriques principales
+    demand_profiles = load_demand_profiles()
+    df_next_day = demand_profiles.next_day()
+    next_day_date = demand_profiles.last_date + timedelta(days=1)
+    
+    # Métriques principales : prévision du lendemain tirée des profils horaires
+    next_day_covers = df_next_day['predicted_covers'].sum()
+    next_day_revenue = df_next_day['predicted_revenue'].sum()
+    average_day_covers = demand_profiles.average_day_covers().sum()
+    peak = df_next_day.loc[df_next_day['predicted_covers'].idxmax()] if len(df_next_day) else None
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.metric(
             "Total couverts prévus demain",
-            "440",
-            "+38% vs moyenne"
+            f"{next_day_covers:,.0f}",
+            f"{(next_day_covers - average_day_covers) / average_day_covers * 100 if average_day_covers > 0 else 0:+.0f}% vs moyenne"
         )
     
     with col2:
         st.metric(
             "Heure de pointe",
-            "21h",
-            "96 couverts"
+            peak['hour_label'] if peak is not None else "–",
+            f"{peak['predicted_covers']} couverts" if peak is not None else "Aucune heure d'ouverture connue",
+            delta_color="off"
         )
     
     with col3:
         st.metric(
             "Revenus estimés",
-            "22,880 $",
-            "Ticket moyen: 52$"
+            f"{next_day_revenue:,.0f} $",
+            f"Ticket moyen: {next_day_revenue / next_day_covers if next_day_covers > 0 else 0:.0f}$",
+            delta_color="off"
         )
     
     st.markdown("---")
     
-    # Statut
+    # Statut : jours forts et faibles de la semaine type (profils), puis indicateurs de la période
+    # vs période précédente, chacun du côté de son signe
+    WEEKDAYS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+    day_covers = demand_profiles.profile(demand_profiles.locations[0]).sum(axis=1)
+    day_vs_mean = (day_covers / day_covers.mean() - 1) * 100 if day_covers.mean() > 0 else day_covers * 0
+    prev_revenue = prev_sales['revenue'].sum()
+    food_change = kpis['food_cost_pct'] - (prev_sales['food_cost'].sum() / prev_revenue * 100 if prev_revenue > 0 else kpis['food_cost_pct'])
+    period_margin = kpis['recent_profit'] / kpis['recent_revenue'] * 100 if kpis['recent_revenue'] > 0 else 0
+    
+    strengths = [f"{WEEKDAYS[day_vs_mean.idxmax()]} : {day_vs_mean.max():+.0f}% de couverts vs moyenne"]
+    concerns = [f"{WEEKDAYS[day_vs_mean.idxmin()]} : {day_vs_mean.min():+.0f}% de couverts vs moyenne"]
+    (strengths if ticket_change >= 0 else concerns).append(f"Ticket moyen {period_ticket:.2f}$ ({ticket_change:+.1f}% vs période précédente)")
+    (strengths if food_change <= 0 else concerns).append(f"Coût nourriture {kpis['food_cost_pct']:.1f}% ({food_change:+.1f} pts)")
+    (strengths if kpis['dinner_turns'] >= 1.8 else concerns).append(f"Rotation du soir {kpis['dinner_turns']:.1f}x par place")
+    (strengths if period_margin >= 15 else concerns).append(f"Marge nette {period_margin:.1f}%")
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        st.success("""
-        **✅ Points forts cette semaine**
-        - Weekend exceptionnel: +38% vs moyenne
-        - Ticket moyen en hausse constante
-        - Taux de rotation optimal (1.8 couverts/table)
-        - Marge brute à 68% (excellent)
-        """)
+        st.success("**✅ Points forts de la période**\n" + "\n".join(f"- {item}" for item in strengths))
     
     with col2:
-        st.warning("""
-        **⚠️ Points d'attention**
-        - Lundi-mardi sous-performent (+15%)
-        - Coûts alimentaires en légère hausse (+3%)
-        - Temps d'attente moyen augmenté (18 min)
-        - 2 plats peu performants à revoir
-        """)
+        st.warning("**⚠️ Points d'attention**\n" + "\n".join(f"- {item}" for item in concerns))
     
     st.markdown("---")
     
     # Prévision prochaine journée
-    st.markdown("#### 📊 Prévision pour la prochaine journée (par heure)")
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        x=df_next_day['hour_label'],
-        y=df_next_day['predicted_covers'],
-        marker_color=[
-            COLORS['success'] if 12 <= h <= 14 or 18 <= h <= 21 
-            else COLORS['primary'] 
-            for h in df_next_day['hour']
-        ],
-        text=df_next_day['predicted_covers'],
-        textposition='outside',
-        name='Couverts prévus'
-    ))
+    st.markdown(f"#### 📊 Prévision pour la prochaine journée (par heure) – {next_day_date:%d/%m}")
     
-    fig.update_layout(
-        height=350,
-        yaxis_title="Nombre de couverts prévus",
-        xaxis_title="Heure",
-        showlegend=False,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family='Inter', size=11)
-    )
-    
-    fig.update_xaxes(showgrid=False, tickangle=-45)
-    fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
+    fig = cached_figure(next_day_figure, df_next_day)
     
     st.plotly_chart(fig, use_container_width=True)
     
@@ -743,29 +1008,53 @@ with tab2:
     # Alertes et recommandations prédictives
     st.markdown("#### 🔔 Alertes et recommandations prédictives")
     
+    # Journées les plus et les moins chargées des 7 prochains jours (profils de demande)
+    from optimisation.staffing import COVERS_PER_HOUR, week_forecast
+    
+    week = week_forecast(demand_profiles)
+    week_covers = week.groupby('date')['predicted_covers'].sum()
+    week_vs_mean = (week_covers / average_day_covers - 1) * 100 if average_day_covers > 0 else week_covers * 0
+    busiest, quietest = week_covers.idxmax(), week_covers.idxmin()
+    busiest_peak = week[week['date'] == busiest].nlargest(1, 'predicted_covers').iloc[0]
+    servers = int(np.ceil(busiest_peak['predicted_covers'] / COVERS_PER_HOUR['Serveurs']))
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        st.error("""
-        **🚨 Alerte: Forte affluence prévue**
-        - Date: Vendredi 25 octobre
-        - Couverts estimés: 420 (+45% vs moyenne)
-        - **Actions recommandées:**
-            - Ajouter 2 serveurs (18h-22h)
-            - Commander +30% poulet et pâtes
-            - Préparer sauces à l'avance
-        """)
+        if week_vs_mean[busiest] >= AFFLUENCE_ALERT_PCT:
+            st.error(f"""
+            **🚨 Alerte: Forte affluence prévue**
+            - Date: {WEEKDAYS[busiest.dayofweek]} {busiest:%d/%m}
+            - Couverts estimés: {week_covers[busiest]:,.0f} ({week_vs_mean[busiest]:+.0f}% vs moyenne)
+            - **Actions recommandées:**
+                - Prévoir {servers} serveurs à {busiest_peak['hour']}h ({busiest_peak['predicted_covers']} couverts)
+                - Commander {week_vs_mean[busiest]:+.0f}% de produits frais pour la journée
+                - Préparer sauces à l'avance
+            """)
+        else:
+            st.success(f"""
+            **✅ Pas de pic d'affluence sur 7 jours**
+            - Journée la plus chargée: {WEEKDAYS[busiest.dayofweek]} {busiest:%d/%m}
+            - Couverts estimés: {week_covers[busiest]:,.0f} ({week_vs_mean[busiest]:+.0f}% vs moyenne)
+            """)
     
     with col2:
-        st.warning("""
-        **☁️ Impact météo détecté**
-        - Prévision: Pluie mardi prochain
-        - Impact attendu: -15% dine-in, +25% livraison
-        - **Actions recommandées:**
-            - Augmenter stock plats à emporter
-            - Renforcer équipe livraison
-            - Promotion "Comfort food" spéciale
-        """)
+        if week_vs_mean[quietest] <= -AFFLUENCE_ALERT_PCT:
+            st.warning(f"""
+            **📉 Journée calme prévue**
+            - Date: {WEEKDAYS[quietest.dayofweek]} {quietest:%d/%m}
+            - Couverts estimés: {week_covers[quietest]:,.0f} ({week_vs_mean[quietest]:+.0f}% vs moyenne)
+            - **Actions recommandées:**
+                - Alléger le planning (voir **Analyses > Effectifs**)
+                - Réduire les commandes de produits frais
+                - Promotion ciblée sur la journée
+            """)
+        else:
+            st.info(f"""
+            **📅 Pas de creux marqué sur 7 jours**
+            - Journée la plus calme: {WEEKDAYS[quietest.dayofweek]} {quietest:%d/%m}
+            - Couverts estimés: {week_covers[quietest]:,.0f} ({week_vs_mean[quietest]:+.0f}% vs moyenne)
+            """)
     
     st.markdown("---")
     
@@ -780,32 +1069,33 @@ with tab2:
     st.info("Voir la section **Suivi des coûts et revenus > Coûts de main d'œuvre** pour plus de détails")
 
 # TAB 3: Analyses
-with tab3:
+if section == SECTIONS[2]:
     st.subheader("Analyses détaillées")
     
-    analysis_tabs = st.tabs([
+    ANALYSIS_SECTIONS = [
         "🍕 Performance du menu",
         "👥 Effectifs",
         "📦 Inventaires",
         "👤 Clients"
-    ])
+    ]
+    analysis_section = st.radio("Analyse", ANALYSIS_SECTIONS, horizontal=True, label_visibility="collapsed", key="analysis_section")
     
     # SOUS-TAB 1: Performance du menu
-    with analysis_tabs[0]:
+    if analysis_section == ANALYSIS_SECTIONS[0]:
+        from optimisation.menu import THRESHOLD_GROUPS
+        from optimisation.pricing import SENSITIVITY
+        
         st.markdown("#### 📊 Analyse de la performance du menu")
         
-        # Calcul des seuils pour la classification
-        avg_qty = df_menu['qty'].mean()
-        avg_margin_pct = df_menu['margin'].mean()
+        # Seuils de popularité et de marge : moyennes de la carte ou par groupe
+        threshold_options = [
+            label for label, cols in THRESHOLD_GROUPS.items()
+            if all(df_menu[col].nunique() > 1 for col in cols)
+        ]
+        threshold_choice = st.radio("Seuils de classification", threshold_options, horizontal=True)
         
         # Classification des plats en français
-        df_menu['classification'] = df_menu.apply(
-            lambda row: 'Vedette' if row['qty'] >= avg_qty and row['margin'] >= avg_margin_pct
-            else 'Populaire' if row['qty'] >= avg_qty and row['margin'] < avg_margin_pct
-            else 'Potentiel' if row['qty'] < avg_qty and row['margin'] >= avg_margin_pct
-            else 'À revoir',
-            axis=1
-        )
+        df_menu, menu_classes = load_menu_classes(DATA_VERSION, period_start, period_end, threshold_choice)
         
         # Classification des plats
         col1, col2 = st.columns([2, 1])
@@ -813,13 +1103,8 @@ with tab3:
         with col1:
             st.markdown("#### 📋 Tous les plats")
             
-            # Calcul de métriques supplémentaires
-            df_menu_display = df_menu.copy()
-            df_menu_display['contribution_margin'] = df_menu_display['revenue'] * (df_menu_display['margin'] / 100)
-            df_menu_display['revenue_per_unit'] = df_menu_display['revenue'] / df_menu_display['qty']
-            
             # Préparer le tableau simplifié
-            display_df = df_menu_display[['name', 'category', 'qty', 'price', 'margin', 'revenue', 'classification']].copy()
+            display_df = df_menu[['name', 'category', 'qty', 'price', 'margin', 'revenue', 'classification']]
             display_df.columns = ['Plat', 'Catégorie', 'Vendus', 'Prix', 'Marge %', 'Revenus', 'Classe']
             display_df['Prix'] = display_df['Prix'].apply(lambda x: f"{x:.2f}$")
             display_df['Revenus'] = display_df['Revenus'].apply(lambda x: f"{x:,.0f}$")
@@ -841,8 +1126,7 @@ with tab3:
         with col2:
             st.markdown("#### 📊 Classification")
             
-            for classification in ['Vedette', 'Populaire', 'Potentiel', 'À revoir']:
-                df_class = df_menu[df_menu['classification'] == classification]
+            for classification, class_info in menu_classes.iterrows():
                 
                 if classification == 'Vedette':
                     icon = "⭐"
@@ -865,21 +1149,19 @@ with tab3:
                     action = "🗑️ Retirer ou reformuler"
                     color = "danger"
                 
-                if len(df_class) > 0:
+                if class_info['count'] > 0:
                     if color == "success":
-                        st.success(f"**{icon} {classification}** ({len(df_class)})")
+                        st.success(f"**{icon} {classification}** ({class_info['count']})")
                     elif color == "warning":
-                        st.warning(f"**{icon} {classification}** ({len(df_class)})")
+                        st.warning(f"**{icon} {classification}** ({class_info['count']})")
                     elif color == "danger":
-                        st.error(f"**{icon} {classification}** ({len(df_class)})")
+                        st.error(f"**{icon} {classification}** ({class_info['count']})")
                     else:
-                        st.info(f"**{icon} {classification}** ({len(df_class)})")
+                        st.info(f"**{icon} {classification}** ({class_info['count']})")
                     
                     st.caption(desc)
                     st.caption(f"➡️ {action}")
-                    
-                    for _, item in df_class.iterrows():
-                        st.caption(f"• {item['name']}")
+                    st.caption("  \n".join(f"• {name}" for name in class_info['names']))
                     
                     st.markdown("---")
         
@@ -888,32 +1170,11 @@ with tab3:
         # Analyse par catégorie
         st.markdown("#### 📂 Performance par catégorie")
         
-        category_stats = df_menu.groupby('category').agg({
-            'qty': 'sum',
-            'revenue': 'sum',
-            'margin': 'mean'
-        }).round(1)
-        
-        fig = go.Figure()
+        category_stats = cube.query(
+            ['qty', 'revenue'], by=['category'], where={'date': (period_start, period_end)}
+        ).round(1)
         
-        fig.add_trace(go.Bar(
-            x=category_stats.index,
-            y=category_stats['revenue'],
-            name='Revenus',
-            marker_color=COLORS['primary'],
-            text=category_stats['revenue'].apply(lambda x: f"{x:,.0f}$"),
-            textposition='outside'
-        ))
-        
-        fig.update_layout(
-            height=300,
-            yaxis_title="Revenus ($)",
-            xaxis_title="Catégorie",
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family='Inter', size=11)
-        )
+        fig = cached_figure(category_figure, category_stats)
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -928,8 +1189,10 @@ with tab3:
             
             Vos champions à conserver!
             """)
-            for _, item in vedettes.iterrows():
-                st.caption(f"✅ {item['name']} - {item['qty']} vendus")
+            if len(vedettes) > 0:
+                st.caption("  \n".join(
+                    "✅ " + vedettes['name'] + " - " + vedettes['qty'].astype(str) + " vendus"
+                ))
         
         with col2:
             potentiels = df_menu[df_menu['classification'] == 'Potentiel']
@@ -941,39 +1204,79 @@ with tab3:
             
             if len(potentiels) > 0:
                 st.caption("**Potentiels (haute marge):**")
-                for _, item in potentiels.iterrows():
-                    st.caption(f"📣 {item['name']} - À promouvoir!")
+                st.caption("  \n".join("📣 " + potentiels['name'] + " - À promouvoir!"))
             
             if len(a_revoir) > 0:
                 st.caption("**À revoir (faible performance):**")
-                for _, item in a_revoir.iterrows():
-                    st.caption(f"🗑️ {item['name']} - Retirer/revoir")
+                st.caption("  \n".join("🗑️ " + a_revoir['name'] + " - Retirer/revoir"))
         
         with col3:
-            populaires = df_menu[df_menu['classification'] == 'Populaire']
+            populaires, total = load_price_opportunities(DATA_VERSION, period_start, period_end, threshold_choice)
             
             st.info(f"""
             **💡 Opportunités ({len(populaires)} plats)**
             """)
             
-            if len(populaires) > 0:
-                st.caption("**Populaires (augmenter prix):**")
-                for _, item in populaires.iterrows():
-                    potential_increase = item['price'] * 0.10  # Augmentation 10%
-                    monthly_potential = item['qty'] * potential_increase
-                    st.caption(f"💰 {item['name']}")
-                    st.caption(f"   → +{potential_increase:.2f}$ = +{monthly_potential:,.0f}$/mois")
-            
-            # Potentiel total
-            total_potential = 0
-            for _, item in populaires.iterrows():
-                total_potential += item['qty'] * item['price'] * 0.10
-            
-            if total_potential > 0:
-                st.metric("Potentiel total", f"+{total_potential:,.0f}$/mois")
+            if populaires.empty:
+                st.caption("Aucun plat Populaire sur la période : pas de hausse de prix à simuler.")
+            else:
+                st.caption("**Populaires (prix simulé, gain probable ≥ 80%):**")
+                st.caption("  \n".join(
+                    "💰 " + populaires['name']
+                    + populaires['best_change'].map("  \n   → {:+.0%}".format)
+                    + populaires['new_price'].map(" ({:.2f}$)".format)
+                    + populaires['margin_delta'].map(" = {:+,.0f}$ sur la période".format)
+                ))
+                
+                # Potentiel total : nouveaux prix appliqués ensemble
+                if total['margin_delta'] > 0:
+                    st.metric(
+                        "Potentiel total", f"+{total['margin_delta']:,.0f}$",
+                        f"{total['margin_delta_low']:,.0f}$ – {total['margin_delta_high']:,.0f}$ sur la période",
+                        delta_color="off"
+                    )
+        
+        st.markdown("---")
+        
+        # Simulateur : élasticité-prix incertaine par catégorie, 2000 tirages de la demande
+        st.markdown("#### 💲 Simulateur de prix")
+        
+        scope_options = ['Toute la carte', 'Plats populaires'] + sorted(df_menu['category'].unique())
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            price_change = st.slider("Variation de prix (%)", -10, 25, 10, key="price_change") / 100
+        with col2:
+            price_scope = st.selectbox("Plats concernés", scope_options, key="price_scope")
+        with col3:
+            price_sensitivity = st.select_slider(
+                "Sensibilité de la clientèle au prix", list(SENSITIVITY), value='Moyenne', key="price_sensitivity"
+            )
+        
+        price_grid = load_price_simulation(DATA_VERSION, period_start, period_end, threshold_choice, price_scope, price_sensitivity)
+        scenario = price_grid.iloc[int(np.argmin(np.abs(price_grid['change'].to_numpy() - price_change)))]
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(
+                "Écart de revenus", f"{scenario['revenue_delta']:+,.0f}$",
+                f"{scenario['revenue_delta_low']:,.0f}$ – {scenario['revenue_delta_high']:,.0f}$", delta_color="off"
+            )
+        with col2:
+            st.metric(
+                "Écart de marge", f"{scenario['margin_delta']:+,.0f}$",
+                f"{scenario['margin_delta_low']:,.0f}$ – {scenario['margin_delta_high']:,.0f}$", delta_color="off"
+            )
+        with col3:
+            st.metric("Probabilité de gain", f"{scenario['gain_probability']:.0%}", "marge supérieure à l'actuelle", delta_color="off")
+        
+        fig = cached_figure(price_simulation_figure, price_grid, change=round(price_change, 2))
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption("Écarts sur la période vs prix actuels ; bandes : 5e–95e centiles des scénarios de demande.")
     
     # SOUS-TAB 2: Effectifs
-    with analysis_tabs[1]:
+    if analysis_section == ANALYSIS_SECTIONS[1]:
+        from optimisation.staffing import COVERS_PER_HOUR, MIN_PAID_HOURS
+        
         st.markdown("#### Planification des effectifs")
         
         col1, col2 = st.columns(2)
@@ -981,23 +1284,14 @@ with tab3:
         with col1:
             st.markdown("##### Répartition des coûts de personnel")
             
-            fig = go.Figure(data=[go.Pie(
-                labels=df_staff['position'],
-                values=df_staff['monthly_cost'],
-                hole=0.4,
-                marker_colors=[COLORS['primary'], COLORS['secondary'], COLORS['accent'], COLORS['success'], COLORS['warning'], COLORS['text']]
-            )])
+            fig = cached_figure(staff_cost_figure, df_staff[['position', 'monthly_cost']])
             
-            fig.update_layout(
-                height=400,
-                font=dict(family='Inter', size=11)
-            )
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             st.markdown("##### Détail par poste")
             
-            display_df = df_staff[['position', 'headcount', 'avg_hourly_rate', 'monthly_cost']].copy()
+            display_df = df_staff[['position', 'headcount', 'avg_hourly_rate', 'monthly_cost']]
             display_df.columns = ['Poste', 'Effectif', 'Taux horaire', 'Coût mensuel']
             display_df['Taux horaire'] = display_df['Taux horaire'].apply(lambda x: f"{x}$/h")
             display_df['Coût mensuel'] = display_df['Coût mensuel'].apply(lambda x: f"{x:,.0f}$")
@@ -1014,11 +1308,12 @@ with tab3:
             st.metric(
                 "Coût total personnel",
                 f"{total_staff_cost:,.0f}$/mois",
-                "-2.3% vs mois dernier"
+                f"{df_staff['monthly_hours'].sum():,.0f} h/mois",
+                delta_color="off"
             )
         
         with col2:
-            labor_percentage = (total_staff_cost / (df_sales['revenue'].sum() / 3)) * 100
+            labor_percentage = kpis['labor_cost_pct']
             st.metric(
                 "% Coût du travail",
                 f"{labor_percentage:.1f}%",
@@ -1027,128 +1322,234 @@ with tab3:
         
         with col3:
             st.metric(
-                "Taux de rotation",
-                "12%/an",
-                "-3% vs année dernière"
+                "Heures hebdomadaires",
+                f"{df_staff['weekly_hours'].sum():,.0f} h",
+                f"{df_staff['headcount'].sum():,.0f} employés",
+                delta_color="off"
             )
         
         with col4:
             st.metric(
                 "Productivité",
-                "1,847$/employé",
-                "+5.2%"
+                f"{kpis['recent_revenue'] / max(df_staff['headcount'].sum(), 1):,.0f}$/employé",
+                f"{kpis['revenue_change']:+.1f}% vs période précédente"
             )
         
         st.markdown("---")
         
         st.markdown("#### Optimisation des horaires")
         
+        # Plan de coût minimal sur la semaine à venir, recalculé à chaque hypothèse
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            server_covers = st.slider("Couverts par serveur et par heure", 6, 20, COVERS_PER_HOUR['Serveurs'], key="server_covers")
+        
+        with col2:
+            demand_pct = st.slider("Affluence prévue (%)", 70, 130, 100, step=5, key="demand_pct")
+        
+        with col3:
+            min_paid_hours = st.select_slider("Quart minimal payé (h)", [2, 3, 4], MIN_PAID_HOURS, key="min_paid_hours")
+        
+        staffing_plan, shifts, staffing = load_staffing_plan(DATA_VERSION, server_covers, demand_pct, min_paid_hours)
+        
+        required_hours = staffing['required_hours'].sum()
+        paid_hours = staffing['paid_hours'].sum()
+        reductions = staffing[staffing['savings'] > 0]
+        additions = staffing[staffing['savings'] < 0]
+        
+        # Heures où le plan demande plus de personnes que l'effectif du poste
+        headcount = staffing.set_index('position')['headcount']
+        short = staffing_plan[staffing_plan['staffed'].to_numpy() > headcount.reindex(staffing_plan['position']).to_numpy()]
+        short_periods = short.groupby('position', observed=True).agg(
+            first=('hour', 'min'), last=('hour', 'max'), days=('date', 'nunique')
+        ).reset_index()
+        
         col1, col2 = st.columns(2)
         
         with col1:
-            st.success("""
-            **✅ Périodes bien staffées**
-            - Vendredi-Samedi soir (18h-21h)
-            - Dimanche midi (11h-14h)
-            - Mercredi midi (12h-13h30)
+            st.success(f"""
+            **✅ Plan de la semaine**
+            - {required_hours:,.0f} h requises par les couverts prévus
+            - {paid_hours:,.0f} h payées ({shifts['count'].sum():,.0f} quarts)
+            - Coût: {staffing['cost'].sum():,.0f}$/semaine
             
-            **Taux de couverture: 95%**
+            **Taux d'utilisation: {required_hours / paid_hours:.0%}**
             """)
             
-            st.info("""
+            if len(reductions):
+                lines = "\n".join(
+                    f"            - {row.position}: -{row.current_hours - row.paid_hours:.0f} h/semaine"
+                    for row in reductions.itertuples()
+                )
+                st.info(f"""
             **💡 Recommandations d'économies**
-            - Réduire 1 serveur lundi-mardi 14h-17h
-            - **Économie estimée: 1,920$/mois**
-            - Impact service: Minimal (affluence faible)
+{lines}
+            - **Économie estimée: {reductions['savings'].sum() * 4.33:,.0f}$/mois**
             """)
+            else:
+                st.info("**💡 Recommandations d'économies**\n\nAucune réduction d'heures possible avec ces hypothèses")
         
         with col2:
-            st.warning("""
+            if len(short_periods):
+                lines = "\n".join(
+                    f"            - {row.position}: {row.first}h-{row.last + 1}h ({row.days} jour{'s' if row.days > 1 else ''} sur 7)"
+                    for row in short_periods.itertuples()
+                )
+                st.warning(f"""
             **⚠️ Périodes sous-staffées**
-            - Jeudi soir (19h-21h)
-            - Samedi midi (12h-14h)
+{lines}
             
-            **Impact:** Temps d'attente +15 min
-            **Satisfaction:** -0.3 points
+            **Impact:** besoin au-delà de l'effectif disponible
             """)
+            else:
+                st.success("**✅ Effectifs suffisants**\n\nAucune heure ne demande plus que l'effectif de chaque poste")
             
-            st.error("""
+            if len(additions):
+                lines = "\n".join(
+                    f"            - Ajouter {row.paid_hours - row.current_hours:.0f} h/semaine de {row.position}"
+                    for row in additions.itertuples()
+                )
+                st.error(f"""
             **🚨 Action requise**
-            - Ajouter 1 serveur jeudi 18h-22h
-            - Ajouter 1 aide-cuisine samedi 11h-15h
-            - **Coût: 1,280$/mois**
-            - **ROI: +2,400$/mois** (meilleur service)
+{lines}
+            - **Coût: {-additions['savings'].sum() * 4.33:,.0f}$/mois**
             """)
+        
+        with st.expander("Quarts planifiés"):
+            display_df = shifts[['date', 'position', 'start', 'end', 'count', 'cost']]
+            display_df['date'] = display_df['date'].dt.strftime('%a %d/%m')
+            display_df['start'] = display_df['start'].map(lambda h: f"{h}h")
+            display_df['end'] = display_df['end'].map(lambda h: f"{h}h")
+            display_df['cost'] = display_df['cost'].map(lambda x: f"{x:,.0f}$")
+            display_df.columns = ['Jour', 'Poste', 'Début', 'Fin', 'Employés', 'Coût']
+            st.dataframe(display_df, hide_index=True, use_container_width=True)
     
     # SOUS-TAB 3: Inventaires
-    with analysis_tabs[2]:
+    if analysis_section == ANALYSIS_SECTIONS[2]:
         st.markdown("#### Gestion des stocks")
         
-        st.info("""
-        **📦 Gestion des inventaires**
-        
-        Cette section permet de suivre:
-        - Niveaux de stock en temps réel
-        - Alertes de réapprovisionnement
-        - Analyse du gaspillage
-        - Optimisation des commandes
-        
-        *Fonctionnalité en développement*
-        """)
-    
-    # SOUS-TAB 4: Clients
-    with analysis_tabs[3]:
-        st.markdown("#### Comportement des clients")
+        _, ledger, reorders = load_inventory()
+        variance, losses = load_inventory_period(DATA_VERSION, period_start, period_end)
+        theoretical_cost = variance['theoretical_cost'].sum()
+        actual_cost = variance['actual_cost'].sum()
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Livraison", "35%", "+5%")
+            st.metric("Coût matière théorique", f"{theoretical_cost:,.0f}$", "selon les recettes", delta_color="off")
         
         with col2:
-            st.metric("Bar", "15%", "-2%")
+            st.metric("Coût matière réel", f"{actual_cost:,.0f}$", period_label, delta_color="off")
         
         with col3:
-            st.metric("Salle", "50%", "-3%")
+            st.metric(
+                "Écart réel vs théorique",
+                f"{actual_cost - theoretical_cost:,.0f}$",
+                f"{(actual_cost / theoretical_cost - 1) * 100:+.1f}%" if theoretical_cost else None,
+                delta_color="inverse"
+            )
         
-        st.markdown("---")
+        with col4:
+            st.metric(
+                "Valeur du stock (FIFO)",
+                f"{ledger.positions()['value'].sum():,.0f}$",
+                f"{len(reorders)} ingrédient{'s' if len(reorders) > 1 else ''} à commander",
+                delta_color="off"
+            )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("##### Alertes de réapprovisionnement")
+            
+            if len(reorders):
+                display_df = reorders[['ingredient', 'on_hand', 'days_of_cover', 'order_qty', 'order_cost']]
+                display_df['on_hand'] = display_df['on_hand'].map(lambda x: f"{x:,.1f}") + ' ' + reorders['unit']
+                display_df['days_of_cover'] = display_df['days_of_cover'].map(lambda x: f"{x:.1f} j")
+                display_df['order_qty'] = display_df['order_qty'].map(lambda x: f"{x:,.0f}") + ' ' + reorders['unit']
+                display_df['order_cost'] = display_df['order_cost'].map(lambda x: f"{x:,.0f}$")
+                display_df.columns = ['Ingrédient', 'Stock', 'Couverture', 'À commander', 'Coût']
+                st.dataframe(display_df, hide_index=True, use_container_width=True)
+            else:
+                st.success("Aucun ingrédient sous son point de commande")
         
-        st.markdown("##### Temps de service moyen")
+        with col2:
+            st.markdown("##### Écart théorique vs réel")
+            
+            display_df = variance.nlargest(8, 'variance_cost')[['ingredient', 'theoretical_cost', 'actual_cost', 'variance_cost', 'variance_pct']]
+            display_df['theoretical_cost'] = display_df['theoretical_cost'].map(lambda x: f"{x:,.0f}$")
+            display_df['actual_cost'] = display_df['actual_cost'].map(lambda x: f"{x:,.0f}$")
+            display_df['variance_cost'] = display_df['variance_cost'].map(lambda x: f"{x:+,.0f}$")
+            display_df['variance_pct'] = display_df['variance_pct'].map(lambda x: f"{x:+.1f}%")
+            display_df.columns = ['Ingrédient', 'Théorique', 'Réel', 'Écart', 'Écart %']
+            st.dataframe(display_df, hide_index=True, use_container_width=True)
         
-        st.metric("Temps moyen", "18 minutes", "+3 min vs mois dernier")
+        st.markdown("##### Analyse du gaspillage")
         
-        st.warning("""
-        **⚠️ Attention:** Le temps de service a augmenté. 
-        Considérer l'ajout de personnel aux heures de pointe.
-        """)
+        col1, col2 = st.columns(2)
         
-        st.markdown("---")
+        with col1:
+            by_reason = losses.groupby('reason')['cost'].sum().sort_values(ascending=False)
+            display_df = by_reason.reset_index()
+            display_df['share'] = (display_df['cost'] / actual_cost * 100).map(lambda x: f"{x:.1f}%") if actual_cost else '-'
+            display_df['cost'] = display_df['cost'].map(lambda x: f"{x:,.0f}$")
+            display_df.columns = ['Motif', 'Coût', '% du coût matière']
+            st.dataframe(display_df, hide_index=True, use_container_width=True)
         
-        st.markdown("##### Efficacité du Marketing")
+        with col2:
+            by_ingredient = losses.groupby('ingredient', observed=True)['cost'].sum().nlargest(5)
+            if len(by_ingredient):
+                lines = "\n".join(f"            - {name}: {cost:,.0f}$" for name, cost in by_ingredient.items())
+                st.warning(f"""
+            **⚠️ Ingrédients les plus perdus**
+{lines}
+            
+            **Total des pertes: {losses['cost'].sum():,.0f}$** sur la période
+            """)
+            else:
+                st.success("Aucune perte enregistrée sur la période")
         
-        st.info("""
-        **📱 Efficacité du Marketing**
+        st.caption("Consommation théorique = ventes de plats × recettes ; consommation réelle = ventes, pertes et écarts "
+                   "de comptage du journal d'inventaire, valorisés au coût FIFO des achats (théorique : coût catalogue). Point de commande : consommation "
+                   "moyenne des 14 derniers jours × (délai de livraison + 1 jour de sécurité).")
+    
+    # SOUS-TAB 4: Clients
+    if analysis_section == ANALYSIS_SECTIONS[3]:
+        st.markdown("#### Comportement des clients")
+        
+        # Part des revenus par canal : période choisie vs période précédente
+        channel_now = cube.query(['revenue'], by=['channel'], where={'date': (period_start, period_end)})['revenue']
+        channel_prev = cube.query(['revenue'], by=['channel'], where={'date': (prev_start, prev_end)})['revenue']
+        share_now = channel_now / channel_now.sum() * 100
+        share_prev = (channel_prev / channel_prev.sum() * 100).reindex(share_now.index, fill_value=0)
+        
+        col1, col2, col3 = st.columns(3)
         
-        Analyse des campagnes:
-        - Réseaux sociaux: ROI de 3.2x
-        - Email marketing: Taux d'ouverture 28%
-        - Promotions: Impact moyen +15% revenus
+        for col, channel in zip([col1, col2, col3], ['Livraison', 'Bar', 'Salle']):
+            with col:
+                st.metric(
+                    channel,
+                    f"{share_now.get(channel, 0):.0f}%",
+                    f"{share_now.get(channel, 0) - share_prev.get(channel, 0):+.1f} pts"
+                )
         
-        *Données synchronisées avec vos outils marketing*
-        """)
 
 # TAB 4: Suivi des coûts et revenus
-with tab4:
+if section == SECTIONS[3]:
     st.subheader("Suivi des coûts et revenus")
     
-    finance_tabs = st.tabs([
+    FINANCE_SECTIONS = [
         "💰 Profitabilité",
         "📈 Revenus",
         "💸 Coûts"
-    ])
+    ]
+    finance_section = st.radio("Finances", FINANCE_SECTIONS, horizontal=True, label_visibility="collapsed", key="finance_section")
     
     # SOUS-TAB 1: Profitabilité
-    with finance_tabs[0]:
+    if finance_section == FINANCE_SECTIONS[0]:
+        from optimisation.scenarios import AXES
+        
         st.markdown("#### Vue d'ensemble de la profitabilité")
         
         col1, col2 = st.columns(2)
@@ -1156,37 +1557,33 @@ with tab4:
         with col1:
             st.markdown("##### Répartition revenus vs coûts")
             
-            total_revenue_pie = df_sales['revenue'].sum()
-            estimated_costs = total_revenue_pie * 0.32
-            estimated_margin = total_revenue_pie - estimated_costs
-            
-            fig = go.Figure(data=[go.Pie(
-                labels=['Marge nette', 'Coûts opérationnels'],
-                values=[estimated_margin, estimated_costs],
-                hole=0.5,
-                marker_colors=[COLORS['success'], COLORS['warning']],
-                textinfo='label+percent',
-                textposition='outside'
-            )])
+            # Coûts de la période (nourriture, main d'œuvre, autres) tirés des ventes quotidiennes
+            period_costs = period_sales[['food_cost', 'labor_cost', 'other_costs']].sum()
+            total_costs = period_costs.sum()
+            net_margin = kpis['recent_revenue'] - total_costs
             
-            fig.update_layout(
-                height=400,
-                annotations=[dict(text=f'{(estimated_margin/total_revenue_pie*100):.1f}%<br>Marge', 
-                                 x=0.5, y=0.5, font_size=20, showarrow=False)],
-                font=dict(family='Inter', size=11)
-            )
+            fig = cached_figure(margin_donut_figure, max(net_margin, 0), total_costs)
             
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             st.markdown("##### Performance financière")
             
-            st.success("""
+            revenue = kpis['recent_revenue']
+            share = (period_costs / revenue * 100) if revenue > 0 else period_costs * 0
+            margin_pct = net_margin / revenue * 100 if revenue > 0 else 0
+            prev_revenue = prev_sales['revenue'].sum()
+            prev_cost_pct = prev_sales['total_costs'].sum() / prev_revenue * 100 if prev_revenue > 0 else 0
+            
+            def flag(ok):
+                return "✅" if ok else "⚠️"
+            
+            st.success(f"""
             **💰 Indicateurs clés**
-            - Marge brute: **68%** ✅
-            - Coût nourriture: **28%** ✅
-            - Coût personnel: **32%** ✅
-            - Autres coûts: **12%** ✅
+            - Marge nette: **{margin_pct:.0f}%** {flag(margin_pct >= 15)}
+            - Coût nourriture: **{share['food_cost']:.0f}%** {flag(share['food_cost'] < 32)}
+            - Coût personnel: **{share['labor_cost']:.0f}%** {flag(share['labor_cost'] < 35)}
+            - Autres coûts: **{share['other_costs']:.0f}%**
             """)
             
             st.markdown("---")
@@ -1194,76 +1591,138 @@ with tab4:
             col_a, col_b = st.columns(2)
             
             with col_a:
-                st.metric("Marge brute", "68%", "+2%")
+                st.metric("Marge nette", f"{margin_pct:.0f}%", f"{margin_pct - (100 - prev_cost_pct):+.1f} pts" if prev_revenue > 0 else None)
             
             with col_b:
-                st.metric("Coût total", "32%", "-1%")
+                st.metric("Coût total", f"{100 - margin_pct:.0f}%", f"{(100 - margin_pct) - prev_cost_pct:+.1f} pts" if prev_revenue > 0 else None, delta_color="inverse")
     
-    # SOUS-TAB 2: Revenus
-    with finance_tabs[1]:
-        st.markdown("#### 📊 Prévisions de revenus (30 prochains jours)")
+        st.markdown("---")
         
-        fig = go.Figure()
+        # Planificateur : toutes les combinaisons d'hypothèses sont calculées d'un coup,
+        # la carte de chaleur n'en montre qu'une tranche
+        st.markdown("#### 🧮 Planification budgétaire")
         
-        fig.add_trace(go.Scatter(
-            x=df_forecast['date'],
-            y=df_forecast['predicted_revenue'],
-            mode='lines',
-            name='Revenus prévus',
-            line=dict(color=COLORS['success'], width=3)
-        ))
+        SCENARIO_AXES = {
+            'food_cost_pct': "Coût nourriture (%)",
+            'hourly_rate': "Taux horaire ($)",
+            'avg_ticket': "Ticket moyen ($)",
+            'seats': "Places",
+        }
+        SCENARIO_METRICS = {
+            'net_margin_pct': "Marge nette (%)",
+            'prime_cost_pct': "Coût principal (%)",
+            'break_even_covers': "Seuil de rentabilité (couverts/jour)",
+        }
         
-        fig.add_trace(go.Scatter(
-            x=df_forecast['date'],
-            y=df_forecast['confidence_upper'],
-            mode='lines',
-            name='Intervalle confiance',
-            line=dict(width=0),
-            showlegend=False
-        ))
+        scenario_grid = load_scenario_grid(DATA_VERSION, period_start, period_end)
+        current = scenario_grid.current()
         
-        fig.add_trace(go.Scatter(
-            x=df_forecast['date'],
-            y=df_forecast['confidence_lower'],
-            mode='lines',
-            fill='tonexty',
-            fillcolor='rgba(16, 185, 129, 0.1)',
-            line=dict(width=0),
-            name='Intervalle confiance',
-            showlegend=True
-        ))
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(SCENARIO_METRICS['net_margin_pct'], f"{current['net_margin_pct']:.1f}%", "Cible: 15-20%", delta_color="off")
+        with col2:
+            st.metric(SCENARIO_METRICS['prime_cost_pct'], f"{current['prime_cost_pct']:.1f}%", "Cible: < 60%", delta_color="off")
+        with col3:
+            st.metric(
+                SCENARIO_METRICS['break_even_covers'], f"{current['break_even_covers']:.0f}",
+                f"{scenario_grid.base['covers_per_seat'] * scenario_grid.base['seats']:.0f} couverts/jour actuellement", delta_color="off"
+            )
+        st.caption("Hypothèses actuelles de la période ; main d'œuvre et autres coûts fixes, nourriture proportionnelle aux ventes.")
+        
+        # Libellés affichés -> noms des axes et indicateurs
+        axis_names = {label: axis for axis, label in SCENARIO_AXES.items()}
+        metric_names = {label: metric for metric, label in SCENARIO_METRICS.items()}
         
-        fig.update_layout(
-            height=400,
-            hovermode='x unified',
-            yaxis_title="Revenus ($)",
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family='Inter', size=11)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            scenario_metric = metric_names[st.selectbox("Indicateur", list(metric_names), key="scenario_metric")]
+        with col2:
+            scenario_x = axis_names[st.selectbox("Axe horizontal", list(axis_names), key="scenario_x")]
+        with col3:
+            y_options = [label for label, axis in axis_names.items() if axis != scenario_x]
+            scenario_y = axis_names[st.selectbox("Axe vertical", y_options, index=1, key="scenario_y")]
+        
+        # Hypothèses hors des axes : valeurs de la grille, actuelles par défaut
+        fixed = {}
+        columns = st.columns(2)
+        for column, axis in zip(columns, [axis for axis in AXES if axis not in (scenario_x, scenario_y)]):
+            values = [value if value % 1 else int(value) for value in scenario_grid.axes[axis].tolist()]
+            with column:
+                fixed[axis] = st.select_slider(
+                    SCENARIO_AXES[axis], values, value=values[scenario_grid.nearest(axis, scenario_grid.base[axis])],
+                    key=f"scenario_{axis}"
+                )
+        
+        scenario_table = scenario_grid.slice(scenario_metric, scenario_x, scenario_y, **fixed)
+        fig = cached_figure(
+            scenario_heatmap_figure, scenario_table,
+            metric_label=SCENARIO_METRICS[scenario_metric],
+            x_title=SCENARIO_AXES[scenario_x],
+            y_title=SCENARIO_AXES[scenario_y],
+            reverse=scenario_metric != 'net_margin_pct',
+            current_x=scenario_grid.base[scenario_x],
+            current_y=scenario_grid.base[scenario_y],
         )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # SOUS-TAB 2: Revenus
+    if finance_section == FINANCE_SECTIONS[1]:
+        from optimisation.backtest import MIN_TRAIN_DAYS, MODELS
         
-        fig.update_xaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
-        fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
+        st.markdown("#### 📊 Prévisions de revenus (30 prochains jours)")
+        
+        forecaster = load_forecaster()
+        df_forecast = forecaster.forecast()
+        forecast_backtest = load_backtest()
+        
+        # Prévisions de nuit : remplacent le calcul à la volée quand le magasin existe
+        forecast_manifest = None
+        manifest_path = os.path.join(FORECASTS_PATH, 'manifest.json') if FORECASTS_PATH else None
+        if manifest_path and os.path.exists(manifest_path):
+            stored_forecasts = load_stored_forecasts(FORECASTS_PATH, df_sales['location'].iloc[0], os.stat(manifest_path).st_mtime_ns)
+            # Établissement absent de l'exécution publiée (lot en échec, exécution ancienne) : calcul à la volée
+            if stored_forecasts[0].empty:
+                st.info("Aucune prévision de nuit pour cet établissement dans le dernier calcul : prévisions calculées à la volée.")
+            else:
+                df_forecast, df_next_7_days, df_next_3_months, forecast_manifest = stored_forecasts
+        
+        if forecast_manifest:
+            st.caption(f"Prévisions calculées le {forecast_manifest['generated_at'][:10]} (données jusqu'au {forecast_manifest['last_date']})")
+        
+        fig = cached_figure(forecast_figure, df_forecast)
         
         st.plotly_chart(fig, use_container_width=True)
+        downsampled_caption(len(df_forecast))
         
         col1, col2, col3 = st.columns(3)
         
         predicted_total = df_forecast['predicted_revenue'].sum()
+        last_30_revenue = sales_slicer.slice(forecaster.last_date - timedelta(days=forecaster.horizon - 1), None)['revenue'].sum()
         
         with col1:
             st.metric(
                 "Revenus prévus (30j)",
                 f"{predicted_total:,.0f} $",
-                "+15.2%"
+                f"{(predicted_total - last_30_revenue) / last_30_revenue * 100 if last_30_revenue > 0 else 0:+.1f}%"
             )
         
         with col2:
-            st.metric(
-                "Précision du modèle",
-                "94.3%",
-                "Basé sur 18 mois"
-            )
+            # Historique trop court pour un backtest : précision d'ajustement
+            if forecast_backtest.empty:
+                st.metric(
+                    "Précision du modèle",
+                    f"{forecaster.accuracy.mean():.1f}%",
+                    f"Ajustement sur {forecaster.history_days} jours",
+                    delta_color="off"
+                )
+            else:
+                forecast_scores = forecast_backtest.loc[next(iter(MODELS))]
+                st.metric(
+                    "Précision du modèle",
+                    f"{forecast_scores['accuracy']:.1f}%",
+                    f"Backtest sur {forecast_scores['folds']:.0f} origines, couverture {forecast_scores['coverage_pct']:.0f}%",
+                    delta_color="off"
+                )
         
         with col3:
             best_day_rev = df_forecast.loc[df_forecast['predicted_revenue'].idxmax()]
@@ -1273,43 +1732,37 @@ with tab4:
                 f"{best_day_rev['predicted_revenue']:.0f} $"
             )
         
-        st.markdown("---")
-        
-        st.markdown("#### Tendances hebdomadaires")
-        
-        df_sales['week'] = df_sales['date'].dt.isocalendar().week
-        weekly_data = df_sales.groupby('week').agg({
-            'revenue': 'sum',
-            'covers': 'sum'
-        }).reset_index()
+        with st.expander("Comparer les modèles de prévision (backtest)"):
+            if forecast_backtest.empty:
+                st.caption(f"Historique insuffisant pour un backtest (minimum {MIN_TRAIN_DAYS + forecaster.horizon} jours)")
+            comparison = forecast_backtest[[
+                'accuracy', 'mape', 'bias_pct', 'coverage_pct', 'fit_ms_per_location', 'predict_ms_per_location', 'peak_mb_per_location'
+            ]].round(2)
+            comparison.columns = [
+                'Précision %', 'MAPE %', 'Biais %', 'Couverture %', 'Ajustement (ms/étab.)', 'Prévision (ms/étab.)', 'Mémoire (Mo/étab.)'
+            ]
+            st.dataframe(comparison, use_container_width=True)
         
-        fig = go.Figure()
+        st.markdown("---")
         
-        fig.add_trace(go.Scatter(
-            x=weekly_data['week'],
-            y=weekly_data['revenue'],
-            name='Revenus hebdo',
-            mode='lines+markers',
-            line=dict(color=COLORS['primary'], width=3),
-            marker=dict(size=8)
-        ))
+        # Grain adapté à la durée : quotidien jusqu'à 2 semaines, hebdomadaire au-delà
+        trend_grain = 'date' if kpis['days'] <= 14 else 'week'
+        trend_name = 'Revenus quotidiens' if trend_grain == 'date' else 'Revenus hebdo'
+        st.markdown(f"#### Tendances {'quotidiennes' if trend_grain == 'date' else 'hebdomadaires'} – {period_label}")
         
-        fig.update_layout(
-            height=400,
-            hovermode='x unified',
-            yaxis=dict(title="Revenus ($)"),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family='Inter', size=11)
-        )
+        weekly_data = cube.query(
+            ['revenue', 'covers'], by=[trend_grain], where={'date': (period_start, period_end)}
+        ).reset_index()
         
-        fig.update_xaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)', title="Semaine")
-        fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.05)')
+        fig = cached_figure(revenue_trend_figure, weekly_data, trend_grain=trend_grain, trend_name=trend_name)
         
         st.plotly_chart(fig, use_container_width=True)
+        downsampled_caption(len(weekly_data))
     
     # SOUS-TAB 3: Coûts
-    with finance_tabs[2]:
+    if finance_section == FINANCE_SECTIONS[2]:
+        from optimisation.labor import PEAK_HOURS, SLOW_HOURS, efficiency_summary
+        
         st.markdown("#### Coûts de main d'œuvre")
         
         col1, col2 = st.columns([1, 2])
@@ -1317,49 +1770,61 @@ with tab4:
         with col1:
             st.markdown("##### Répartition des coûts")
             
-            fig = go.Figure(data=[go.Pie(
-                labels=df_staff['position'],
-                values=df_staff['monthly_cost'],
-                hole=0.4,
-                marker_colors=[COLORS['primary'], COLORS['secondary'], COLORS['accent'], COLORS['success'], COLORS['warning'], COLORS['text']]
-            )])
+            fig = cached_figure(staff_cost_figure, df_staff[['position', 'monthly_cost']], height=350, font_size=10)
             
-            fig.update_layout(
-                height=350,
-                font=dict(family='Inter', size=10)
-            )
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             st.markdown("##### Analyse des coûts")
             
-            st.info("""
+            # Ratio ventes / coût de main d'œuvre aux heures de pointe et creuses, tiré des pointages
+            period_labor = load_labor().slice(period_start, period_end)
+            labor_by_hour = efficiency_summary(period_labor)
+            hour = labor_by_hour['hour_num']
+            peak = labor_by_hour[in_service(hour, PEAK_HOURS)][['revenue', 'labor_cost']].sum()
+            slow = labor_by_hour[in_service(hour, SLOW_HOURS)][['revenue', 'labor_cost']].sum()
+            peak_ratio = peak['revenue'] / peak['labor_cost'] if peak['labor_cost'] > 0 else 0
+            slow_ratio = slow['revenue'] / slow['labor_cost'] if slow['labor_cost'] > 0 else 0
+            labor_totals = labor_by_hour[['labor_hours', 'labor_cost', 'revenue']].sum()
+            sales_per_labor_hour = labor_totals['revenue'] / labor_totals['labor_hours'] if labor_totals['labor_hours'] > 0 else 0
+            
+            st.info(f"""
             **📊 Ratio coûts vs revenus**
             
-            - Heures de pointe (18h-21h): Ratio optimal 1:3.2
-            - Heures creuses (14h-17h): Ratio élevé 1:1.8
+            - Heures de pointe ({PEAK_HOURS[0]}h-{PEAK_HOURS[1]}h): Ratio 1:{peak_ratio:.1f}
+            - Heures creuses ({SLOW_HOURS[0]}h-{SLOW_HOURS[1]}h): Ratio 1:{slow_ratio:.1f}
             
-            **Efficacité de la planification: 85%**
+            **Ventes par heure travaillée: {sales_per_labor_hour:,.0f}$**
             """)
             
             st.markdown("---")
             
             col1, col2, col3, col4 = st.columns(4)
             
-            total_staff_cost = df_staff['monthly_cost'].sum()
+            labor_days = max(period_labor['date'].nunique(), 1)
             
             with col1:
-                st.metric("Coût total", f"{total_staff_cost:,.0f}$/mois", "-2.3%")
+                st.metric("Coût pointé", f"{labor_totals['labor_cost'] / labor_days:,.0f}$/jour", f"{labor_totals['labor_hours'] / labor_days:,.0f} h/jour", delta_color="off")
             
             with col2:
-                labor_pct = (total_staff_cost / df_sales['revenue'].tail(30).sum() * 100)
+                labor_pct = labor_totals['labor_cost'] / labor_totals['revenue'] * 100 if labor_totals['revenue'] > 0 else 0
                 st.metric("% Coût travail", f"{labor_pct:.1f}%", "Cible: 30-35%")
             
             with col3:
-                st.metric("Taux rotation", "12%/an", "-3%")
+                peak_share = peak['labor_cost'] / labor_totals['labor_cost'] * 100 if labor_totals['labor_cost'] > 0 else 0
+                st.metric("Coût en pointe", f"{peak_share:.0f}%", f"du coût pointé ({PEAK_HOURS[0]}h-{PEAK_HOURS[1]}h)", delta_color="off")
             
             with col4:
-                st.metric("Productivité", "1,847$/employé", "+5.2%")
+                st.metric("Productivité", f"{sales_per_labor_hour:,.0f}$/heure", "ventes par heure travaillée", delta_color="off")
+        
+        st.markdown("##### Coût de main d'œuvre par heure")
+        
+        fig = cached_figure(
+            labor_hourly_figure, efficiency_summary(period_labor, by=['hour_num', 'position']), labor_by_hour, days=labor_days
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"Pointages répartis sur les heures travaillées ; budget mensuel du personnel : {df_staff['monthly_cost'].sum():,.0f}$.")
 
 # Footer
 st.markdown("---")
@@ -1368,4 +1833,22 @@ st.markdown(f"""
     <p style='margin: 0; font-weight: 500;'>Optimisation+ | Plateforme BI Restaurant</p>
     <p style='margin: 0.5rem 0 0 0; opacity: 0.7;'>Données mises à jour en temps réel © 2025</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Mesures de démarrage : journalisées et affichées dans la barre latérale
+# (hors tableau de bord, le premier affichage est celui de la section ouverte)
+startup_timer.mark('first_paint')
+startup_timer.mark('total')
+startup_timer.report()
+over_budget = startup_timer.over_budget()
+with startup_panel.container():
+    with st.expander("⏱️ Démarrage" + (" à froid" if startup_timer.cold else "")):
+        for phase, elapsed in startup_timer.phases.items():
+            budget = startup_timer.budget.get(phase)
+            flag = "🔴" if phase in over_budget else "🟢"
+            st.caption(f"{flag} {phase}: {elapsed:.2f} s" + (f" (budget {budget:.1f} s)" if budget else ""))
+        cache_stats = compute_cache.stats()
+        st.caption(
+            f"🗄️ Cache: {cache_stats['entries']} entrées, {cache_stats['bytes'] / 2**20:.1f} Mo, "
+            f"{cache_stats['hit_rate'] * 100:.0f}% de succès ({cache_stats['evictions']} évictions)"
+        )
@@ -0,0 +1,4 @@
+"""Cœur de calcul d'Optimisation+ (sans dépendance à Streamlit)."""
+from optimisation.generation import generate_data
+
+__all__ = ['generate_data']
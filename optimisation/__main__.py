@@ -0,0 +1,3 @@
+from optimisation.cli import main
+
+main()
@@ -0,0 +1,204 @@
+"""Backtest à origine glissante des modèles de prévision.
+
+À chaque origine, le modèle est ajusté sur l'historique disponible à cette
+date puis comparé aux `horizon` jours suivants. Chaque pli enregistre les
+erreurs par établissement (MAPE, biais, couverture de l'intervalle) ainsi que
+le coût du modèle par établissement : durées d'ajustement et de prévision,
+pic mémoire.
+
+    python -m optimisation.backtest --days 365 --locations 50 --step 14
+"""
+import argparse
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from optimisation.forecast import FORECAST_DAYS, INTERVAL_QUANTILES, RevenueForecaster
+
+
+class SeasonalNaiveForecaster:
+    """Référence : moyenne des `weeks` derniers mêmes jours de semaine.
+
+    Même interface que `RevenueForecaster` ; l'intervalle vient des résidus
+    de la même règle appliquée à l'historique.
+    """
+
+    def __init__(self, horizon=FORECAST_DAYS, measure='revenue', weeks=1):
+        self.horizon = horizon
+        self.measure = measure
+        self.weeks = weeks
+        self.last_date = None
+        self.locations = None
+
+    def fit(self, df_sales):
+        values = df_sales.pivot_table(index='date', columns='location', values=self.measure, observed=True)
+        self.last_date = df_sales['date'].max()
+        self.locations = list(df_sales['location'].unique())
+        dates = pd.date_range(values.index.min(), self.last_date, freq='D')
+        Y = values.reindex(index=dates, columns=self.locations).to_numpy(dtype=float)
+
+        # Résidus historiques de la règle : valeur - moyenne des mêmes jours des semaines précédentes
+        lags = np.full((self.weeks,) + Y.shape, np.nan)
+        for k in range(1, self.weeks + 1):
+            lags[k - 1, 7 * k:] = Y[:len(Y) - 7 * k]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.interval = np.nan_to_num(np.nanquantile(Y - np.nanmean(lags, axis=0), INTERVAL_QUANTILES, axis=0))
+
+            # Profil (jours de semaine × établissements) des dernières semaines complètes
+            weeks = max(min(self.weeks, len(Y) // 7), 1)
+            recent = Y[-7 * weeks:].reshape(weeks, -1, Y.shape[1]).mean(axis=0) if len(Y) >= 7 else Y
+        self._profile = np.roll(recent, self.last_date.dayofweek + 1, axis=0)
+        return self
+
+    def forecast(self):
+        dates = pd.date_range(self.last_date + pd.Timedelta(days=1), periods=self.horizon, freq='D')
+        predicted = np.nan_to_num(self._profile[np.asarray(dates.dayofweek) % len(self._profile)])
+
+        n_locations = len(self.locations)
+        locations = np.asarray(self.locations, dtype=object)
+        return pd.DataFrame({
+            'date': dates[np.repeat(np.arange(self.horizon), n_locations)],
+            'location': pd.Categorical(np.tile(locations, self.horizon), categories=sorted(self.locations)),
+            f'predicted_{self.measure}': np.maximum(predicted, 0).ravel(),
+            'confidence_lower': np.maximum(predicted + self.interval[0], 0).ravel(),
+            'confidence_upper': np.maximum(predicted + self.interval[1], 0).ravel(),
+        })
+
+
+# Historique minimal avant la première origine (8 semaines)
+MIN_TRAIN_DAYS = 56
+
+# Modèles comparés par défaut : nom -> fabrique(horizon, mesure)
+MODELS = {
+    'Régression (jour, tendance, fériés)': lambda horizon, measure: RevenueForecaster(horizon, measure),
+    'Naïf saisonnier (S-1)': lambda horizon, measure: SeasonalNaiveForecaster(horizon, measure, weeks=1),
+    'Moyenne 4 semaines': lambda horizon, measure: SeasonalNaiveForecaster(horizon, measure, weeks=4),
+}
+
+
+def rolling_origins(dates, horizon=FORECAST_DAYS, step=7, min_train=MIN_TRAIN_DAYS):
+    """Dernier jour d'entraînement de chaque pli, du plus ancien au plus récent."""
+    dates = pd.DatetimeIndex(sorted(pd.unique(dates)))
+    last_origin = dates[-1] - pd.Timedelta(days=horizon)
+    origins = pd.date_range(dates[0] + pd.Timedelta(days=min_train - 1), last_origin, freq=f'{step}D')
+    # Ancrage sur la fin de l'historique : le dernier pli utilise les données les plus récentes
+    if len(origins):
+        origins = origins + (last_origin - origins[-1])
+    return origins
+
+
+def backtest(df_sales, models=None, horizon=FORECAST_DAYS, step=7, min_train=MIN_TRAIN_DAYS, measure='revenue'):
+    """Rejoue l'historique de `df_sales` pour chaque modèle.
+
+    Retourne `(folds, scores)` : `folds` a une ligne par (modèle, origine) avec
+    le coût par établissement (millisecondes d'ajustement et de prévision, pic
+    mémoire du pli en Mo divisé par le nombre d'établissements) ; `scores` a
+    une ligne par (modèle, établissement) avec `mape`, `bias_pct`,
+    `coverage_pct` et `accuracy` (100 - MAPE).
+    """
+    models = MODELS if models is None else models
+    df_sales = df_sales.sort_values('date', kind='stable', ignore_index=True)
+    dates = df_sales['date'].to_numpy()
+    origins = rolling_origins(df_sales['date'], horizon, step, min_train)
+    n_locations = df_sales['location'].nunique()
+
+    fold_rows, errors = [], []
+    for origin in origins:
+        train = df_sales.iloc[:np.searchsorted(dates, np.datetime64(origin), 'right')]
+        test_end = np.searchsorted(dates, np.datetime64(origin + pd.Timedelta(days=horizon)), 'right')
+        actual = df_sales.iloc[len(train):test_end][['date', 'location', measure]]
+
+        for name, factory in models.items():
+            tracemalloc.start()
+            started = time.perf_counter()
+            model = factory(horizon, measure).fit(train)
+            fitted = time.perf_counter()
+            predicted = model.forecast()
+            predicted_at = time.perf_counter()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            fold_rows.append({
+                'model': name,
+                'origin': origin,
+                'train_days': train['date'].nunique(),
+                'fit_ms_per_location': (fitted - started) * 1000 / n_locations,
+                'predict_ms_per_location': (predicted_at - fitted) * 1000 / n_locations,
+                'peak_mb_per_location': peak / 1e6 / n_locations,
+            })
+
+            scored = actual.merge(predicted, on=['date', 'location'], how='inner')
+            errors.append(pd.DataFrame({
+                'model': name,
+                'location': scored['location'].astype(str),
+                'actual': scored[measure],
+                'error': scored[f'predicted_{measure}'] - scored[measure],
+                'covered': scored[measure].between(scored['confidence_lower'], scored['confidence_upper']),
+            }))
+
+    folds = pd.DataFrame(fold_rows)
+    if not errors:
+        return folds, pd.DataFrame(columns=['model', 'location', 'mape', 'bias_pct', 'coverage_pct', 'accuracy'])
+
+    errors = pd.concat(errors, ignore_index=True)
+    errors['ape'] = (errors['error'].abs() / errors['actual'].where(errors['actual'] > 0)) * 100
+    grouped = errors.groupby(['model', 'location'], sort=False)
+    scores = pd.DataFrame({
+        'mape': grouped['ape'].mean(),
+        'bias_pct': grouped['error'].sum() / grouped['actual'].sum() * 100,
+        'coverage_pct': grouped['covered'].mean() * 100,
+    }).reset_index()
+    scores['accuracy'] = 100 - scores['mape']
+    return folds, scores
+
+
+def summarize(folds, scores):
+    """Une ligne par modèle : précision et coût moyens sur les plis et établissements.
+
+    Vide si l'historique est trop court pour un seul pli.
+    """
+    columns = ['mape', 'bias_pct', 'coverage_pct', 'accuracy', 'folds',
+               'fit_ms_per_location', 'predict_ms_per_location', 'peak_mb_per_location']
+    if folds.empty:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name='model'))
+    accuracy = scores.groupby('model', sort=False)[['mape', 'bias_pct', 'coverage_pct', 'accuracy']].mean()
+    cost = folds.groupby('model', sort=False).agg(
+        folds=('origin', 'size'),
+        fit_ms_per_location=('fit_ms_per_location', 'mean'),
+        predict_ms_per_location=('predict_ms_per_location', 'mean'),
+        peak_mb_per_location=('peak_mb_per_location', 'max'),
+    )
+    return accuracy.join(cost)[columns]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest à origine glissante des modèles de prévision")
+    parser.add_argument('--tickets', default=None, help="Export de tickets POS (sinon données de démonstration)")
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--locations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--horizon', type=int, default=FORECAST_DAYS)
+    parser.add_argument('--step', type=int, default=7)
+    parser.add_argument('--min-train', type=int, default=MIN_TRAIN_DAYS)
+    parser.add_argument('--measure', default='revenue', choices=['revenue', 'covers'])
+    args = parser.parse_args(argv)
+
+    if args.tickets:
+        from optimisation.ingestion import ingest_tickets
+        df_sales = ingest_tickets(args.tickets)[0]
+    else:
+        from optimisation.generation import generate_data
+        df_sales = generate_data(days=args.days, locations=args.locations, seed=args.seed)[0]
+
+    folds, scores = backtest(df_sales, horizon=args.horizon, step=args.step, min_train=args.min_train,
+                             measure=args.measure)
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(summarize(folds, scores).round(3))
+
+
+if __name__ == '__main__':
+    main()
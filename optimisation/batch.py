@@ -0,0 +1,176 @@
+"""Calcul de nuit des prévisions de tous les établissements.
+
+Les établissements sont répartis en lots traités par un pool de processus.
+Chaque lot écrit ses tables de prévision en Parquet dans le répertoire de
+l'exécution (`runs/<horodatage>`) ; un lot en échec est relancé jusqu'à
+`retries` fois, dans un nouveau pool (un processus mort rend le précédent
+inutilisable). Une fois tous les lots réussis, `manifest.json` est écrit en
+dernier et remplacé atomiquement : il décrit l'exécution (dernier jour, lots,
+durées) et désigne son répertoire, si bien qu'un lecteur voit toujours un
+jeu de tables complet et cohérent.
+
+    python -m optimisation.batch magasin/previsions --tickets exports/tickets --workers 8
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from optimisation.forecast import forecast_tables
+
+TABLES = ['forecast', 'next_7_days', 'next_3_months']
+MANIFEST = 'manifest.json'
+RUNS = 'runs'
+
+# Exécutions conservées : la publiée et la précédente (lecteurs en cours)
+KEEP_RUNS = 2
+
+
+def shard_locations(locations, shards):
+    """Répartit les établissements en `shards` lots de tailles voisines."""
+    return [list(part) for part in np.array_split(np.asarray(locations, dtype=object), shards) if len(part)]
+
+
+def _run_shard(shard_id, df_sales, run_dir):
+    # Exécuté dans un processus du pool : calcule et écrit les tables d'un lot
+    started = time.perf_counter()
+    for name, table in zip(TABLES, forecast_tables(df_sales)):
+        table = table.assign(location=table['location'].astype(str))
+        os.makedirs(os.path.join(run_dir, name), exist_ok=True)
+        table.to_parquet(os.path.join(run_dir, name, f"shard-{shard_id:05d}.parquet"), index=False)
+    return time.perf_counter() - started
+
+
+def run_batch(df_sales, path, workers=None, shards=None, retries=2, progress=None):
+    """Calcule les prévisions de tous les établissements de `df_sales` et les publie dans `path`.
+
+    `shards` vaut par défaut quatre lots par processus. `progress` reçoit le
+    dictionnaire de statistiques après chaque lot terminé. Lève `RuntimeError`
+    si des lots échouent encore après `retries` relances ; le magasin existant
+    reste alors intact.
+    """
+    workers = workers or os.cpu_count() or 1
+    locations = sorted(df_sales['location'].unique())
+    shards = shard_locations(locations, shards or workers * 4)
+
+    run = pd.Timestamp.now().strftime('%Y%m%dT%H%M%S%f')
+    run_dir = os.path.join(path, RUNS, run)
+    os.makedirs(run_dir)
+
+    started = time.perf_counter()
+    by_location = df_sales.groupby('location', observed=True, sort=False)
+    stats = {'shards': len(shards), 'done': 0, 'retried': 0, 'timings': {}, 'errors': {}}
+
+    pending = list(range(len(shards)))
+    attempts = dict.fromkeys(pending, 0)
+    while pending:
+        # Un pool par tour : un lot qui tue son processus (BrokenProcessPool) ne condamne pas les relances
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_run_shard, i, pd.concat([by_location.get_group(loc) for loc in shards[i]]), run_dir): i
+                for i in pending
+            }
+            pending = []
+            for future in as_completed(futures):
+                i = futures[future]
+                attempts[i] += 1
+                try:
+                    stats['timings'][i] = future.result()
+                except Exception as exc:
+                    stats['errors'][i] = repr(exc)
+                    if attempts[i] <= retries:
+                        stats['retried'] += 1
+                        pending.append(i)
+                    continue
+                stats['errors'].pop(i, None)
+                stats['done'] += 1
+                if progress is not None:
+                    progress(dict(stats, shard=i, locations=len(shards[i])))
+
+    if stats['errors']:
+        shutil.rmtree(run_dir, ignore_errors=True)
+        failed = ', '.join(str(i) for i in sorted(stats['errors']))
+        raise RuntimeError(f"Lots en échec après {retries} relances: {failed}")
+
+    stats['seconds'] = time.perf_counter() - started
+    manifest = {
+        'generated_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'run': run,
+        'last_date': str(df_sales['date'].max().date()),
+        'locations': len(locations),
+        'shards': len(shards),
+        'workers': workers,
+        'seconds': round(stats['seconds'], 3),
+        'shard_seconds': {str(i): round(t, 3) for i, t in sorted(stats['timings'].items())},
+    }
+
+    # Publication : le manifeste, écrit en dernier, bascule d'un coup vers le répertoire de l'exécution
+    pending_manifest = os.path.join(path, f".{MANIFEST}.{run}")
+    with open(pending_manifest, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(pending_manifest, os.path.join(path, MANIFEST))
+
+    for old in sorted(os.listdir(os.path.join(path, RUNS)))[:-KEEP_RUNS]:
+        if old != run:
+            shutil.rmtree(os.path.join(path, RUNS, old), ignore_errors=True)
+    return stats
+
+
+def read_forecasts(path, location=None):
+    """Lit le magasin : `(df_forecast, df_next_7_days, df_next_3_months, manifest)`.
+
+    Les tables sont celles de l'exécution désignée par le manifeste.
+    `location` restreint les tables à un établissement.
+    """
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    run = os.path.join(path, RUNS, manifest['run'])
+    filters = None if location is None else [('location', '==', str(location))]
+    tables = []
+    for name in TABLES:
+        table = pd.read_parquet(os.path.join(run, name), filters=filters)
+        table['location'] = pd.Categorical(table['location'], categories=sorted(table['location'].unique()))
+        # Lots concaténés : retour à l'ordre période puis établissement
+        if 'date' in table.columns:
+            table = table.sort_values(['date', 'location'], kind='stable', ignore_index=True)
+        else:
+            rank = table.groupby('location', observed=True).cumcount()
+            table = table.iloc[np.lexsort((table['location'].cat.codes, rank))].reset_index(drop=True)
+        tables.append(table)
+    return (*tables, manifest)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prévisions de nuit pour tous les établissements")
+    parser.add_argument('path', help="Répertoire du magasin de prévisions")
+    parser.add_argument('--tickets', default=None, help="Export de tickets POS (sinon données de démonstration)")
+    parser.add_argument('--days', type=int, default=365, help="Historique simulé sans --tickets")
+    parser.add_argument('--locations', type=int, default=1, help="Établissements simulés sans --tickets")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shards', type=int, default=None)
+    parser.add_argument('--retries', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.tickets:
+        from optimisation.ingestion import ingest_tickets
+        df_sales = ingest_tickets(args.tickets)[0]
+    else:
+        from optimisation.generation import generate_data
+        df_sales = generate_data(days=args.days, locations=args.locations, seed=args.seed)[0]
+
+    def report(stats):
+        print(f"lot {stats['shard']} ({stats['locations']} établissements): "
+              f"{stats['timings'][stats['shard']]:.2f} s [{stats['done']}/{stats['shards']}]", flush=True)
+
+    stats = run_batch(df_sales, args.path, args.workers, args.shards, args.retries, progress=report)
+    print(f"Terminé: {stats['shards']} lots en {stats['seconds']:.1f} s ({stats['retried']} relances)")
+
+
+if __name__ == '__main__':
+    main()
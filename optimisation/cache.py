@@ -0,0 +1,177 @@
+"""Cache des calculs coûteux, lié à la version des données.
+
+Les entrées sont indexées par une empreinte de la source (métadonnées des
+fichiers de l'export, ou graine et jour pour la démonstration) : une nouvelle
+ingestion change l'empreinte et les anciens résultats ne sont plus servis. Le
+cache est borné en nombre d'entrées et en mémoire estimée (éviction LRU), avec
+une durée de vie optionnelle et des statistiques de succès/échecs.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+
+def source_fingerprint(path=None, seed=None):
+    """Empreinte de la source de données.
+
+    Pour un fichier ou un répertoire (export partitionné) : chemin relatif,
+    taille et date de modification de chaque fichier. Sans export : graine
+    et jour courant, les données de démonstration se terminant aujourd'hui.
+    """
+    if not path:
+        return f"demo:{seed}:{pd.Timestamp.now().date()}"
+
+    digest = hashlib.sha1()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                stat = os.stat(os.path.join(root, name))
+                digest.update(f"{os.path.relpath(os.path.join(root, name), path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    else:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return f"{path}:{digest.hexdigest()[:16]}"
+
+
+def data_key(*values):
+    """Empreinte du contenu de tables, tableaux ou valeurs simples (clé de cache par données)."""
+    digest = hashlib.sha1()
+    for value in values:
+        if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+            digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+            digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        elif isinstance(value, np.ndarray):
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def estimate_bytes(value, _seen=None):
+    """Taille mémoire approximative d'un résultat (tableaux, DataFrames, objets composés)."""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        try:
+            usage = value.memory_usage(deep=True)
+        except ValueError:
+            # Tampons d'objets en lecture seule (copie à l'écriture) : taille sans le contenu des chaînes
+            usage = value.memory_usage()
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_bytes(item, seen) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_bytes(k, seen) + estimate_bytes(v, seen) for k, v in value.items()
+        )
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_bytes(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+class ComputeCache:
+    """Cache LRU borné (entrées et octets) avec durée de vie optionnelle (`ttl`, en secondes).
+
+    Partagé entre les sessions : les accès sont protégés par un verrou, le
+    calcul lui-même se fait hors verrou.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # clé -> (valeur, octets, expiration)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(['hits', 'misses', 'evictions', 'expirations', 'oversize'], 0)
+
+    def _drop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def get(self, key):
+        """Retourne `(trouvé, valeur)`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                self._drop(key)
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        nbytes = estimate_bytes(value)
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            # Un résultat plus grand que tout le budget n'est pas conservé
+            if nbytes > self.max_bytes:
+                self._stats['oversize'] += 1
+                return value
+            self._entries[key] = (value, nbytes, expires)
+            self._bytes += nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        found, value = self.get(key)
+        return value if found else self.put(key, compute())
+
+    def memoize(self, func):
+        """Décorateur : clé = nom de la fonction et arguments (valeurs par défaut incluses).
+
+        Les arguments doivent être hachables ; passer l'empreinte des données
+        en argument pour lier le résultat à leur version.
+        """
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__qualname__,) + tuple(bound.arguments.items())
+            return self.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Succès, échecs, évictions, expirations, entrées et octets occupés."""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                hit_rate=self._stats['hits'] / lookups if lookups else 0.0,
+            )
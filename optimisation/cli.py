@@ -0,0 +1,69 @@
+"""Ligne de commande : KPIs, feux et recommandations en JSON.
+
+    python -m optimisation --locations 3 --period "4 semaines roulantes"
+    python -m optimisation --tickets exports/tickets --location R001 --location R002
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from optimisation.insights import location_reports
+from optimisation.periods import CUSTOM_PERIOD, PERIOD_DAYS
+
+
+def _to_json(value):
+    # Types NumPy et pandas rencontrés dans les rapports
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.date().isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def load_frames(tickets=None, days=90, locations=1, seed=None):
+    """`(df_sales, df_hourly, df_menu, df_menu_sales)` d'un export de tickets ou de la démo."""
+    from optimisation.generation import generate_data, generate_menu_sales
+
+    if tickets is None:
+        data = generate_data(days=days, locations=locations, seed=seed)
+        return data[0], data[1], data[2], generate_menu_sales(days=days, locations=locations, seed=seed)
+
+    from optimisation.ingestion import TicketAggregator, read_ticket_chunks
+
+    aggregator = TicketAggregator()
+    for chunk in read_ticket_chunks(tickets):
+        aggregator.update(chunk)
+    return (*aggregator.frames(), aggregator.menu_sales())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m optimisation', description="KPIs et recommandations en JSON")
+    parser.add_argument('--tickets', default=None, help="Export de tickets POS (sinon données de démonstration)")
+    parser.add_argument('--days', type=int, default=90, help="Historique simulé sans --tickets")
+    parser.add_argument('--locations', type=int, default=1, help="Établissements simulés sans --tickets")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--location', action='append', default=None, help="Établissement à inclure (répétable)")
+    parser.add_argument('--period', default='Cette semaine', choices=list(PERIOD_DAYS))
+    parser.add_argument('--start', default=None, help="Début d'une période personnalisée (AAAA-MM-JJ)")
+    parser.add_argument('--end', default=None, help="Fin d'une période personnalisée (AAAA-MM-JJ)")
+    parser.add_argument('--indent', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    df_sales, df_hourly, df_menu, df_menu_sales = load_frames(args.tickets, args.days, args.locations, args.seed)
+
+    period, custom_range = args.period, None
+    if args.start or args.end:
+        period = CUSTOM_PERIOD
+        custom_range = (args.start or df_sales['date'].min(), args.end or df_sales['date'].max())
+
+    reports = location_reports(df_sales, df_hourly, df_menu, df_menu_sales, period=period,
+                               custom_range=custom_range, locations=args.location)
+    json.dump(reports, sys.stdout, indent=args.indent, ensure_ascii=False, default=_to_json)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Cube d'agrégats pré-calculés (date × heure × catégorie × canal × établissement).
+
+Le cube est construit une fois par rafraîchissement des données. Il contient
+plusieurs cuboïdes matérialisés, chacun à son propre grain (jour, heure, plat
+par canal...) ; une requête est servie par le plus petit cuboïde qui possède
+les dimensions et mesures demandées. Toutes les mesures sont additives, les
+ratios (ticket moyen, marge) sont dérivés après agrégation.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['date', 'hour', 'category', 'name', 'channel', 'location']
+MEASURES = ['revenue', 'covers', 'food_cost', 'labor_cost', 'other_costs', 'qty']
+
+# Dimensions temporelles dérivées de la date, pré-calculées dans chaque cuboïde daté
+TIME_DIMENSIONS = ['week', 'month', 'day_of_week']
+
+# Métriques proposées dans la barre latérale : mesures requises et formule
+METRICS = {
+    'Revenus': (['revenue'], lambda m: m['revenue']),
+    'Couverts': (['covers'], lambda m: m['covers']),
+    'Ticket moyen': (['revenue', 'covers'], lambda m: m['revenue'] / m['covers'].where(m['covers'] > 0)),
+    'Marge': (
+        ['revenue', 'food_cost', 'labor_cost', 'other_costs'],
+        lambda m: (m['revenue'] - m['food_cost'] - m['labor_cost'] - m['other_costs'])
+        / m['revenue'].where(m['revenue'] > 0) * 100,
+    ),
+}
+
+
+class Cuboid:
+    # Agrégat matérialisé à un grain donné, trié par date pour le découpage par intervalle
+
+    def __init__(self, frame, dims, measures):
+        self.dims = tuple(dims)
+        self.measures = tuple(measures)
+        if 'date' in self.dims:
+            frame = frame.sort_values('date', kind='stable', ignore_index=True)
+            # Calcul sur les dates distinctes puis diffusion aux lignes
+            codes, days = pd.factorize(frame['date'])
+            days = pd.DatetimeIndex(days)
+            frame['week'] = (days - pd.to_timedelta(days.dayofweek, unit='D'))[codes]
+            frame['month'] = days.to_period('M').to_timestamp()[codes]
+            frame['day_of_week'] = np.asarray(days.dayofweek, dtype=np.int8)[codes]
+            self._dates = frame['date'].to_numpy()
+        self.frame = frame
+
+    @property
+    def all_dims(self):
+        return self.dims + (tuple(TIME_DIMENSIONS) if 'date' in self.dims else ())
+
+    def covers(self, dims, measures):
+        return set(dims) <= set(self.all_dims) and set(measures) <= set(self.measures)
+
+    def select(self, where):
+        frame = self.frame
+        where = dict(where or {})
+
+        # Intervalle de dates par recherche binaire sur la colonne triée
+        date_filter = where.pop('date', None)
+        if date_filter is not None:
+            start, end = date_filter
+            lo = 0 if start is None else np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start)), 'left')
+            hi = len(frame) if end is None else np.searchsorted(self._dates, np.datetime64(pd.Timestamp(end)), 'right')
+            frame = frame.iloc[lo:hi]
+
+        for dim, value in where.items():
+            column = frame[dim]
+            if isinstance(value, tuple):
+                mask = column.between(*value)
+            elif isinstance(value, (list, set, frozenset)):
+                mask = column.isin(value)
+            else:
+                mask = column == value
+            frame = frame[mask]
+        return frame
+
+
+class AggregateCube:
+    """Ensemble de cuboïdes interrogeables par tranche (`where`) et agrégation (`by`)."""
+
+    def __init__(self):
+        self.cuboids = []
+
+    def add(self, frame, dims):
+        """Matérialise un cuboïde au grain `dims` à partir d'un tableau détaillé."""
+        measures = [m for m in MEASURES if m in frame.columns]
+        aggregated = (
+            frame.groupby(list(dims), observed=True, sort=False)[measures].sum().reset_index()
+        )
+        self.cuboids.append(Cuboid(aggregated, dims, measures))
+        # Plus petit cuboïde en premier : la première correspondance est la moins coûteuse
+        self.cuboids.sort(key=lambda c: len(c.frame))
+        return self
+
+    def _resolve(self, dims, measures):
+        for cuboid in self.cuboids:
+            if cuboid.covers(dims, measures):
+                return cuboid
+        raise KeyError(f"Aucun agrégat ne couvre les dimensions {sorted(dims)} et mesures {sorted(measures)}")
+
+    def query(self, measures, by=(), where=None):
+        """Somme des `measures` par `by`, après filtrage `where`.
+
+        `where` associe une dimension à une valeur, une liste de valeurs ou un
+        intervalle inclusif `(début, fin)` ; pour `date`, l'intervalle peut
+        avoir une borne `None`.
+        """
+        measures, by = list(measures), list(by)
+        cuboid = self._resolve(set(by) | set(where or {}), measures)
+        frame = cuboid.select(where)
+        if not by:
+            return frame[measures].sum()
+        return frame.groupby(by, observed=True)[measures].sum()
+
+    def metric(self, name, by=('date',), where=None):
+        """Série d'une métrique de `METRICS` (ex: 'Ticket moyen') par `by`."""
+        measures, formula = METRICS[name]
+        return formula(self.query(measures, by=by, where=where))
+
+    @classmethod
+    def from_frames(cls, df_sales, df_hourly, df_menu_sales=None):
+        """Construit le cube à partir des tables quotidienne, horaire et des ventes par plat."""
+        cube = cls()
+        cube.add(df_sales, ['date', 'location'])
+        cube.add(df_hourly.rename(columns={'hour': 'hour_label', 'hour_num': 'hour'}), ['date', 'hour', 'location'])
+        if df_menu_sales is not None:
+            cube.add(df_menu_sales, ['date', 'category', 'name', 'channel', 'location'])
+            cube.add(df_menu_sales, ['date', 'category', 'channel', 'location'])
+        return cube
@@ -0,0 +1,85 @@
+"""Réduction des séries longues avant l'affichage.
+
+Une courbe n'a pas besoin de plus de points que de pixels : au-delà de
+`CHART_POINTS`, les séries sont réduites par LTTB (Largest-Triangle-Three-
+Buckets, qui conserve la forme) ou par minimum/maximum de chaque intervalle
+(qui garantit les pics, comme les rushs du vendredi, et les creux).
+"""
+import numpy as np
+import pandas as pd
+
+# Points conservés par série : de l'ordre de la largeur d'un graphique en pixels
+CHART_POINTS = 800
+
+
+def _numeric(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return values.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    """Positions des `n_out` points retenus par LTTB (premier et dernier inclus)."""
+    x, y = _numeric(x), _numeric(y)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 intervalles entre le premier et le dernier point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # Aire du triangle (point retenu précédent, candidat, moyenne de l'intervalle suivant)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def minmax_indices(y, n_out):
+    """Positions du minimum et du maximum de `n_out // 2` intervalles, plus les extrémités."""
+    y = _numeric(y)
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, max(n_out // 2, 1) + 1).astype(np.int64)
+    picked = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            chunk = y[start:end]
+            picked += [start + int(np.nanargmin(chunk)), start + int(np.nanargmax(chunk))]
+    return np.unique(picked)
+
+
+def downsample(data, x=None, columns=None, max_points=CHART_POINTS, method='lttb'):
+    """Lignes de `data` à afficher, triées selon `x`.
+
+    `data` est un DataFrame (`x` : colonne des abscisses, `columns` : séries
+    tracées, toutes par défaut) ou une Series indexée par les abscisses. Avec
+    plusieurs séries, les points retenus pour chacune sont réunis afin que
+    les séries (ex. prévision et bornes de l'intervalle) restent alignées.
+    `method` vaut 'lttb' ou 'minmax'.
+    """
+    if len(data) <= max_points:
+        return data
+
+    if isinstance(data, pd.Series):
+        x_values, series = data.index, [data]
+    else:
+        columns = columns or [col for col in data.columns if col != x]
+        x_values, series = data[x], [data[col] for col in columns]
+
+    if method == 'lttb':
+        picked = [lttb_indices(x_values, values, max_points) for values in series]
+    elif method == 'minmax':
+        picked = [minmax_indices(values, max_points) for values in series]
+    else:
+        raise ValueError(f"Méthode de réduction inconnue : {method}")
+    return data.iloc[np.unique(np.concatenate(picked))]
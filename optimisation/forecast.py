@@ -0,0 +1,193 @@
+"""Prévision des revenus (ou couverts) quotidiens par établissement.
+
+Modèle linéaire : niveau, tendance, jour de la semaine et jours fériés du
+Québec. Tous les établissements partagent la même matrice de conception ; les
+équations normales (pondérées par les jours observés) sont empilées et
+résolues en un seul appel `np.linalg.solve`. Les intervalles de prévision
+sont tirés des quantiles empiriques des résidus de chaque établissement.
+"""
+import numpy as np
+import pandas as pd
+
+FORECAST_DAYS = 30
+
+# Intervalle de prévision à 90% (quantiles 5% et 95% des résidus)
+INTERVAL_QUANTILES = (0.05, 0.95)
+
+# Régularisation légère : garde le système inversible quand un effet n'est jamais observé
+RIDGE = 1e-3
+
+FEATURES = ['intercept', 'trend'] + [f'dow_{d}' for d in range(1, 7)] + ['holiday']
+
+
+def _easter(year):
+    # Dimanche de Pâques (algorithme grégorien anonyme)
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return pd.Timestamp(year, month, day + 1)
+
+
+def _nth_monday(year, month, n):
+    first = pd.Timestamp(year, month, 1)
+    return first + pd.Timedelta(days=(-first.dayofweek) % 7 + 7 * (n - 1))
+
+
+def quebec_holidays(years):
+    """Jours fériés du Québec pour les années données."""
+    days = []
+    for year in years:
+        victoria = pd.Timestamp(year, 5, 24)
+        days += [
+            pd.Timestamp(year, 1, 1),
+            _easter(year) - pd.Timedelta(days=2),  # Vendredi saint
+            _easter(year) + pd.Timedelta(days=1),  # Lundi de Pâques
+            victoria - pd.Timedelta(days=victoria.dayofweek),  # Journée nationale des patriotes
+            pd.Timestamp(year, 6, 24),  # Fête nationale
+            pd.Timestamp(year, 7, 1),
+            _nth_monday(year, 9, 1),  # Fête du Travail
+            _nth_monday(year, 10, 2),  # Action de grâce
+            pd.Timestamp(year, 12, 25),
+        ]
+    return pd.DatetimeIndex(days)
+
+
+def design_matrix(dates, origin):
+    """Matrice (jours × variables) : constante, tendance en années, jour de semaine, férié."""
+    dates = pd.DatetimeIndex(dates)
+    dow = np.asarray(dates.dayofweek)
+    holidays = quebec_holidays(range(dates.year.min(), dates.year.max() + 1))
+
+    X = np.zeros((len(dates), len(FEATURES)))
+    X[:, 0] = 1.0
+    X[:, 1] = np.asarray((dates - pd.Timestamp(origin)).days) / 365.25
+    X[dow > 0, 1 + dow[dow > 0]] = 1.0  # Lundi = référence
+    X[:, -1] = np.asarray(dates.isin(holidays), dtype=float)
+    return X
+
+
+class RevenueForecaster:
+    """Modèle de prévision de tous les établissements, réajusté seulement si l'historique a changé.
+
+    `measure` est la colonne quotidienne prévue (`revenue` ou `covers`).
+    """
+
+    def __init__(self, horizon=FORECAST_DAYS, measure='revenue'):
+        self.horizon = horizon
+        self.measure = measure
+        self.origin = None
+        self.last_date = None
+        self.locations = None
+        self.coef = None  # (établissements × variables)
+        self.interval = None  # (2 × établissements) : quantiles bas et haut des résidus
+        self.accuracy = None  # 100 - MAPE d'ajustement, par établissement
+        self.history_days = 0
+        self._fingerprint = None
+        self._forecast = None
+
+    def fit(self, df_sales):
+        """Ajuste le modèle sur `df_sales` (date, location, mesure) ; sans effet si rien n'a changé.
+
+        L'historique est comparé par empreinte de son contenu : un jour passé
+        corrigé réajuste le modèle, pas seulement un nouveau dernier jour.
+        """
+        last_date = df_sales['date'].max()
+        locations = list(df_sales['location'].unique())
+        fingerprint = int(pd.util.hash_pandas_object(df_sales[['date', 'location', self.measure]], index=False).sum())
+        if self.coef is not None and fingerprint == self._fingerprint:
+            return self
+
+        # Grille (jours × établissements), NaN pour les jours non observés
+        values = df_sales.pivot_table(index='date', columns='location', values=self.measure, observed=True)
+        dates = pd.date_range(values.index.min(), last_date, freq='D')
+        values = values.reindex(index=dates, columns=locations)
+        Y = values.to_numpy(dtype=float)
+        observed = ~np.isnan(Y)
+        weights = observed.astype(float)
+
+        X = design_matrix(dates, dates[0])
+
+        # Équations normales empilées : une matrice (variables × variables) par établissement
+        A = np.einsum('dk,dl,dj->lkj', X, weights, X)
+        A[:, np.arange(1, X.shape[1]), np.arange(1, X.shape[1])] += RIDGE
+        b = np.einsum('dk,dl->lk', X, np.where(observed, Y, 0.0))
+        coef = np.linalg.solve(A, b[..., None])[..., 0]
+
+        fitted = X @ coef.T
+        residuals = np.where(observed, Y - fitted, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ape = np.where(observed & (Y > 0), np.abs(residuals) / Y, np.nan)
+
+        self.origin = dates[0]
+        self.last_date = last_date
+        self.locations = locations
+        self.coef = coef
+        self.interval = np.nan_to_num(np.nanquantile(residuals, INTERVAL_QUANTILES, axis=0))
+        self.accuracy = pd.Series(100 - np.nanmean(ape, axis=0) * 100, index=locations)
+        self.history_days = len(dates)
+        self._fingerprint = fingerprint
+        self._forecast = None
+        return self
+
+    def forecast(self):
+        """Prévisions des `horizon` prochains jours (schéma de `df_forecast`, colonne `predicted_<mesure>`)."""
+        if self.coef is None:
+            raise ValueError("Le modèle doit être ajusté avant de prévoir")
+        if self._forecast is not None:
+            return self._forecast
+
+        dates = pd.date_range(self.last_date + pd.Timedelta(days=1), periods=self.horizon, freq='D')
+        predicted = design_matrix(dates, self.origin) @ self.coef.T  # (jours × établissements)
+        n_locations = len(self.locations)
+
+        locations = np.asarray(self.locations, dtype=object)
+        forecast = pd.DataFrame({
+            'date': dates[np.repeat(np.arange(self.horizon), n_locations)],
+            'location': pd.Categorical(np.tile(locations, self.horizon), categories=sorted(self.locations)),
+            f'predicted_{self.measure}': np.maximum(predicted, 0).ravel(),
+            'confidence_lower': np.maximum(predicted + self.interval[0], 0).ravel(),
+            'confidence_upper': np.maximum(predicted + self.interval[1], 0).ravel(),
+        })
+        self._forecast = forecast
+        return forecast
+
+
+def forecast_tables(df_sales, forecast_days=FORECAST_DAYS, months=3):
+    """Tables de prévision d'un ensemble d'établissements.
+
+    Retourne `(df_forecast, df_next_7_days, df_next_3_months)` aux schémas de
+    `generate_data` : revenus sur `forecast_days` jours, couverts des 7
+    prochains jours et des `months` prochains mois calendaires complets.
+    """
+    df_forecast = RevenueForecaster(forecast_days).fit(df_sales).forecast()
+
+    last_date = df_sales['date'].max()
+    month_starts = pd.date_range(last_date + pd.offsets.MonthBegin(1), periods=months + 1, freq='MS')
+    covers_days = max((month_starts[-1] - last_date).days - 1, 7)
+    covers = RevenueForecaster(covers_days, measure='covers').fit(df_sales).forecast()
+
+    week = covers[covers['date'] <= last_date + pd.Timedelta(days=7)]
+    df_next_7_days = pd.DataFrame({
+        'date': week['date'],
+        'location': week['location'],
+        'day_name': week['date'].dt.strftime('%A'),
+        'day_short': week['date'].dt.strftime('%a %d'),
+        'predicted_covers': np.rint(week['predicted_covers']).astype(np.int64),
+    }).reset_index(drop=True)
+
+    in_months = covers[covers['date'] >= month_starts[0]]
+    month = in_months['date'].dt.to_period('M').dt.to_timestamp()
+    monthly = in_months.groupby([month.rename('month_start'), 'location'], observed=True)['predicted_covers'].sum()
+    monthly = monthly.reset_index().sort_values(['month_start', 'location'], ignore_index=True)
+    df_next_3_months = pd.DataFrame({
+        'location': monthly['location'],
+        'month': monthly['month_start'].dt.strftime('%B'),
+        'month_short': monthly['month_start'].dt.strftime('%b'),
+        'predicted_covers': np.rint(monthly['predicted_covers']).astype(np.int64),
+    })
+    return df_forecast, df_next_7_days, df_next_3_months
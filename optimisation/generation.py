@@ -0,0 +1,380 @@
+"""Génération vectorisée de données fictives réalistes.
+
+Toutes les grilles (date × établissement × heure) sont tirées en une seule
+passe NumPy à partir d'un générateur explicite, ce qui rend les jeux de
+données reproductibles d'une exécution à l'autre.
+"""
+import numpy as np
+import pandas as pd
+
+# Patterns réalistes : vendredi > samedi > jeudi > dimanche > mercredi > mardi > lundi
+DAY_MULTIPLIERS = np.array([
+    0.75,  # Lundi (faible)
+    0.80,  # Mardi
+    0.90,  # Mercredi
+    1.05,  # Jeudi (pré-weekend)
+    1.30,  # Vendredi (fort)
+    1.25,  # Samedi (fort)
+    1.00,  # Dimanche (moyen)
+])
+
+# Heures d'ouverture : 11h-23h
+OPENING_HOURS = np.arange(11, 23)
+HOURS_OPEN_PER_DAY = len(OPENING_HOURS)
+
+# Couverts par heure [bas, haut) : rush midi (pic 12h), creux de l'après-midi, rush soir (pic 19h)
+HOURLY_COVERS_LOW = np.array([15, 45, 35, 10, 5, 5, 5, 35, 65, 55, 30, 10])
+HOURLY_COVERS_HIGH = np.array([25, 60, 50, 20, 15, 15, 15, 50, 85, 75, 45, 20])
+
+# Couverts de base prévus pour la prochaine journée (midi 12h-14h, soir 18h-21h)
+NEXT_DAY_BASE_COVERS = np.where(
+    (OPENING_HOURS >= 12) & (OPENING_HOURS <= 14), 42,
+    np.where((OPENING_HOURS >= 18) & (OPENING_HOURS <= 21), 58, 18)
+)
+
+# Établissement de référence : toutes les tailles sont exprimées par rapport à 80 places
+REFERENCE_SEATS = 80
+
+# Menu items avec catégories et marges réalistes (quantités mensuelles pour 80 places)
+MENU_ITEMS = [
+    # Entrées (marge élevée)
+    {'name': 'Salade César', 'category': 'Entrées', 'qty': 420, 'price': 17, 'cost': 3.80, 'margin': 78},
+    {'name': 'Soupe du jour', 'category': 'Entrées', 'qty': 280, 'price': 9, 'cost': 1.80, 'margin': 80},
+
+    # Plats principaux (marge moyenne)
+    {'name': 'Steak-Frites', 'category': 'Viandes', 'qty': 760, 'price': 30, 'cost': 13.50, 'margin': 55},
+    {'name': 'Saumon Atlantique', 'category': 'Poissons', 'qty': 540, 'price': 35, 'cost': 16.80, 'margin': 52},
+    {'name': 'Poulet Rôti', 'category': 'Viandes', 'qty': 350, 'price': 22, 'cost': 7.70, 'margin': 65},
+
+    # Pâtes et pizzas (marge très élevée)
+    {'name': 'Pâtes Carbonara', 'category': 'Pâtes', 'qty': 890, 'price': 20, 'cost': 5.60, 'margin': 72},
+    {'name': 'Pizza Margherita', 'category': 'Pizzas', 'qty': 470, 'price': 18, 'cost': 4.50, 'margin': 75},
+    {'name': 'Risotto Champignons', 'category': 'Pâtes', 'qty': 380, 'price': 22, 'cost': 6.60, 'margin': 70},
+
+    # Burgers (marge bonne)
+    {'name': 'Burger Signature', 'category': 'Burgers', 'qty': 680, 'price': 20, 'cost': 6.40, 'margin': 68},
+]
+
+# Canaux de vente et répartition des couverts (Salle 50%, Bar 15%, Livraison 35%)
+CHANNELS = ['Salle', 'Bar', 'Livraison']
+CHANNEL_SHARES = np.array([0.50, 0.15, 0.35])
+
+STAFF = {
+    'position': ['Serveurs', 'Cuisiniers', 'Aide-cuisine', 'Plongeurs', 'Bar', 'Gérance'],
+    'headcount': [8, 6, 4, 2, 2, 2],
+    'avg_hourly_rate': [15, 24, 16, 15, 18, 40],
+    'weekly_hours': [320, 240, 180, 80, 90, 80],  # Heures par semaine
+    'productive_pct': [85, 90, 85, 80, 85, 70]  # % temps productif
+}
+
+
+def location_ids(locations):
+    return [f"R{i + 1:03d}" for i in range(locations)]
+
+
+def _grid_frame(columns, location_codes, locations):
+    # Colonne établissement catégorielle : une seule copie des libellés pour des millions de lignes
+    df = pd.DataFrame(columns)
+    df.insert(1, 'location', pd.Categorical.from_codes(location_codes, categories=location_ids(locations)))
+    return df
+
+
+def generate_data(days=90, locations=1, seats=REFERENCE_SEATS, seed=None, end=None):
+    """Génère les jeux de données de démonstration pour `locations` établissements.
+
+    `seats` est un entier ou un tableau (une valeur par établissement) ; les volumes
+    sont proportionnels au nombre de places. Les lignes sont triées par date puis
+    par établissement. Retourne le même tuple que la version historique.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+    end = end.normalize()
+
+    seats = np.broadcast_to(np.asarray(seats, dtype=float), (locations,))
+    scale = seats / REFERENCE_SEATS
+
+    # Ventes quotidiennes : grille (jour, établissement)
+    dates = pd.date_range(end=end, periods=days, freq='D')
+    day_of_week = dates.dayofweek.to_numpy()
+
+    base_revenue = 2000 * DAY_MULTIPLIERS[day_of_week][:, None] * scale
+    revenue = np.maximum(base_revenue + rng.normal(0, 150, (days, locations)) * scale, 0)
+
+    # Ticket moyen réaliste entre 48-58$
+    avg_ticket = rng.uniform(48, 58, (days, locations))
+    covers = np.trunc(revenue / avg_ticket).astype(np.int64)
+
+    # Calcul des coûts réalistes
+    food_cost = revenue * rng.uniform(0.28, 0.32, (days, locations))  # 28-32% food cost
+    labor_cost = revenue * rng.uniform(0.30, 0.35, (days, locations))  # 30-35% labor cost
+    other_costs = revenue * 0.15  # Autres coûts fixes
+    total_costs = food_cost + labor_cost + other_costs
+
+    day_codes = np.repeat(np.arange(days), locations)
+    loc_codes = np.tile(np.arange(locations), days)
+
+    df_sales = _grid_frame({
+        'date': dates[day_codes],
+        'revenue': revenue.ravel(),
+        'covers': covers.ravel(),
+        'avg_ticket': avg_ticket.ravel(),
+        'day_of_week': pd.Categorical(dates.day_name()[day_codes]),
+        'food_cost': food_cost.ravel(),
+        'labor_cost': labor_cost.ravel(),
+        'other_costs': other_costs.ravel(),
+        'total_costs': total_costs.ravel(),
+        'gross_profit': (revenue - total_costs).ravel(),
+    }, loc_codes, locations)
+
+    # Données horaires réalistes avec rush du midi et du soir : grille (jour, établissement, heure)
+    n_hours = HOURS_OPEN_PER_DAY
+    hourly_covers = rng.integers(HOURLY_COVERS_LOW, HOURLY_COVERS_HIGH, (days, locations, n_hours))
+    hourly_covers = np.rint(hourly_covers * scale[None, :, None]).astype(np.int64)
+
+    # Ticket moyen légèrement plus élevé le soir
+    ticket_multiplier = np.where(OPENING_HOURS >= 18, 1.15, 1.0)
+    hourly_ticket = rng.uniform(48, 58, (days, locations, n_hours)) * ticket_multiplier
+
+    hour_labels = [f"{hour}h-{hour + 1}h" for hour in OPENING_HOURS]
+    hour_codes = np.tile(np.arange(n_hours), days * locations)
+
+    df_hourly = _grid_frame({
+        'date': dates[np.repeat(np.arange(days), locations * n_hours)],
+        'hour': pd.Categorical.from_codes(hour_codes, categories=hour_labels),
+        'hour_num': OPENING_HOURS[hour_codes],
+        'covers': hourly_covers.ravel(),
+        'revenue': (hourly_covers * hourly_ticket).ravel(),
+        'avg_ticket': hourly_ticket.ravel(),
+    }, np.tile(np.repeat(np.arange(locations), n_hours), days), locations)
+
+    # Menu : même carte pour chaque établissement, volumes proportionnels aux places
+    catalog = pd.DataFrame(MENU_ITEMS)
+    n_items = len(catalog)
+    menu_codes = np.tile(np.arange(n_items), locations)
+    menu_loc_codes = np.repeat(np.arange(locations), n_items)
+
+    df_menu = catalog.iloc[menu_codes].reset_index(drop=True)
+    df_menu['qty'] = np.rint(df_menu['qty'].to_numpy() * scale[menu_loc_codes]).astype(np.int64)
+    df_menu['revenue'] = df_menu['qty'] * df_menu['price']
+    df_menu = df_menu[['name', 'category', 'qty', 'price', 'cost', 'revenue', 'margin']]
+    df_menu.insert(0, 'location', pd.Categorical.from_codes(menu_loc_codes, categories=location_ids(locations)))
+    df_menu['food_cost_pct'] = (df_menu['cost'] / df_menu['price'] * 100).round(1)
+
+    # Prévisions de revenus sur 30 jours
+    future_dates = pd.date_range(start=end + pd.Timedelta(days=1), periods=30, freq='D')
+    is_weekend = np.asarray(future_dates.dayofweek >= 5)
+    forecast_revenue = (
+        np.where(is_weekend, 2700, 1950)[:, None] * scale
+        + rng.normal(0, 200, (30, locations)) * scale
+    )
+    forecast_codes = np.repeat(np.arange(30), locations)
+
+    df_forecast = _grid_frame({
+        'date': future_dates[forecast_codes],
+        'predicted_revenue': np.maximum(forecast_revenue, 0).ravel(),
+        'confidence_lower': (forecast_revenue * 0.9).ravel(),
+        'confidence_upper': (forecast_revenue * 1.1).ravel(),
+    }, np.tile(np.arange(locations), 30), locations)
+
+    # Prévision prochaine journée (en heures) : grille (établissement, heure)
+    next_day_covers = NEXT_DAY_BASE_COVERS + rng.integers(-5, 5, (locations, n_hours))
+    next_day_covers = np.maximum(np.rint(next_day_covers * scale[:, None]), 0).astype(np.int64)
+    next_day_codes = np.tile(np.arange(n_hours), locations)
+
+    df_next_day = _grid_frame({
+        'hour': OPENING_HOURS[next_day_codes],
+        'hour_label': [f"{hour}h" for hour in OPENING_HOURS[next_day_codes]],
+        'predicted_covers': next_day_covers.ravel(),
+    }, np.repeat(np.arange(locations), n_hours), locations)
+    df_next_day = df_next_day[['location', 'hour', 'hour_label', 'predicted_covers']]
+
+    # Prévision 7 prochains jours
+    next_dates = future_dates[:7]
+    base_covers = np.where(np.asarray(next_dates.dayofweek >= 5), 85, 65)
+    next_7_covers = base_covers[:, None] + rng.integers(-8, 8, (7, locations))
+    next_7_covers = np.maximum(np.rint(next_7_covers * scale), 0).astype(np.int64)
+    next_7_codes = np.repeat(np.arange(7), locations)
+
+    df_next_7_days = _grid_frame({
+        'date': next_dates[next_7_codes],
+        'day_name': next_dates.strftime('%A')[next_7_codes],
+        'day_short': next_dates.strftime('%a %d')[next_7_codes],
+        'predicted_covers': next_7_covers.ravel(),
+    }, np.tile(np.arange(locations), 7), locations)
+
+    # Prévision 3 prochains mois
+    month_dates = pd.DatetimeIndex([end + pd.Timedelta(days=30 * i) for i in range(1, 4)])
+    base_covers_month = 2100 + np.arange(1, 4) * 120
+    month_covers = base_covers_month[:, None] + rng.integers(-100, 100, (3, locations))
+    month_covers = np.maximum(np.rint(month_covers * scale), 0).astype(np.int64)
+    month_codes = np.repeat(np.arange(3), locations)
+
+    df_next_3_months = _grid_frame({
+        'month': month_dates.strftime('%B')[month_codes],
+        'month_short': month_dates.strftime('%b')[month_codes],
+        'predicted_covers': month_covers.ravel(),
+    }, np.tile(np.arange(locations), 3), locations)
+    df_next_3_months = df_next_3_months[['location', 'month', 'month_short', 'predicted_covers']]
+
+    # Personnel : même grille de postes par établissement, heures proportionnelles aux places
+    staff = pd.DataFrame(STAFF)
+    n_positions = len(staff)
+    staff_loc_codes = np.repeat(np.arange(locations), n_positions)
+    staff_scale = scale[staff_loc_codes]
+
+    df_staff = staff.iloc[np.tile(np.arange(n_positions), locations)].reset_index(drop=True)
+    df_staff.insert(0, 'location', pd.Categorical.from_codes(staff_loc_codes, categories=location_ids(locations)))
+    df_staff['headcount'] = np.maximum(np.rint(df_staff['headcount'] * staff_scale), 1).astype(np.int64)
+    df_staff['weekly_hours'] = np.rint(df_staff['weekly_hours'] * staff_scale).astype(np.int64)
+    df_staff['monthly_hours'] = df_staff['weekly_hours'] * 4.33  # Moyenne mois
+    df_staff['monthly_cost'] = (df_staff['avg_hourly_rate'] * df_staff['monthly_hours']).round(0)
+    df_staff['productive_hours'] = (df_staff['monthly_hours'] * df_staff['productive_pct'] / 100).round(0)
+
+    # Calcul du RevPASH (Revenue Per Available Seat Hour) - métrique clé en restauration
+    days_per_month = 30
+    available_seat_hours = seats.sum() * HOURS_OPEN_PER_DAY * days_per_month
+    monthly_revenue = revenue[-days_per_month:].sum()
+    revpash = monthly_revenue / available_seat_hours
+
+    return df_sales, df_hourly, df_menu, df_forecast, df_staff, df_next_day, df_next_7_days, df_next_3_months, revpash
+
+
+def generate_menu_sales(days=90, locations=1, seats=REFERENCE_SEATS, seed=None, end=None):
+    """Ventes quotidiennes par plat et par canal : grille (jour, établissement, plat, canal).
+
+    Les quantités suivent les volumes mensuels de `MENU_ITEMS` modulés par le
+    jour de la semaine, pour alimenter les agrégats datés du menu.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+    dates = pd.date_range(end=end.normalize(), periods=days, freq='D')
+
+    seats = np.broadcast_to(np.asarray(seats, dtype=float), (locations,))
+    scale = seats / REFERENCE_SEATS
+
+    catalog = pd.DataFrame(MENU_ITEMS)
+    n_items, n_channels = len(catalog), len(CHANNELS)
+    daily_qty = catalog['qty'].to_numpy(dtype=float) / 30
+
+    day_mult = DAY_MULTIPLIERS[np.asarray(dates.dayofweek)]
+    lam = (
+        day_mult[:, None, None, None]
+        * scale[None, :, None, None]
+        * daily_qty[None, None, :, None]
+        * CHANNEL_SHARES[None, None, None, :]
+    )
+    qty = rng.poisson(lam).ravel()
+
+    shape = (days, locations, n_items, n_channels)
+    day_codes, loc_codes, item_codes, channel_codes = np.unravel_index(np.arange(qty.size), shape)
+    prices = catalog['price'].to_numpy(dtype=float)[item_codes]
+    costs = catalog['cost'].to_numpy(dtype=float)[item_codes]
+
+    return _grid_frame({
+        'date': dates[day_codes],
+        'name': pd.Categorical.from_codes(item_codes, categories=catalog['name']),
+        'category': pd.Categorical(catalog['category'].to_numpy()[item_codes]),
+        'channel': pd.Categorical.from_codes(channel_codes, categories=CHANNELS),
+        'qty': qty,
+        'revenue': qty * prices,
+        'food_cost': qty * costs,
+    }, loc_codes, locations)
+
+
+def generate_inventory_events(daily_usage, ingredients, seed=None):
+    """Journal d'inventaire fictif cohérent avec la consommation théorique.
+
+    `daily_usage` a les colonnes date, location, ingredient, qty ;
+    `ingredients` est la fiche des ingrédients (`inventory.INGREDIENTS`).
+    Chaque couple (établissement, ingrédient) est réassorti tous les 2 à 7
+    jours jusqu'à la consommation du cycle plus deux jours (arrondie au
+    format de commande, prix ±3 %), consommé par les ventes chaque soir,
+    avec des pertes déclarées (1 à 6 %, quelques-unes jusqu'à 15 %) et une
+    démarque non déclarée (0 à 2 %) que révèle le comptage du dimanche.
+    Colonnes de `ledger.COLUMNS`, triées par date.
+    """
+    rng = np.random.default_rng(seed)
+    fiche = pd.DataFrame(ingredients).set_index('ingredient')
+    grid = daily_usage.pivot_table(index=['location', 'ingredient'], columns='date', values='qty',
+                                   aggfunc='sum', fill_value=0.0, observed=True)
+    dates = pd.DatetimeIndex(grid.columns)
+    pairs = grid.index.to_frame(index=False).astype({'location': object, 'ingredient': object})
+    usage = grid.to_numpy(dtype=float)
+    n_pairs, days = usage.shape
+
+    waste_rate = rng.uniform(0.01, 0.06, n_pairs)
+    waste_rate[rng.random(n_pairs) < 0.1] = rng.uniform(0.10, 0.15)
+    waste = usage * waste_rate[:, None] * rng.lognormal(0, 0.3, usage.shape)
+    shrink = usage * rng.uniform(0, 0.02, n_pairs)[:, None]
+
+    # Livraisons : réassort jusqu'à la consommation du cycle + 2 jours, au format de commande
+    cycle = rng.integers(2, 8, n_pairs)
+    pack = fiche['pack'].reindex(pairs['ingredient']).to_numpy(dtype=float)
+    outflow = usage + waste + shrink
+    # Au-delà du dernier jour, la consommation attendue est la moyenne observée
+    horizon = np.concatenate([outflow, np.repeat(outflow.mean(axis=1, keepdims=True), 9, axis=1)], axis=1)
+    needed = np.concatenate([np.zeros((n_pairs, 1)), np.cumsum(horizon, axis=1)], axis=1)
+    day = np.arange(days)
+    window_end = day[None, :] + cycle[:, None] + 2
+    target = np.take_along_axis(needed, window_end, axis=1) - needed[:, :days]
+    receipts = np.zeros_like(usage)
+    stock = np.zeros(n_pairs)
+    for d in range(days):
+        due = d % cycle == 0
+        receipts[due, d] = np.ceil(np.maximum(target[due, d] - stock[due], 0) / pack[due]) * pack[due]
+        stock += receipts[:, d] - outflow[:, d]
+    price = fiche['unit_cost'].reindex(pairs['ingredient']).to_numpy()[:, None] * \
+        rng.normal(1, 0.03, usage.shape) * (1 + 0.0002 * day[None, :])
+
+    # Stock physique en fin de journée, compté le dimanche
+    physical = np.cumsum(receipts - outflow, axis=1)
+    counted = np.broadcast_to(np.asarray(dates.dayofweek == 6) & (day > 0), usage.shape)
+
+    def block(mask, hour, event, qty, unit_cost=None, reference=None):
+        rows, cols = np.nonzero(mask)
+        return pd.DataFrame({
+            'timestamp': dates[cols] + pd.Timedelta(hours=hour),
+            'location': pairs['location'].to_numpy()[rows],
+            'ingredient': pairs['ingredient'].to_numpy()[rows],
+            'event': event,
+            'qty': np.round(qty[rows, cols], 3),
+            'unit_cost': np.round(unit_cost[rows, cols], 2) if unit_cost is not None else np.nan,
+            'reference': reference[rows, cols] if reference is not None else None,
+        })
+
+    reasons = np.array(['Périmé', 'Préparation', 'Retour client'], dtype=object)[rng.choice(3, usage.shape, p=[0.5, 0.35, 0.15])]
+    invoices = np.char.add('F-', np.arange(receipts.size).astype(str)).astype(object).reshape(usage.shape)
+    events = pd.concat([
+        block(receipts > 0, 7, 'receipt', receipts, price, invoices),
+        block(waste > 0, 22, 'waste', waste, reference=reasons),
+        block(usage > 0, 23, 'depletion', usage, reference=np.full(usage.shape, 'Ventes', dtype=object)),
+        block(counted, 23.5, 'count', np.maximum(physical, 0), reference=np.full(usage.shape, 'Inventaire', dtype=object)),
+    ], ignore_index=True)
+    return events.sort_values('timestamp', kind='stable', ignore_index=True)
+
+
+def generate_punches(shifts, df_staff, seed=None):
+    """Pointages fictifs (un par employé et par quart) à partir de quarts planifiés.
+
+    `shifts` a les colonnes date, location, position, start, end, count (voir
+    `staffing.plan_staffing`). Chaque quart de `count` personnes donne autant
+    d'employés, identifiés par leur rang dans le (jour, établissement, poste) ;
+    l'entrée est pointée vers 5 minutes avant l'heure prévue, la sortie vers
+    8 minutes après, et chaque employé a son taux (±8 % autour de celui du poste).
+    """
+    rng = np.random.default_rng(seed)
+    punches = shifts.loc[shifts.index.repeat(shifts['count'])].reset_index(drop=True)
+    rank = punches.groupby(['date', 'location', 'position'], observed=True).cumcount()
+    punches['employee'] = (punches['location'].astype(str) + '-' + punches['position'].astype(str)
+                           + '-' + (rank + 1).astype(str))
+
+    rates = df_staff.groupby('position', observed=True)['avg_hourly_rate'].mean()
+    codes, employees = pd.factorize(punches['employee'])
+    spread = rng.lognormal(0, 0.08, len(employees))
+    punches['hourly_rate'] = (punches['position'].astype(object).map(rates).to_numpy(dtype=float) * spread[codes]).round(2)
+
+    clock_in = punches['start'] * 60 + rng.normal(-5, 4, len(punches))
+    clock_out = np.maximum(punches['end'] * 60 + rng.normal(8, 6, len(punches)), clock_in + 30)
+    punches['clock_in'] = punches['date'] + pd.to_timedelta(np.rint(clock_in), unit='m')
+    punches['clock_out'] = punches['date'] + pd.to_timedelta(np.rint(clock_out), unit='m')
+    return punches[['employee', 'location', 'position', 'clock_in', 'clock_out', 'hourly_rate']]
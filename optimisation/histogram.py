@@ -0,0 +1,204 @@
+"""Histogrammes des tickets par tranche de la journée (quart d'heure par défaut).
+
+Les horodatages d'ouverture sont ramenés à des indices entiers (jour,
+établissement, tranche) et accumulés par `np.bincount`, sans groupby sur des
+dates : le coût est linéaire en nombre de tickets. Les tranches se regroupent
+ensuite en heures (`df_hourly`), en profils par jour de semaine ou en
+couverts par service.
+"""
+import numpy as np
+import pandas as pd
+
+from optimisation.kpis import SERVICE_PERIODS, in_service
+
+BIN_MINUTES = 15
+MINUTES_PER_DAY = 24 * 60
+MEASURES = ['covers', 'revenue', 'tickets']
+
+
+def _reduce(keys, weights):
+    """Somme de chaque tableau de `weights` par clé entière positive : `(clés triées, sommes)`.
+
+    Accumulation dense par `bincount` quand l'étendue des clés est de l'ordre
+    de leur nombre ; sinon tri (quasi linéaire sur des blocs déjà triés) et
+    sommes par plages de clés égales.
+    """
+    if not len(keys):
+        return keys, [np.zeros(0) for _ in weights]
+    span = int(keys.max()) + 1
+    if span <= 2 * len(keys):
+        present = np.bincount(keys, minlength=span) > 0
+        return np.flatnonzero(present), [np.bincount(keys, weights=w, minlength=span)[present] for w in weights]
+
+    if np.all(keys[1:] >= keys[:-1]):
+        order = None
+    else:
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], [np.add.reduceat(w if order is None else w[order], starts) for w in weights]
+
+
+class TicketHistogram:
+    """Couverts, revenus et tickets par (jour, établissement, tranche de `bin_minutes`).
+
+    `add` reçoit des blocs de tickets ; l'état ne dépend que du nombre de
+    cases non vides, jamais du nombre de tickets.
+    """
+
+    def __init__(self, bin_minutes=BIN_MINUTES):
+        if MINUTES_PER_DAY % bin_minutes:
+            raise ValueError(f"La tranche ({bin_minutes} min) doit diviser la journée")
+        self.bin_minutes = bin_minutes
+        self.bins_per_day = MINUTES_PER_DAY // bin_minutes
+        self.locations = []  # code -> établissement
+        self._codes = {}
+        self._parts = []  # (jour, établissement, tranche, [sommes])
+        self._pending_cells = 0
+        self._state_cells = 0
+
+    def _location_codes(self, locations):
+        local, uniques = pd.factorize(locations)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, location in enumerate(uniques):
+            if location not in self._codes:
+                self._codes[location] = len(self.locations)
+                self.locations.append(location)
+            mapping[i] = self._codes[location]
+        return mapping[local]
+
+    def _split(self, keys, first_day, n_locations):
+        slot = keys % self.bins_per_day
+        rest = keys // self.bins_per_day
+        return first_day + rest // n_locations, rest % n_locations, slot
+
+    def add(self, opened_at, locations, covers, revenue, tickets):
+        """Ajoute des tickets (ou lignes de tickets) : horodatage, établissement et mesures."""
+        minutes = np.asarray(opened_at, dtype='datetime64[m]').astype(np.int64)
+        if not len(minutes):
+            return self
+        day = minutes // MINUTES_PER_DAY
+        slot = (minutes - day * MINUTES_PER_DAY) // self.bin_minutes
+        location = self._location_codes(locations)
+
+        first_day, n_locations = int(day.min()), len(self.locations)
+        keys = ((day - first_day) * n_locations + location) * self.bins_per_day + slot
+        weights = [np.asarray(values, dtype=float) for values in (covers, revenue, tickets)]
+        keys, sums = _reduce(keys, weights)
+        self._parts.append(self._split(keys, first_day, n_locations) + (sums,))
+
+        self._pending_cells += len(keys)
+        if self._pending_cells > max(2 * self._state_cells, 500_000):
+            self._compact()
+        return self
+
+    def _compact(self):
+        if len(self._parts) < 2:
+            return
+        day, location, slot = (np.concatenate([part[i] for part in self._parts]) for i in range(3))
+        sums = [np.concatenate([part[3][i] for part in self._parts]) for i in range(len(MEASURES))]
+        first_day, n_locations = int(day.min()), len(self.locations)
+        keys, sums = _reduce(((day - first_day) * n_locations + location) * self.bins_per_day + slot, sums)
+        self._parts = [self._split(keys, first_day, n_locations) + (sums,)]
+        self._state_cells = len(keys)
+        self._pending_cells = 0
+
+    def frame(self, bin_minutes=None):
+        """Table (date, location, minute, covers, revenue, tickets) triée, aux tranches de `bin_minutes`.
+
+        `minute` est le début de la tranche en minutes depuis minuit ; `bin_minutes`
+        doit être un multiple de la tranche d'accumulation (60 pour des heures).
+        """
+        bin_minutes = bin_minutes or self.bin_minutes
+        if bin_minutes % self.bin_minutes or MINUTES_PER_DAY % bin_minutes:
+            raise ValueError(f"Tranche de {bin_minutes} min incompatible avec l'accumulation ({self.bin_minutes} min)")
+        self._compact()
+        if not self._parts:
+            raise ValueError("Aucun ticket ingéré")
+
+        day, location, slot, sums = self._parts[0]
+        factor = bin_minutes // self.bin_minutes
+        bins_per_day = MINUTES_PER_DAY // bin_minutes
+        first_day, n_locations = int(day.min()), len(self.locations)
+
+        # Ordre des clés = ordre (jour, établissement trié, tranche)
+        rank = np.empty(n_locations, dtype=np.int64)
+        rank[np.argsort(np.asarray(self.locations, dtype=object))] = np.arange(n_locations)
+        keys = ((day - first_day) * n_locations + rank[location]) * bins_per_day + slot // factor
+        keys, sums = _reduce(keys, sums)
+
+        rest = keys // bins_per_day
+        categories = sorted(self.locations)
+        return pd.DataFrame({
+            'date': (first_day + rest // n_locations).astype('datetime64[D]').astype('datetime64[ns]'),
+            'location': pd.Categorical.from_codes(rest % n_locations, categories=categories),
+            'minute': (keys % bins_per_day * bin_minutes).astype(np.int64),
+            'covers': np.rint(sums[0]).astype(np.int64),
+            'revenue': sums[1],
+            'tickets': np.rint(sums[2]).astype(np.int64),
+        })
+
+    def hourly(self):
+        """Table horaire au schéma de `df_hourly` (date, location, hour, hour_num, covers, revenue, avg_ticket)."""
+        df_hourly = self.frame(60)
+        df_hourly.insert(2, 'hour_num', df_hourly.pop('minute') // 60)
+        hours = np.sort(df_hourly['hour_num'].unique())
+        df_hourly.insert(2, 'hour', pd.Categorical(
+            df_hourly['hour_num'].map({h: f"{h}h-{h + 1}h" for h in hours}),
+            categories=[f"{h}h-{h + 1}h" for h in hours],
+        ))
+        df_hourly['avg_ticket'] = df_hourly['revenue'] / df_hourly['covers'].where(df_hourly['covers'] > 0)
+        return df_hourly.drop(columns='tickets')
+
+    def _day_keys(self, table):
+        # Clé (établissement, jour) de chaque ligne : code × étendue + jours depuis le premier jour
+        day = table['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        day = day - day.min()
+        return table['location'].cat.codes.to_numpy(dtype=np.int64) * (int(day.max()) + 1) + day, int(day.max()) + 1
+
+    def profile(self, bin_minutes=None):
+        """Moyenne par (établissement, jour de semaine, tranche) sur les jours d'ouverture observés.
+
+        `day_of_week` suit la convention pandas (0 = lundi).
+        """
+        bin_minutes = bin_minutes or self.bin_minutes
+        bins_per_day = MINUTES_PER_DAY // bin_minutes
+        table = self.frame(bin_minutes)
+        categories = table['location'].cat.categories
+        codes = table['location'].cat.codes.to_numpy(dtype=np.int64)
+        dow = table['date'].dt.dayofweek.to_numpy(dtype=np.int64)
+        slot = table['minute'].to_numpy() // bin_minutes
+
+        # Jours d'ouverture par (établissement, jour de semaine) : jours distincts ayant des tickets
+        day_keys, span = self._day_keys(table)
+        first = np.unique(day_keys, return_index=True)[1]
+        open_days = np.bincount(codes[first] * 7 + dow[first], minlength=len(categories) * 7)
+
+        keys, sums = _reduce((codes * 7 + dow) * bins_per_day + slot, [table[m].to_numpy(dtype=float) for m in MEASURES])
+        group = keys // bins_per_day
+        return pd.DataFrame({
+            'location': pd.Categorical.from_codes(group // 7, categories=categories),
+            'day_of_week': group % 7,
+            'minute': keys % bins_per_day * bin_minutes,
+            **{m: sums[i] / open_days[group] for i, m in enumerate(MEASURES)},
+        })
+
+    def service_covers(self, service_periods=SERVICE_PERIODS):
+        """Couverts par (date, établissement) dans chaque service, à la précision des tranches.
+
+        Un service est un intervalle d'heures [début, fin[ (voir `kpis.SERVICE_PERIODS`) ;
+        une tranche y est comptée si elle y commence.
+        """
+        table = self.frame()
+        hours = table['minute'].to_numpy() / 60
+        covers = table['covers'].to_numpy(dtype=float)
+        day_keys, span = self._day_keys(table)
+        keys, sums = _reduce(day_keys, [np.where(in_service(hours, period), covers, 0)
+                                        for period in service_periods.values()])
+
+        first_day = table['date'].min()
+        return pd.DataFrame({
+            'date': first_day + pd.to_timedelta(keys % span, unit='D'),
+            'location': pd.Categorical.from_codes(keys // span, categories=table['location'].cat.categories),
+            **{f'{name}_covers': np.rint(sums[i]).astype(np.int64) for i, name in enumerate(service_periods)},
+        })
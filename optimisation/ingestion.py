@@ -0,0 +1,195 @@
+"""Ingestion en continu d'exports de tickets POS (CSV ou Parquet).
+
+Les exports sont lus par blocs et agrégés au fil de l'eau vers les mêmes
+tables que celles utilisées par les onglets : quotidienne (`df_sales`),
+horaire (`df_hourly`, via un histogramme au quart d'heure) et par plat
+(`df_menu`). La mémoire dépend du nombre de clés agrégées (jours ×
+établissements × tranches), jamais du nombre de lignes.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from optimisation.histogram import BIN_MINUTES, TicketHistogram
+
+# Colonnes minimales d'un export de tickets (voir optimisation.simulator.TICKET_COLUMNS)
+REQUIRED_COLUMNS = [
+    'line_no', 'location', 'opened_at', 'channel', 'covers', 'item', 'category', 'qty', 'unit_price', 'unit_cost',
+]
+
+# Coûts non présents dans les tickets : main d'œuvre estimée et autres coûts fixes
+DEFAULT_LABOR_COST_PCT = 0.325
+OTHER_COSTS_PCT = 0.15
+
+
+def read_ticket_chunks(path, batch_rows=500_000, columns=REQUIRED_COLUMNS):
+    """Itère sur un export de tickets par blocs d'au plus `batch_rows` lignes.
+
+    `path` peut être un fichier CSV, un fichier Parquet ou un répertoire Parquet
+    partitionné (tel que produit par `optimisation.simulator`).
+    """
+    if str(path).endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=batch_rows, usecols=columns, parse_dates=['opened_at'])
+        return
+
+    import pyarrow.dataset as ds
+
+    partitioning = 'hive' if os.path.isdir(path) else None
+    dataset = ds.dataset(path, format='parquet', partitioning=partitioning)
+    for batch in dataset.to_batches(columns=list(columns), batch_size=batch_rows):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+class _Accumulator:
+    # Somme incrémentale de résultats partiels indexés ; compactage périodique
+    # pour que l'état reste proportionnel au nombre de clés
+
+    def __init__(self, min_compact_rows=200_000):
+        self._parts = []
+        self._pending_rows = 0
+        self._state_rows = 0
+        self._min_compact_rows = min_compact_rows
+
+    def add(self, partial):
+        self._parts.append(partial)
+        self._pending_rows += len(partial)
+        if self._pending_rows > max(self._state_rows, self._min_compact_rows):
+            self._compact()
+
+    def _compact(self):
+        combined = pd.concat(self._parts)
+        state = combined.groupby(level=list(range(combined.index.nlevels)), sort=False).sum()
+        self._parts = [state]
+        self._state_rows = len(state)
+        self._pending_rows = 0
+
+    def result(self):
+        if not self._parts:
+            return None
+        self._compact()
+        return self._parts[0]
+
+
+class TicketAggregator:
+    """Agrège des blocs de lignes de tickets en tables quotidienne, horaire et menu.
+
+    `location` restreint l'agrégation à un établissement. `labor_cost_pct`
+    estime la main d'œuvre en l'absence de données de pointage.
+    `histogram` conserve les couverts et revenus par tranche de `bin_minutes`.
+    """
+
+    def __init__(self, location=None, labor_cost_pct=DEFAULT_LABOR_COST_PCT, bin_minutes=BIN_MINUTES):
+        self.location = location
+        self.labor_cost_pct = labor_cost_pct
+        self.rows = 0
+        self.watermark = None  # Dernier horodatage ingéré
+        self.histogram = TicketHistogram(bin_minutes)
+        self._daily = _Accumulator()
+        self._menu = _Accumulator()
+        self._menu_sales = _Accumulator()
+
+    def update(self, chunk):
+        missing = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans l'export de tickets: {', '.join(missing)}")
+
+        if self.location is not None:
+            chunk = chunk[chunk['location'] == self.location]
+        if chunk.empty:
+            return self
+
+        opened = chunk['opened_at'].to_numpy(dtype='datetime64[ns]')
+        day = opened.astype('datetime64[D]')
+        qty = chunk['qty'].to_numpy(dtype=float)
+
+        # Les couverts sont portés par chaque ligne : on ne compte que la première ligne du ticket
+        first_line = chunk['line_no'].to_numpy() == 0
+
+        lines = pd.DataFrame({
+            'date': day.astype('datetime64[ns]'),
+            'location': chunk['location'].to_numpy(dtype=object),
+            'name': chunk['item'].to_numpy(dtype=object),
+            'category': chunk['category'].to_numpy(dtype=object),
+            'channel': chunk['channel'].to_numpy(dtype=object),
+            'qty': qty,
+            'revenue': qty * chunk['unit_price'].to_numpy(dtype=float),
+            'food_cost': qty * chunk['unit_cost'].to_numpy(dtype=float),
+            'covers': np.where(first_line, chunk['covers'].to_numpy(), 0),
+            'tickets': first_line.astype(np.int64),
+        })
+
+        measures = ['revenue', 'food_cost', 'covers', 'tickets']
+        self._daily.add(lines.groupby(['date', 'location'], sort=False)[measures].sum())
+        self.histogram.add(opened, chunk['location'], lines['covers'].to_numpy(),
+                           lines['revenue'].to_numpy(), lines['tickets'].to_numpy())
+        self._menu.add(lines.groupby(['location', 'name', 'category'], sort=False)[['qty', 'revenue', 'food_cost']].sum())
+        self._menu_sales.add(
+            lines.groupby(['date', 'location', 'name', 'category', 'channel'], sort=False)[['qty', 'revenue', 'food_cost']].sum()
+        )
+
+        self.rows += len(chunk)
+        chunk_max = opened.max()
+        self.watermark = chunk_max if self.watermark is None else max(self.watermark, chunk_max)
+        return self
+
+    def frames(self):
+        """Retourne `(df_sales, df_hourly, df_menu)` aux schémas de `generate_data`."""
+        daily = self._daily.result()
+        if daily is None:
+            raise ValueError("Aucun ticket ingéré")
+
+        # Ventes quotidiennes
+        df_sales = daily.reset_index().sort_values(['date', 'location'], ignore_index=True)
+        df_sales['location'] = _categorical(df_sales['location'])
+        df_sales['covers'] = df_sales['covers'].astype(np.int64)
+        df_sales['avg_ticket'] = df_sales['revenue'] / df_sales['covers'].where(df_sales['covers'] > 0)
+        df_sales['day_of_week'] = df_sales['date'].dt.day_name().astype('category')
+        df_sales['labor_cost'] = df_sales['revenue'] * self.labor_cost_pct
+        df_sales['other_costs'] = df_sales['revenue'] * OTHER_COSTS_PCT
+        df_sales['total_costs'] = df_sales['food_cost'] + df_sales['labor_cost'] + df_sales['other_costs']
+        df_sales['gross_profit'] = df_sales['revenue'] - df_sales['total_costs']
+        df_sales = df_sales[[
+            'date', 'location', 'revenue', 'covers', 'avg_ticket', 'day_of_week',
+            'food_cost', 'labor_cost', 'other_costs', 'total_costs', 'gross_profit',
+        ]]
+
+        # Données horaires
+        df_hourly = self.histogram.hourly()
+
+        # Performance par plat : prix et coût unitaires moyens sur la période
+        df_menu = self._menu.result().reset_index()
+        df_menu = df_menu.sort_values(['location', 'category', 'name'], ignore_index=True)
+        df_menu['location'] = _categorical(df_menu['location'])
+        df_menu['qty'] = df_menu['qty'].astype(np.int64)
+        df_menu['price'] = df_menu['revenue'] / df_menu['qty']
+        df_menu['cost'] = df_menu['food_cost'] / df_menu['qty']
+        df_menu['margin'] = ((df_menu['price'] - df_menu['cost']) / df_menu['price'] * 100).round(0)
+        df_menu['food_cost_pct'] = (df_menu['cost'] / df_menu['price'] * 100).round(1)
+        df_menu = df_menu[[
+            'location', 'name', 'category', 'qty', 'price', 'cost', 'revenue', 'margin', 'food_cost_pct',
+        ]]
+
+        return df_sales, df_hourly, df_menu
+
+    def menu_sales(self):
+        """Ventes quotidiennes par plat et par canal (schéma de `generate_menu_sales`)."""
+        df = self._menu_sales.result().reset_index()
+        df = df.sort_values(['date', 'location', 'name', 'channel'], ignore_index=True)
+        for column in ['location', 'name', 'category', 'channel']:
+            df[column] = _categorical(df[column])
+        df['qty'] = df['qty'].astype(np.int64)
+        return df[['date', 'location', 'name', 'category', 'channel', 'qty', 'revenue', 'food_cost']]
+
+
+def _categorical(values):
+    return pd.Categorical(values, categories=sorted(values.unique()))
+
+
+def ingest_tickets(path, location=None, labor_cost_pct=DEFAULT_LABOR_COST_PCT, batch_rows=500_000):
+    """Lit un export de tickets par blocs et retourne `(df_sales, df_hourly, df_menu)`."""
+    aggregator = TicketAggregator(location=location, labor_cost_pct=labor_cost_pct)
+    for chunk in read_ticket_chunks(path, batch_rows=batch_rows):
+        aggregator.update(chunk)
+    return aggregator.frames()
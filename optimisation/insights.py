@@ -0,0 +1,144 @@
+"""Statuts, actions prioritaires et opportunités calculés à partir des KPIs.
+
+Les règles (feux VERT/JAUNE/ROUGE, recommandations) sont les mêmes que
+celles affichées dans le tableau de bord ; `location_reports` les assemble
+pour un ou plusieurs établissements sans passer par Streamlit.
+"""
+from optimisation.cube import AggregateCube
+from optimisation.generation import REFERENCE_SEATS
+from optimisation.kpis import build_kpi_engines, period_kpis
+from optimisation.menu import class_summary, classify_menu
+from optimisation.periods import TimeSlicer, menu_for_period, period_bounds, previous_bounds
+
+# Heure considérée creuse sous ce nombre moyen de couverts
+SLOW_HOUR_COVERS = 20
+
+
+def profit_margin(kpis):
+    return (kpis['recent_profit'] / kpis['recent_revenue'] * 100) if kpis['recent_revenue'] > 0 else 0
+
+
+def operations_status(kpis, df_menu):
+    """Feux des opérations : rotation midi et soir, performance menu, occupation."""
+    return {
+        f'Rotation midi ({kpis["lunch_turns"]:.1f}x)': 'VERT' if kpis['lunch_turns'] >= 1.5 else 'JAUNE',
+        f'Rotation soir ({kpis["dinner_turns"]:.1f}x)': 'VERT' if kpis['dinner_turns'] >= 1.8 else 'JAUNE',
+        'Performance menu': 'VERT' if df_menu['margin'].mean() >= 65 else 'JAUNE',
+        f'Taux d\'occupation ({kpis["seat_occupancy"]:.0f}%)': 'VERT' if 65 <= kpis['seat_occupancy'] <= 75 else 'JAUNE',
+    }
+
+
+def finances_status(kpis):
+    """Feux financiers : coût principal, marge nette, coûts nourriture et main d'œuvre."""
+    margin = profit_margin(kpis)
+    prime = kpis['prime_cost_pct']
+    return {
+        f'Coût principal ({prime:.1f}%)': 'VERT' if prime < 60 else 'JAUNE' if prime < 65 else 'ROUGE',
+        f'Marge nette ({margin:.1f}%)': 'VERT' if margin >= 15 else 'JAUNE' if margin >= 10 else 'ROUGE',
+        f'Coût nourriture ({kpis["food_cost_pct"]:.1f}%)': 'VERT' if kpis['food_cost_pct'] < 32 else 'JAUNE',
+        f'Coût main d\'œuvre ({kpis["labor_cost_pct"]:.1f}%)': 'VERT' if kpis['labor_cost_pct'] < 35 else 'JAUNE',
+    }
+
+
+def priority_actions(kpis, df_menu):
+    """Actions prioritaires (texte Markdown) déduites des KPIs et de la carte."""
+    actions = []
+
+    # Actions basées sur les KPIs
+    if kpis['prime_cost_pct'] > 60:
+        actions.append("🔴 **URGENT**: Prime Cost à {:.1f}% - Réduire coûts nourriture ou main d'œuvre".format(kpis['prime_cost_pct']))
+
+    if kpis['lunch_turns'] < 1.5:
+        actions.append("🟡 Rotation midi faible ({:.1f}x) - Accélérer le service ou promotions lunch".format(kpis['lunch_turns']))
+
+    if kpis['seat_occupancy'] < 65:
+        actions.append("🟡 Taux occupation bas ({:.1f}%) - Renforcer marketing et réservations".format(kpis['seat_occupancy']))
+
+    # Identifier les plats peu performants
+    low_performers = df_menu[df_menu['qty'] < df_menu['qty'].quantile(0.3)]
+    if len(low_performers) > 0:
+        actions.append(f"📋 Revoir {len(low_performers)} plats peu vendus: {', '.join(low_performers['name'].head(2).tolist())}")
+
+    # Identifier les plats à faible marge
+    low_margin = df_menu[df_menu['margin'] < 60]
+    if len(low_margin) > 0:
+        actions.append(f"💰 Améliorer marge de: {', '.join(low_margin['name'].head(2).tolist())}")
+
+    actions.append("✅ Réviser planning personnel semaine prochaine")
+    actions.append("✅ Vérifier inventaire produits frais")
+    return actions
+
+
+def opportunities(kpis, df_menu, df_hourly):
+    """Opportunités (texte Markdown) : plats phares, heures creuses, rotation du soir."""
+    found = []
+
+    # Opportunités basées sur les données
+    best_dish = df_menu.loc[df_menu['revenue'].idxmax()]
+    found.append(f"⭐ **{best_dish['name']}** cartonne! Considérer une variation ou augmenter le prix de 1-2$")
+
+    high_margin_dishes = df_menu[df_menu['margin'] > 70].sort_values('qty', ascending=False)
+    if len(high_margin_dishes) > 0:
+        top_margin = high_margin_dishes.iloc[0]
+        found.append(f"💎 Promouvoir **{top_margin['name']}** (marge {top_margin['margin']:.0f}%) - potentiel +{top_margin['revenue']*0.2:.0f}$/mois")
+
+    # Heures creuses (profil moyen par heure sur la période)
+    hourly_profile = df_hourly.groupby('hour_num')['covers'].mean()
+    slow_hours = hourly_profile[hourly_profile < SLOW_HOUR_COVERS]
+    if len(slow_hours) > 0:
+        found.append(f"⏰ {len(slow_hours)} périodes creuses - Lancer happy hour ou promotions")
+
+    if kpis['dinner_turns'] > 2.0:
+        found.append("🎉 Excellente rotation soir! Possibilité d'augmenter capacité ou prix")
+
+    found.append("📱 Lancer campagne réseaux sociaux pour lundi-mardi")
+    found.append("🎁 Programme fidélité pourrait augmenter revenus de 8-12%")
+    return found
+
+
+def location_reports(df_sales, df_hourly, df_menu, df_menu_sales=None, period='Cette semaine',
+                     custom_range=None, locations=None, seats=REFERENCE_SEATS):
+    """Rapport complet par établissement : `{location: rapport}`.
+
+    Chaque rapport contient la période analysée, les KPIs de la période et
+    les KPIs glissants, les feux, actions, opportunités et le nombre de plats
+    par classe. Sans `df_menu_sales`, la carte est celle de `df_menu` (tout
+    l'historique) au lieu de la période.
+    """
+    sales_slicer, hourly_slicer = TimeSlicer(df_sales), TimeSlicer(df_hourly)
+    start, end = period_bounds(period, sales_slicer.last_date, custom_range)
+    prev_start, prev_end = previous_bounds(start, end)
+
+    period_sales = sales_slicer.slice(start, end).groupby('location', observed=True)
+    period_hourly = hourly_slicer.slice(start, end).groupby('location', observed=True)
+    prev_sales = sales_slicer.slice(prev_start, prev_end).groupby('location', observed=True)
+    engines = build_kpi_engines(df_sales, df_hourly, seats)
+    cube = AggregateCube.from_frames(df_sales, df_hourly, df_menu_sales) if df_menu_sales is not None else None
+
+    reports = {}
+    for location in (locations or sorted(engines)):
+        if location not in period_sales.groups:
+            continue
+        hourly = period_hourly.get_group(location)
+        previous = prev_sales.get_group(location) if location in prev_sales.groups else df_sales.iloc[:0]
+        seat_count = seats.get(location, REFERENCE_SEATS) if isinstance(seats, dict) else seats
+        kpis = period_kpis(period_sales.get_group(location), hourly, previous_sales=previous, seats=seat_count)
+
+        if cube is not None:
+            menu = menu_for_period(cube, df_menu, start, end, location=location)
+        else:
+            menu = df_menu[df_menu['location'] == location].reset_index(drop=True)
+        classes = class_summary(classify_menu(menu))
+
+        reports[str(location)] = {
+            'period': {'label': period, 'start': start, 'end': end},
+            'kpis': kpis,
+            'live_kpis': engines[location].kpis(),
+            'profit_margin': profit_margin(kpis),
+            'operations_status': operations_status(kpis, menu),
+            'finances_status': finances_status(kpis),
+            'actions': priority_actions(kpis, menu),
+            'opportunities': opportunities(kpis, menu, hourly),
+            'menu_classes': classes['count'].to_dict(),
+        }
+    return reports
@@ -0,0 +1,224 @@
+"""Inventaires : explosion des ventes de plats en consommation d'ingrédients.
+
+Les recettes forment une matrice creuse plats × ingrédients (quantité par
+portion) stockée en CSR. La consommation théorique d'une période est le
+produit de cette matrice par les quantités de plats vendus : un produit
+matrice-vecteur pour un total, un produit creux par (jour, établissement)
+pour les ventes détaillées, sans boucle sur les plats. Elle alimente les
+alertes de réapprovisionnement et l'écart entre coût matière théorique et réel.
+"""
+import numpy as np
+import pandas as pd
+
+# Ingrédients : unité, coût unitaire, délai de livraison (jours) et format de commande
+INGREDIENTS = [
+    {'ingredient': 'Laitue romaine', 'unit': 'kg', 'unit_cost': 4.00, 'lead_days': 1, 'pack': 5},
+    {'ingredient': 'Parmesan', 'unit': 'kg', 'unit_cost': 28.00, 'lead_days': 3, 'pack': 1},
+    {'ingredient': 'Croûtons', 'unit': 'kg', 'unit_cost': 8.00, 'lead_days': 3, 'pack': 2},
+    {'ingredient': 'Vinaigrette César', 'unit': 'L', 'unit_cost': 9.00, 'lead_days': 3, 'pack': 4},
+    {'ingredient': 'Légumes à soupe', 'unit': 'kg', 'unit_cost': 3.50, 'lead_days': 1, 'pack': 10},
+    {'ingredient': 'Bouillon', 'unit': 'L', 'unit_cost': 2.50, 'lead_days': 3, 'pack': 10},
+    {'ingredient': 'Contre-filet de bœuf', 'unit': 'kg', 'unit_cost': 32.00, 'lead_days': 2, 'pack': 5},
+    {'ingredient': 'Pommes de terre', 'unit': 'kg', 'unit_cost': 1.50, 'lead_days': 2, 'pack': 20},
+    {'ingredient': 'Huile de friture', 'unit': 'L', 'unit_cost': 3.00, 'lead_days': 5, 'pack': 20},
+    {'ingredient': 'Saumon Atlantique', 'unit': 'kg', 'unit_cost': 45.00, 'lead_days': 1, 'pack': 5},
+    {'ingredient': 'Poulet entier', 'unit': 'kg', 'unit_cost': 9.00, 'lead_days': 2, 'pack': 10},
+    {'ingredient': 'Pâtes sèches', 'unit': 'kg', 'unit_cost': 3.50, 'lead_days': 5, 'pack': 10},
+    {'ingredient': 'Riz arborio', 'unit': 'kg', 'unit_cost': 6.00, 'lead_days': 5, 'pack': 10},
+    {'ingredient': 'Pancetta', 'unit': 'kg', 'unit_cost': 22.00, 'lead_days': 3, 'pack': 2},
+    {'ingredient': 'Œufs', 'unit': 'u', 'unit_cost': 0.35, 'lead_days': 2, 'pack': 30},
+    {'ingredient': 'Crème 35%', 'unit': 'L', 'unit_cost': 5.00, 'lead_days': 2, 'pack': 4},
+    {'ingredient': 'Farine', 'unit': 'kg', 'unit_cost': 1.80, 'lead_days': 5, 'pack': 20},
+    {'ingredient': 'Mozzarella', 'unit': 'kg', 'unit_cost': 14.00, 'lead_days': 2, 'pack': 2},
+    {'ingredient': 'Sauce tomate', 'unit': 'L', 'unit_cost': 4.00, 'lead_days': 5, 'pack': 10},
+    {'ingredient': 'Champignons', 'unit': 'kg', 'unit_cost': 9.00, 'lead_days': 1, 'pack': 2},
+    {'ingredient': 'Bœuf haché', 'unit': 'kg', 'unit_cost': 13.00, 'lead_days': 2, 'pack': 5},
+    {'ingredient': 'Pains burger', 'unit': 'u', 'unit_cost': 0.60, 'lead_days': 2, 'pack': 24},
+    {'ingredient': 'Cheddar', 'unit': 'kg', 'unit_cost': 15.00, 'lead_days': 3, 'pack': 2},
+    {'ingredient': 'Beurre', 'unit': 'kg', 'unit_cost': 10.00, 'lead_days': 3, 'pack': 2},
+    {'ingredient': "Légumes d'accompagnement", 'unit': 'kg', 'unit_cost': 4.00, 'lead_days': 1, 'pack': 10},
+]
+
+# Recettes : quantité de chaque ingrédient par portion (unité de l'ingrédient)
+RECIPES = {
+    'Salade César': {'Laitue romaine': 0.20, 'Parmesan': 0.03, 'Croûtons': 0.05, 'Vinaigrette César': 0.06,
+                     'Pancetta': 0.03, 'Œufs': 1},
+    'Soupe du jour': {'Légumes à soupe': 0.25, 'Bouillon': 0.30, 'Crème 35%': 0.03},
+    'Steak-Frites': {'Contre-filet de bœuf': 0.35, 'Pommes de terre': 0.35, 'Huile de friture': 0.10,
+                     'Beurre': 0.03, "Légumes d'accompagnement": 0.15},
+    'Saumon Atlantique': {'Saumon Atlantique': 0.28, "Légumes d'accompagnement": 0.20, 'Beurre': 0.05,
+                          'Crème 35%': 0.05, 'Pommes de terre': 0.20},
+    'Poulet Rôti': {'Poulet entier': 0.50, 'Pommes de terre': 0.30, "Légumes d'accompagnement": 0.15,
+                    'Beurre': 0.03, 'Bouillon': 0.10},
+    'Pâtes Carbonara': {'Pâtes sèches': 0.15, 'Pancetta': 0.08, 'Œufs': 2, 'Parmesan': 0.04, 'Crème 35%': 0.05},
+    'Pizza Margherita': {'Farine': 0.20, 'Mozzarella': 0.15, 'Sauce tomate': 0.10, 'Huile de friture': 0.01},
+    'Risotto Champignons': {'Riz arborio': 0.10, 'Champignons': 0.15, 'Parmesan': 0.04, 'Bouillon': 0.30,
+                            'Beurre': 0.03, 'Crème 35%': 0.05},
+    'Burger Signature': {'Bœuf haché': 0.18, 'Pains burger': 1, 'Cheddar': 0.04, 'Laitue romaine': 0.03,
+                         'Pommes de terre': 0.25, 'Huile de friture': 0.08},
+}
+
+# Jours de consommation moyenne utilisés pour les alertes, et stock de sécurité en jours
+USAGE_DAYS = 14
+SAFETY_DAYS = 1
+# Une commande couvre le délai de livraison plus ces jours de consommation
+ORDER_COVER_DAYS = 7
+
+
+class RecipeMatrix:
+    """Matrice creuse plats × ingrédients au format CSR (`indptr`, `indices`, `data`).
+
+    Les lignes sont les plats (`dishes`), les colonnes les ingrédients
+    (`ingredients`, table de `INGREDIENTS`). Une copie transposée (ingrédients
+    en lignes) sert aux produits par blocs de colonnes.
+    """
+
+    def __init__(self, dishes, ingredients, indptr, indices, data):
+        self.dishes = pd.Index(dishes, name='name')
+        self.ingredients = ingredients.reset_index(drop=True)
+        self.indptr, self.indices, self.data = indptr, indices, data
+
+        rows = np.repeat(np.arange(len(self.dishes)), np.diff(indptr))
+        order = np.argsort(indices, kind='stable')
+        self._t_rows = rows[order]
+        self._t_data = data[order]
+        self._t_indptr = np.concatenate(([0], np.cumsum(np.bincount(indices, minlength=len(self.ingredients)))))
+
+    @classmethod
+    def from_recipes(cls, recipes=RECIPES, ingredients=INGREDIENTS):
+        """Matrice construite à partir de dictionnaires {plat: {ingrédient: quantité}}."""
+        ingredients = pd.DataFrame(ingredients)
+        codes = pd.Index(ingredients['ingredient'])
+        unknown = {name for recipe in recipes.values() for name in recipe} - set(codes)
+        if unknown:
+            raise ValueError(f"Ingrédients sans fiche : {', '.join(sorted(unknown))}")
+
+        lengths = [len(recipe) for recipe in recipes.values()]
+        indices = codes.get_indexer([name for recipe in recipes.values() for name in recipe])
+        data = np.array([qty for recipe in recipes.values() for qty in recipe.values()], dtype=float)
+        indptr = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        return cls(list(recipes), ingredients, indptr, indices.astype(np.int64), data)
+
+    @property
+    def unit_costs(self):
+        return self.ingredients['unit_cost'].to_numpy(dtype=float)
+
+    def plate_costs(self):
+        """Coût matière théorique d'une portion de chaque plat."""
+        rows = np.repeat(np.arange(len(self.dishes)), np.diff(self.indptr))
+        costs = np.bincount(rows, weights=self.data * self.unit_costs[self.indices], minlength=len(self.dishes))
+        return pd.Series(costs, index=self.dishes, name='plate_cost')
+
+    def explode(self, quantities):
+        """Consommation par ingrédient : transposée de la matrice × quantités de plats.
+
+        `quantities` est un vecteur (plats,) ou une matrice (plats, colonnes)
+        dans l'ordre de `dishes` ; le résultat a la forme (ingrédients,) ou
+        (ingrédients, colonnes).
+        """
+        quantities = np.asarray(quantities, dtype=float)
+        if quantities.ndim == 1:
+            rows = np.repeat(np.arange(len(self.dishes)), np.diff(self.indptr))
+            return np.bincount(self.indices, weights=self.data * quantities[rows], minlength=len(self.ingredients))
+
+        usage = np.zeros((len(self.ingredients), quantities.shape[1]))
+        used = np.diff(self._t_indptr) > 0
+        contributions = self._t_data[:, None] * quantities[self._t_rows]
+        usage[used] = np.add.reduceat(contributions, self._t_indptr[:-1][used], axis=0)
+        return usage
+
+    def usage(self, sales, by=('date', 'location')):
+        """Consommation théorique par groupe `by` et ingrédient à partir de ventes détaillées.
+
+        `sales` a les colonnes `name`, `qty` et celles de `by` (schéma de
+        `generate_menu_sales`). Produit creux : chaque ligne de vente agrégée
+        est dépliée sur les seuls ingrédients de sa recette. Les plats sans
+        recette sont ignorés. Colonnes : `by`, ingredient, unit, qty, cost.
+        """
+        by = list(by)
+        sold = sales.groupby(by + ['name'], observed=True, sort=False)['qty'].sum().reset_index()
+        dish = self.dishes.get_indexer(sold['name'].astype(object))
+        sold, dish = sold[dish >= 0], dish[dish >= 0]
+
+        if by:
+            grouped = sold.groupby(by, observed=True)
+            group_codes, groups = grouped.ngroup().to_numpy(), grouped.size().index
+        else:
+            group_codes, groups = np.zeros(len(sold), dtype=np.int64), [None]
+        counts = np.diff(self.indptr)[dish]
+        rows = np.repeat(np.arange(len(sold)), counts)
+        # Position de chaque coefficient de recette : début de la ligne du plat + rang dans la ligne
+        positions = np.repeat(self.indptr[dish] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+        n_ingredients = len(self.ingredients)
+        keys = group_codes[rows] * n_ingredients + self.indices[positions]
+        qty = np.bincount(keys, weights=self.data[positions] * sold['qty'].to_numpy(dtype=float)[rows],
+                          minlength=len(groups) * n_ingredients)
+        present = np.flatnonzero(qty)
+
+        result = pd.DataFrame(
+            {col: groups.get_level_values(col)[present // n_ingredients] for col in by} if by else {}
+        )
+        ingredient = present % n_ingredients
+        result['ingredient'] = pd.Categorical.from_codes(ingredient, categories=self.ingredients['ingredient'])
+        result['unit'] = self.ingredients['unit'].to_numpy()[ingredient]
+        result['qty'] = qty[present]
+        result['cost'] = result['qty'] * self.unit_costs[ingredient]
+        return result
+
+
+def reorder_alerts(daily_usage, stock, ingredients=INGREDIENTS, usage_days=USAGE_DAYS,
+                   safety_days=SAFETY_DAYS, cover_days=ORDER_COVER_DAYS):
+    """Ingrédients à commander par établissement.
+
+    `daily_usage` : consommation par (date, location, ingredient) ;
+    `stock` : stock disponible par (location, ingredient, on_hand). La
+    consommation moyenne porte sur les `usage_days` derniers jours. Point de
+    commande = consommation × (délai + sécurité) ; quantité suggérée = ce qui
+    manque pour couvrir délai + `cover_days`, arrondie au format de commande.
+    """
+    ingredients = pd.DataFrame(ingredients).set_index('ingredient')
+    last = daily_usage['date'].max()
+    recent = daily_usage[daily_usage['date'] > last - pd.Timedelta(days=usage_days)]
+    avg = recent.groupby(['location', 'ingredient'], observed=True)['qty'].sum() / usage_days
+
+    alerts = stock.set_index(['location', 'ingredient'])[['on_hand']].join(avg.rename('daily_usage'), how='inner')
+    names = alerts.index.get_level_values('ingredient').astype(object)
+    lead = ingredients['lead_days'].reindex(names).to_numpy()
+    pack = ingredients['pack'].reindex(names).to_numpy()
+
+    alerts['unit'] = ingredients['unit'].reindex(names).to_numpy()
+    alerts['days_of_cover'] = alerts['on_hand'] / alerts['daily_usage']
+    alerts['reorder_point'] = alerts['daily_usage'] * (lead + safety_days)
+    shortfall = alerts['daily_usage'] * (lead + cover_days) - alerts['on_hand']
+    alerts['order_qty'] = np.ceil(np.maximum(shortfall, 0) / pack) * pack
+    alerts['order_cost'] = alerts['order_qty'] * ingredients['unit_cost'].reindex(names).to_numpy()
+    alerts = alerts[alerts['on_hand'] <= alerts['reorder_point']]
+    return alerts.sort_values('days_of_cover').reset_index()
+
+
+def food_cost_variance(theoretical, actual, ingredients=INGREDIENTS):
+    """Écart entre consommation réelle et théorique par (location, ingredient), en quantité et en $.
+
+    `theoretical` et `actual` ont les colonnes location, ingredient, qty.
+    La consommation théorique est valorisée au coût du catalogue ; la
+    réelle à sa colonne `cost` si elle en a une (coût FIFO de
+    `InventoryLedger.actual_usage`, qui suit les prix payés), sinon au
+    coût du catalogue. Un écart positif est une perte (gaspillage,
+    portions, vol) ou une hausse de prix.
+    """
+    costs = pd.DataFrame(ingredients).set_index('ingredient')['unit_cost']
+    keys = ['location', 'ingredient']
+    actual_columns = ['qty', 'cost'] if 'cost' in actual.columns else ['qty']
+    variance = theoretical.groupby(keys, observed=True)['qty'].sum().rename('theoretical_qty').to_frame().join(
+        actual.groupby(keys, observed=True)[actual_columns].sum().rename(columns={'qty': 'actual_qty', 'cost': 'actual_cost'}),
+        how='outer',
+    ).fillna(0)
+    unit_cost = costs.reindex(variance.index.get_level_values('ingredient').astype(object)).to_numpy()
+    variance['theoretical_cost'] = variance['theoretical_qty'] * unit_cost
+    if 'actual_cost' not in variance:
+        variance['actual_cost'] = variance['actual_qty'] * unit_cost
+    variance = variance[['theoretical_qty', 'actual_qty', 'theoretical_cost', 'actual_cost']]
+    variance['variance_cost'] = variance['actual_cost'] - variance['theoretical_cost']
+    variance['variance_pct'] = variance['variance_cost'] / variance['theoretical_cost'].where(variance['theoretical_cost'] > 0) * 100
+    return variance.reset_index()
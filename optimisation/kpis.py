@@ -0,0 +1,278 @@
+"""KPIs essentiels de restaurant sur fenêtres glissantes.
+
+Le moteur conserve un tampon circulaire des 30 derniers jours et des sommes
+courantes par fenêtre (7 jours, 7 jours précédents, 30 jours) : l'ajout d'un
+jour met les KPIs à jour en O(1), sans relire l'historique.
+"""
+import numpy as np
+import pandas as pd
+
+from optimisation.generation import HOURS_OPEN_PER_DAY, REFERENCE_SEATS
+
+# Services en heures [début, fin[ : midi de 11h à 16h, soir de 18h à 23h (tranches
+# horaires 11 à 15 et 18 à 22). Les bornes peuvent tomber au quart d'heure (ex. 11.5)
+SERVICE_PERIODS = {'lunch': (11, 16), 'dinner': (18, 23)}
+
+# Contribution moyenne d'un couvert au seuil de rentabilité (60% du ticket)
+CONTRIBUTION_MARGIN_PCT = 0.60
+
+MEASURES = ['revenue', 'food_cost', 'covers', 'avg_ticket', 'total_costs', 'gross_profit',
+            'lunch_covers', 'dinner_covers', 'labor_cost', 'days']
+_IDX = {name: i for i, name in enumerate(MEASURES)}
+
+WINDOW_DAYS = 30
+WEEK_DAYS = 7
+
+
+def in_service(hours, period):
+    """Masque des heures (ou débuts de tranche, en heures décimales) comprises dans `period`."""
+    start, end = period
+    return (hours >= start) & (hours < end)
+
+
+def _pct_change(current, previous):
+    return ((current - previous) / previous * 100) if previous > 0 else 0
+
+
+class RollingKPIEngine:
+    """KPIs glissants d'un établissement, mis à jour jour par jour.
+
+    Le coût principal reprend le coût du personnel quotidien des ventes
+    (`df_sales['labor_cost']`), comme la marge brute et les scénarios.
+    """
+
+    def __init__(self, seats=REFERENCE_SEATS, hours_open_per_day=HOURS_OPEN_PER_DAY):
+        self.seats = seats
+        self.hours_open_per_day = hours_open_per_day
+        self.last_date = None
+
+        self._ring = np.zeros((WINDOW_DAYS, len(MEASURES)))
+        self._count = 0  # Jours ingérés depuis le début
+        self._sum_7 = np.zeros(len(MEASURES))
+        self._sum_14 = np.zeros(len(MEASURES))
+        self._sum_30 = np.zeros(len(MEASURES))
+
+        # Ticket moyen sur tout l'historique (seuil de rentabilité)
+        self._ticket_total = 0.0
+        self._ticket_days = 0
+
+    def _day_ago(self, n):
+        # Valeurs du jour ingéré il y a `n` jours (0 = dernier jour)
+        return self._ring[(self._count - 1 - n) % WINDOW_DAYS]
+
+    def _push(self, row):
+        # Retrait des jours qui sortent de chaque fenêtre avant d'écraser le tampon
+        if self._count >= WEEK_DAYS:
+            self._sum_7 -= self._day_ago(WEEK_DAYS - 1)
+        if self._count >= 2 * WEEK_DAYS:
+            self._sum_14 -= self._day_ago(2 * WEEK_DAYS - 1)
+        if self._count >= WINDOW_DAYS:
+            self._sum_30 -= self._day_ago(WINDOW_DAYS - 1)
+
+        self._ring[self._count % WINDOW_DAYS] = row
+        self._count += 1
+        self._sum_7 += row
+        self._sum_14 += row
+        self._sum_30 += row
+
+    def append_day(self, date, revenue, food_cost, covers, avg_ticket, total_costs, gross_profit,
+                   lunch_covers=0, dinner_covers=0, labor_cost=0.0):
+        """Ajoute le jour suivant le dernier jour ingéré.
+
+        Un jour déjà ingéré ou antérieur lève `ValueError` ; les jours manquants
+        (fermeture, export incomplet) sont comptés comme des jours sans ventes,
+        si bien que les fenêtres restent des fenêtres calendaires.
+        """
+        date = pd.Timestamp(date).normalize()
+        if self.last_date is not None:
+            gap = (date - self.last_date).days
+            if gap < 1:
+                raise ValueError(
+                    f"Jour {date:%Y-%m-%d} déjà ingéré ou antérieur au dernier jour ({self.last_date:%Y-%m-%d})"
+                )
+            for _ in range(min(gap - 1, WINDOW_DAYS)):
+                self._push(np.zeros(len(MEASURES)))
+
+        row = np.array([revenue, food_cost, covers, avg_ticket, total_costs, gross_profit,
+                        lunch_covers, dinner_covers, labor_cost, 1.0], dtype=float)
+        self._push(np.nan_to_num(row))
+
+        if not np.isnan(avg_ticket):
+            self._ticket_total += avg_ticket
+            self._ticket_days += 1
+        self.last_date = date
+        return self
+
+    def update(self, df_sales, df_hourly, service_periods=SERVICE_PERIODS):
+        """Ajoute, jour par jour, les jours de `df_sales` postérieurs au dernier jour ingéré."""
+        daily = _daily_measures(df_sales, df_hourly, service_periods)
+        if self.last_date is not None:
+            daily = daily[daily['date'] > self.last_date]
+        for row in daily.itertuples(index=False):
+            self.append_day(row.date, row.revenue, row.food_cost, row.covers, row.avg_ticket,
+                            row.total_costs, row.gross_profit, row.lunch_covers, row.dinner_covers, row.labor_cost)
+        return self
+
+    def kpis(self):
+        """Retourne les KPIs courants (mêmes clés que `calculate_restaurant_kpis`)."""
+        s30, s7 = self._sum_30, self._sum_7
+        prev_7 = self._sum_14 - self._sum_7
+        days_30 = max(s30[_IDX['days']], 1)
+        days_7 = max(s7[_IDX['days']], 1)
+
+        # Prime Cost (Food + Labor) - doit être < 60% idéalement
+        recent_revenue = s30[_IDX['revenue']]
+        recent_food_cost = s30[_IDX['food_cost']]
+        recent_labor_cost = s30[_IDX['labor_cost']]
+        prime_cost = recent_food_cost + recent_labor_cost
+        prime_cost_pct = (prime_cost / recent_revenue * 100) if recent_revenue > 0 else 0
+
+        # Table Turn Rate (rotation des tables) - cible 1.5-2.5 par service
+        lunch_turns = s30[_IDX['lunch_covers']] / days_30 / self.seats
+        dinner_turns = s30[_IDX['dinner_covers']] / days_30 / self.seats
+
+        # Seat Occupancy (taux d'occupation) - cible 65-75%
+        avg_daily_covers = s30[_IDX['covers']] / days_30
+        max_possible_covers = self.seats * self.hours_open_per_day
+        seat_occupancy = (avg_daily_covers / max_possible_covers * 100) if max_possible_covers > 0 else 0
+
+        # Break-even covers
+        avg_ticket_history = self._ticket_total / self._ticket_days if self._ticket_days else 0
+        avg_contribution_margin = avg_ticket_history * CONTRIBUTION_MARGIN_PCT
+        break_even_covers = (
+            (s30[_IDX['total_costs']] / days_30) / avg_contribution_margin if avg_contribution_margin > 0 else 0
+        )
+
+        # Semaine courante vs semaine précédente
+        revenue_7d, prev_revenue_7d = s7[_IDX['revenue']], prev_7[_IDX['revenue']]
+        covers_7d, prev_covers_7d = s7[_IDX['covers']], prev_7[_IDX['covers']]
+        ticket_7d = revenue_7d / covers_7d if covers_7d > 0 else 0
+        prev_ticket_7d = prev_revenue_7d / prev_covers_7d if prev_covers_7d > 0 else 0
+
+        return {
+            'prime_cost_pct': prime_cost_pct,
+            'lunch_turns': lunch_turns,
+            'dinner_turns': dinner_turns,
+            'seat_occupancy': seat_occupancy,
+            'break_even_covers': break_even_covers,
+            'recent_revenue': recent_revenue,
+            'recent_profit': s30[_IDX['gross_profit']],
+            'food_cost_pct': (recent_food_cost / recent_revenue * 100) if recent_revenue > 0 else 0,
+            'labor_cost_pct': (recent_labor_cost / recent_revenue * 100) if recent_revenue > 0 else 0,
+            'avg_ticket_30d': s30[_IDX['avg_ticket']] / days_30,
+            'revenue_7d': revenue_7d,
+            'revenue_change': _pct_change(revenue_7d, prev_revenue_7d),
+            'covers_7d': covers_7d,
+            'covers_change': _pct_change(covers_7d, prev_covers_7d),
+            'daily_covers_7d': covers_7d / days_7,
+            'avg_ticket_7d': ticket_7d,
+            'ticket_change': _pct_change(ticket_7d, prev_ticket_7d),
+            'profit_7d': s7[_IDX['gross_profit']],
+        }
+
+    @classmethod
+    def from_frames(cls, df_sales, df_hourly, seats=REFERENCE_SEATS, service_periods=SERVICE_PERIODS):
+        """Initialise le moteur à partir de l'historique d'un établissement.
+
+        Seuls les 30 derniers jours calendaires sont chargés dans les fenêtres ;
+        le reste de l'historique ne sert qu'au ticket moyen global.
+        """
+        return cls._from_daily(_daily_measures(df_sales, df_hourly, service_periods), seats)
+
+    @classmethod
+    def _from_daily(cls, daily, seats):
+        engine = cls(seats=seats)
+
+        # Fenêtres : les 30 derniers jours calendaires ; avant, seul le ticket moyen global compte
+        recent = daily['date'] > daily['date'].max() - pd.Timedelta(days=WINDOW_DAYS)
+        older = daily.loc[~recent, 'avg_ticket'].dropna()
+        engine._ticket_total = float(older.sum())
+        engine._ticket_days = len(older)
+
+        for row in daily[recent].itertuples(index=False):
+            engine.append_day(row.date, row.revenue, row.food_cost, row.covers, row.avg_ticket,
+                              row.total_costs, row.gross_profit, row.lunch_covers, row.dinner_covers, row.labor_cost)
+        return engine
+
+
+def _daily_measures(df_sales, df_hourly, service_periods=SERVICE_PERIODS):
+    # Couverts des services midi et soir par jour et établissement, joints aux ventes quotidiennes
+    hour = df_hourly['hour_num']
+    services = pd.DataFrame({
+        'date': df_hourly['date'],
+        'location': df_hourly['location'],
+        'lunch_covers': df_hourly['covers'].where(in_service(hour, service_periods['lunch']), 0),
+        'dinner_covers': df_hourly['covers'].where(in_service(hour, service_periods['dinner']), 0),
+    }).groupby(['location', 'date'], observed=True).sum()
+
+    daily = df_sales[['location', 'date', 'revenue', 'food_cost', 'covers', 'avg_ticket', 'total_costs', 'gross_profit',
+                      'labor_cost']]
+    daily = daily.join(services, on=['location', 'date'])
+    daily[['lunch_covers', 'dinner_covers']] = daily[['lunch_covers', 'dinner_covers']].fillna(0)
+    return daily.sort_values('date', kind='stable')
+
+
+def build_kpi_engines(df_sales, df_hourly, seats=REFERENCE_SEATS, service_periods=SERVICE_PERIODS):
+    """Construit un moteur par établissement : `{location: RollingKPIEngine}`.
+
+    `seats` est un nombre de places commun ou un dictionnaire par établissement.
+    """
+    daily = _daily_measures(df_sales, df_hourly, service_periods)
+
+    engines = {}
+    for location, location_daily in daily.groupby('location', observed=True, sort=False):
+        seat_count = seats.get(location, REFERENCE_SEATS) if isinstance(seats, dict) else seats
+        engines[location] = RollingKPIEngine._from_daily(location_daily, seat_count)
+    return engines
+
+
+def period_kpis(df_sales, df_hourly, previous_sales=None, seats=REFERENCE_SEATS,
+                hours_open_per_day=HOURS_OPEN_PER_DAY, service_periods=SERVICE_PERIODS):
+    """KPIs sur une période quelconque, à partir de tranches déjà découpées.
+
+    Le coût du personnel est celui des ventes de la période (`labor_cost`).
+    `previous_sales` permet de calculer l'évolution vs la période précédente.
+    `service_periods` définit les services midi et soir (clés 'lunch' et 'dinner').
+    """
+    days = max(df_sales['date'].nunique(), 1)
+    revenue = df_sales['revenue'].sum()
+    food_cost = df_sales['food_cost'].sum()
+    covers = df_sales['covers'].sum()
+    labor_cost = df_sales['labor_cost'].sum()
+
+    hour = df_hourly['hour_num']
+    lunch_covers = df_hourly['covers'].where(in_service(hour, service_periods['lunch']), 0).sum()
+    dinner_covers = df_hourly['covers'].where(in_service(hour, service_periods['dinner']), 0).sum()
+    hourly_days = max(df_hourly['date'].nunique(), 1)
+
+    avg_ticket = df_sales['avg_ticket'].mean() if len(df_sales) else 0
+    avg_contribution_margin = avg_ticket * CONTRIBUTION_MARGIN_PCT
+    max_possible_covers = seats * hours_open_per_day
+
+    kpis = {
+        'prime_cost_pct': ((food_cost + labor_cost) / revenue * 100) if revenue > 0 else 0,
+        'lunch_turns': lunch_covers / hourly_days / seats,
+        'dinner_turns': dinner_covers / hourly_days / seats,
+        'seat_occupancy': (covers / days / max_possible_covers * 100) if max_possible_covers > 0 else 0,
+        'break_even_covers': (
+            (df_sales['total_costs'].sum() / days) / avg_contribution_margin if avg_contribution_margin > 0 else 0
+        ),
+        'recent_revenue': revenue,
+        'recent_profit': df_sales['gross_profit'].sum(),
+        'food_cost_pct': (food_cost / revenue * 100) if revenue > 0 else 0,
+        'labor_cost': labor_cost,
+        'labor_cost_pct': (labor_cost / revenue * 100) if revenue > 0 else 0,
+        'avg_ticket': avg_ticket,
+        'daily_covers': covers / days,
+        'days': days,
+    }
+
+    if previous_sales is not None:
+        kpis['revenue_change'] = _pct_change(revenue, previous_sales['revenue'].sum())
+        kpis['covers_change'] = _pct_change(covers, previous_sales['covers'].sum())
+        kpis['profit_change'] = _pct_change(kpis['recent_profit'], previous_sales['gross_profit'].sum())
+        kpis['ticket_change'] = _pct_change(avg_ticket, previous_sales['avg_ticket'].mean() if len(previous_sales) else 0)
+        kpis['daily_covers_change'] = _pct_change(
+            covers / days, previous_sales['covers'].sum() / max(previous_sales['date'].nunique(), 1)
+        )
+    return kpis
@@ -0,0 +1,207 @@
+"""Coût de la main d'œuvre heure par heure à partir des pointages.
+
+Chaque pointage (employé, établissement, poste, entrée, sortie) est réparti
+sur les heures qu'il recouvre sans jointure croisée avec la grille horaire :
+l'heure d'entrée et celle de sortie reçoivent leur fraction, les heures
+pleines intermédiaires sont posées par un tableau de différences (+3600 s à
+la première, -3600 s après la dernière) puis une somme cumulée. Le calcul se
+fait par blocs de séries (établissement × poste) pour borner la mémoire ; il
+est linéaire en nombre de pointages et d'heures couvertes. Les heures
+travaillées sont ensuite jointes aux ventes horaires.
+
+    python -m optimisation.labor --locations 200 --days 365
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+HOUR = 3600
+KEYS = ['date', 'location', 'hour_num']
+
+# Heures de pointe et heures creuses [début, fin[ (comparaison du ratio ventes / coût)
+PEAK_HOURS = (18, 21)
+SLOW_HOURS = (14, 17)
+
+# Cases (séries × heures) calculées à la fois
+CHUNK_CELLS = 2_000_000
+
+
+def _accumulate(series, first, last, start, end, hour_start, rate, rows, n_hours):
+    """Secondes travaillées, coût et présents par case (rows, n_hours) d'un bloc de séries."""
+    cells = rows * (n_hours + 1)
+    row = series * (n_hours + 1)
+    same = first == last
+
+    # Heure d'entrée : jusqu'à la fin de l'heure (ou la sortie) ; heure de sortie : depuis son début
+    head = np.where(same, end - start, hour_start + HOUR - start)
+    tail = np.where(same, 0, end - (hour_start + (last - first) * HOUR))
+    # Heures pleines entre les deux : +3600 après l'entrée, -3600 à la sortie
+    middle = np.flatnonzero(last - first > 1)
+
+    def spread(weights):
+        dense = np.bincount(row + first, weights=head * weights, minlength=cells)
+        dense += np.bincount(row + last, weights=tail * weights, minlength=cells)
+        steps = np.bincount(row[middle] + first[middle] + 1, weights=HOUR * weights[middle], minlength=cells)
+        steps -= np.bincount(row[middle] + last[middle], weights=HOUR * weights[middle], minlength=cells)
+        return (dense + steps.reshape(rows, -1).cumsum(axis=1).ravel()).reshape(rows, -1)[:, :n_hours]
+
+    seconds = spread(np.ones(len(series)))
+    cost = spread(rate / HOUR)
+    present = np.bincount(row + first, minlength=cells) - np.bincount(row + last + 1, minlength=cells)
+    present = present.reshape(rows, -1).cumsum(axis=1)[:, :n_hours]
+    return seconds, cost, present
+
+
+def hourly_labor(punches, chunk_cells=CHUNK_CELLS):
+    """Heures, coût et employés présents par (date, établissement, poste, heure).
+
+    `punches` a les colonnes location, position, clock_in, clock_out et
+    hourly_rate (heure locale, sans fuseau). Un pointage sans durée est
+    ignoré. Seules les heures travaillées sont retournées, triées par
+    (établissement, poste, date, heure) ; `staff` compte les pointages qui
+    recouvrent l'heure, même partiellement.
+    """
+    clock_in = punches['clock_in'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    clock_out = punches['clock_out'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    valid = clock_out > clock_in
+    loc_codes, locations = pd.factorize(punches['location'], sort=True)
+    pos_codes, positions = pd.factorize(punches['position'], sort=True)
+    series = (loc_codes * len(positions) + pos_codes)[valid]
+    start, end = clock_in[valid], clock_out[valid]
+    rate = punches['hourly_rate'].to_numpy(dtype=float)[valid]
+    origin = start.min() // HOUR if len(start) else 0
+    first = start // HOUR - origin
+    last = (end - 1) // HOUR - origin
+    n_hours = int(last.max()) + 1 if len(start) else 0
+    n_series = len(locations) * len(positions)
+
+    order = np.argsort(series, kind='stable')
+    series, first, last, start, end, rate = (a[order] for a in (series, first, last, start, end, rate))
+    bounds = np.searchsorted(series, np.arange(n_series + 1))
+
+    parts = []
+    step = max(1, chunk_cells // (n_hours + 1))
+    for lo in range(0, n_series, step):
+        hi = min(lo + step, n_series)
+        block = slice(bounds[lo], bounds[hi])
+        if block.start == block.stop:
+            continue
+        seconds, cost, present = _accumulate(
+            series[block] - lo, first[block], last[block], start[block], end[block],
+            (first[block] + origin) * HOUR, rate[block], hi - lo, n_hours,
+        )
+        cell_series, cell_hour = np.nonzero(seconds > 0)
+        parts.append((cell_series + lo, cell_hour, present[cell_series, cell_hour],
+                      seconds[cell_series, cell_hour], cost[cell_series, cell_hour]))
+
+    # Aucun pointage d'une durée positive : même schéma, sans ligne
+    empty = (np.zeros(0, dtype=np.int64),) * 3 + (np.zeros(0),) * 2
+    series, hour, present, seconds, cost = (np.concatenate([part[i] for part in parts] or [empty[i]]) for i in range(5))
+    timestamp = ((hour + origin) * HOUR).astype('datetime64[s]')
+    return pd.DataFrame({
+        'date': timestamp.astype('datetime64[D]').astype('datetime64[ns]'),
+        'location': pd.Categorical.from_codes(series // len(positions), categories=list(locations)),
+        'position': pd.Categorical.from_codes(series % len(positions), categories=list(positions)),
+        'hour_num': (hour + origin) % 24,
+        'staff': present,
+        'labor_hours': seconds / HOUR,
+        'labor_cost': cost,
+    })
+
+
+def _hour_keys(frame, locations):
+    # Clé entière (jour, établissement, heure) ; l'ordre des clés est celui de KEYS
+    day = frame['date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+    codes, uniques = pd.factorize(frame['location'])
+    location = pd.Index(locations).get_indexer(pd.Index(uniques).astype(str))[codes]
+    return (day * len(locations) + location) * 24 + frame['hour_num'].to_numpy(dtype=np.int64)
+
+
+def labor_efficiency(labor, df_hourly):
+    """Heures travaillées jointes aux ventes horaires, par (date, établissement, heure, poste).
+
+    `revenue` est la vente de l'établissement sur l'heure (répétée pour
+    chaque poste) ; `labor_pct` = coût du poste / ventes × 100 et
+    `sales_per_labor_hour` = ventes / heures du poste. Une heure de vente
+    sans pointage apparaît avec un poste vide. Triée par date.
+    """
+    locations = sorted(set(map(str, pd.unique(labor['location']))) | set(map(str, pd.unique(df_hourly['location']))))
+    sales_keys = _hour_keys(df_hourly, locations)
+    revenue = df_hourly['revenue'].to_numpy(dtype=float)
+    order = np.argsort(sales_keys, kind='stable')
+    sales_keys, revenue = sales_keys[order], revenue[order]
+
+    # Ventes de l'heure de chaque ligne de pointage (recherche dans les clés triées, sans fusion)
+    labor_keys = _hour_keys(labor, locations)
+    found = np.minimum(np.searchsorted(sales_keys, labor_keys), max(len(sales_keys) - 1, 0))
+    matched = sales_keys[found] == labor_keys if len(sales_keys) else np.zeros(len(labor_keys), dtype=bool)
+    unstaffed = ~np.isin(sales_keys, labor_keys)
+
+    keys = np.concatenate([labor_keys, sales_keys[unstaffed]])
+    n_extra = int(unstaffed.sum())
+    table = pd.DataFrame({
+        'date': (keys // 24 // len(locations)).astype('datetime64[D]').astype('datetime64[ns]'),
+        'location': pd.Categorical.from_codes(keys // 24 % len(locations), categories=locations),
+        'hour_num': keys % 24,
+        'revenue': np.concatenate([np.where(matched, revenue[found], 0.0), revenue[unstaffed]]),
+        'position': pd.Categorical.from_codes(
+            np.concatenate([labor['position'].cat.codes.to_numpy(), np.full(n_extra, -1)]),
+            categories=labor['position'].cat.categories,
+        ),
+        **{column: np.concatenate([labor[column].to_numpy(), np.zeros(n_extra, dtype=labor[column].dtype)])
+           for column in ['staff', 'labor_hours', 'labor_cost']},
+    })
+    return _ratios(table).iloc[np.argsort(keys, kind='stable')].reset_index(drop=True)
+
+
+def _ratios(table):
+    revenue = table['revenue'].where(table['revenue'] > 0)
+    table['labor_pct'] = table['labor_cost'] / revenue * 100
+    table['sales_per_labor_hour'] = table['revenue'] / table['labor_hours'].where(table['labor_hours'] > 0)
+    return table
+
+
+def efficiency_summary(efficiency, by=('hour_num',)):
+    """Heures, coût et ventes par `by` (ex. heure, poste), avec `labor_pct` et ventes par heure travaillée.
+
+    Les ventes d'une (date, établissement, heure) ne sont comptées qu'une fois,
+    quel que soit le nombre de postes ; regroupées par poste, ce sont les
+    ventes des heures où le poste a travaillé.
+    """
+    by = list(by)
+    summary = efficiency.groupby(by, observed=True)[['labor_hours', 'labor_cost']].sum()
+    sales = efficiency if 'position' in by else efficiency.drop_duplicates(KEYS)
+    summary['revenue'] = sales.groupby(by, observed=True)['revenue'].sum()
+    return _ratios(summary).reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coût horaire de la main d'œuvre à partir de pointages simulés")
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--locations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from optimisation.generation import generate_data, generate_punches
+    from optimisation.staffing import plan_staffing
+
+    data = generate_data(days=args.days, locations=args.locations, seed=args.seed)
+    df_hourly, df_staff = data[1], data[4]
+    forecast = df_hourly[KEYS + ['covers']].rename(columns={'hour_num': 'hour', 'covers': 'predicted_covers'})
+    punches = generate_punches(plan_staffing(forecast, df_staff)[1], df_staff, seed=args.seed)
+
+    started = time.perf_counter()
+    labor = hourly_labor(punches)
+    elapsed = time.perf_counter() - started
+    efficiency = labor_efficiency(labor, df_hourly)
+
+    with pd.option_context('display.width', 160):
+        print(efficiency_summary(efficiency, by=['position']).round(1))
+        print(efficiency_summary(efficiency).round(1))
+    print(f"{len(punches):,} pointages -> {len(labor):,} heures × postes en {elapsed:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+"""Journal d'inventaire perpétuel : événements, couches de coût FIFO et instantanés.
+
+Le journal n'accepte que des ajouts : réceptions, transferts, pertes,
+consommation par les ventes et comptages physiques. Le stock et les couches
+FIFO de chaque (établissement, ingrédient) sont tenus à jour à chaque lot,
+sans boucle sur les événements : le coût d'une sortie est l'écart de la
+courbe de coût cumulé des entrées entre ses positions cumulées de début et
+de fin. Des instantanés de cet état, pris tous les `snapshot_every`
+événements, évitent de rejouer tout l'historique pour rouvrir un journal ou
+reconstituer une position passée.
+
+    python -m optimisation.ledger --locations 200 --days 365
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from optimisation.inventory import INGREDIENTS
+
+EVENTS = ['receipt', 'transfer_in', 'transfer_out', 'waste', 'depletion', 'count']
+INFLOWS = ['receipt', 'transfer_in']
+COLUMNS = ['timestamp', 'location', 'ingredient', 'event', 'qty', 'unit_cost', 'reference']
+
+# Motif affiché pour les écarts négatifs constatés au comptage
+COUNT_LOSS = "Écart d'inventaire"
+
+SNAPSHOT_EVERY = 1_000_000
+MANIFEST = 'manifest.json'
+
+
+def _group_cumsum(codes, values):
+    # Somme cumulée de `values` par code, dans l'ordre des lignes
+    return pd.Series(values).groupby(codes, sort=False).cumsum().to_numpy()
+
+
+class InventoryLedger:
+    """Journal d'événements d'inventaire avec stock et coûts FIFO incrémentaux.
+
+    Chaque événement porte `timestamp`, `location`, `ingredient`, `event`
+    (voir `EVENTS`), `qty` (quantité du mouvement, ou niveau compté pour
+    `count`), `unit_cost` (réceptions) et `reference` (facture, motif de
+    perte, identifiant commun aux deux lignes d'un transfert). Un transfert
+    entrant sans coût est valorisé au coût FIFO de la sortie de même
+    référence. Avec `path`, les lots et instantanés sont écrits en Parquet.
+    """
+
+    def __init__(self, path=None, snapshot_every=SNAPSHOT_EVERY, standard_costs=None):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.standard_costs = standard_costs or {row['ingredient']: row['unit_cost'] for row in INGREDIENTS}
+        self.keys = []  # code -> (établissement, ingrédient)
+        self._codes = {}
+        self.received = np.zeros(0)  # Quantités entrées et sorties cumulées par clé
+        self.consumed = np.zeros(0)
+        self.last_cost = np.zeros(0)
+        self._layers = tuple(np.zeros(0, dtype=dtype) for dtype in (np.int64, float, float, float))
+        self._parts = []  # {'start', 'end', 'rows', 'frame' ou 'file'}
+        self._snapshots = []  # {'offset', 'parts', 'timestamp', 'state' ou 'file'}
+        self.n_events = 0
+        self.last_timestamp = None
+
+    # --- État ---------------------------------------------------------------
+
+    def _key_codes(self, locations, ingredients):
+        loc_codes, loc_uniques = pd.factorize(locations)
+        ing_codes, ing_uniques = pd.factorize(ingredients)
+        pairs, uniques = pd.factorize(loc_codes * len(ing_uniques) + ing_codes)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, pair in enumerate(uniques):
+            key = (loc_uniques[pair // len(ing_uniques)], ing_uniques[pair % len(ing_uniques)])
+            if key not in self._codes:
+                self._codes[key] = len(self.keys)
+                self.keys.append(key)
+            mapping[i] = self._codes[key]
+
+        grow = len(self.keys) - len(self.received)
+        if grow:
+            standard = [self.standard_costs.get(ingredient, 0.0) for _, ingredient in self.keys[len(self.received):]]
+            self.received = np.concatenate([self.received, np.zeros(grow)])
+            self.consumed = np.concatenate([self.consumed, np.zeros(grow)])
+            self.last_cost = np.concatenate([self.last_cost, standard])
+        return mapping[pairs]
+
+    def _cumulative_cost(self, layers, keys, x):
+        """Coût cumulé des `x` premières unités entrées de chaque clé.
+
+        Les couches (clé, fin cumulée, coût cumulé en fin, coût unitaire) sont
+        triées par clé puis fin ; au-delà de la dernière couche (stock négatif)
+        la courbe est prolongée au dernier coût connu.
+        """
+        layer_key, layer_end, layer_cum, layer_unit = layers
+        n_keys = len(self.keys)
+        first = np.searchsorted(layer_key, np.arange(n_keys), 'left')
+        last = np.searchsorted(layer_key, np.arange(n_keys), 'right') - 1
+        has_layers = last[keys] >= first[keys]
+        if not has_layers.any():
+            return x * self.last_cost[keys]
+
+        # Axe global croissant : fins cumulées décalées par clé, recherche dichotomique unique
+        end_max = np.where(last >= first, layer_end[np.maximum(last, 0)], 0.0)
+        base = np.concatenate(([0.0], np.cumsum(end_max + 1)[:-1]))
+        clipped = np.minimum(x, end_max[keys])
+        layer = np.searchsorted(base[layer_key] + layer_end, base[keys] + clipped, 'left')
+        layer = np.clip(layer, first[keys], np.maximum(last[keys], first[keys]))
+        layer = np.minimum(layer, len(layer_key) - 1)
+        cost = layer_cum[layer] - (layer_end[layer] - x) * layer_unit[layer]
+        return np.where(has_layers, cost, x * self.last_cost[keys])
+
+    def _carry_costs(self, codes, priced):
+        # Coût unitaire de chaque ligne : dernière entrée valorisée de la clé à cette ligne du lot
+        # (report vers l'avant), à défaut dernier coût connu avant le lot
+        carried = pd.Series(priced).groupby(codes, sort=False).ffill().to_numpy()
+        return np.where(np.isnan(carried), self.last_cost[codes], carried)
+
+    def _value_flows(self, codes, inflow_qty, unit, outflow_qty):
+        # Nouvelles couches pour les entrées du lot, puis coût FIFO de chaque sortie
+        layer_key, layer_end, layer_cum, layer_unit = self._layers
+        inflow = inflow_qty > 0
+        last_cum = np.zeros(len(self.keys))
+        if len(layer_key):
+            last_cum[layer_key] = layer_cum  # Dernière couche de chaque clé (ordre trié)
+
+        new_key = codes[inflow]
+        new_end = self.received[new_key] + _group_cumsum(new_key, inflow_qty[inflow])
+        new_cum = last_cum[new_key] + _group_cumsum(new_key, (inflow_qty * unit)[inflow])
+        merged = [np.concatenate(pair) for pair in zip(self._layers, (new_key, new_end, new_cum, unit[inflow]))]
+        order = np.lexsort((merged[1], merged[0]))
+        layers = tuple(array[order] for array in merged)
+
+        outflow = outflow_qty > 0
+        out_key = codes[outflow]
+        out_end = self.consumed[out_key] + _group_cumsum(out_key, outflow_qty[outflow])
+        out_cost = np.zeros(len(codes))
+        out_cost[outflow] = (self._cumulative_cost(layers, out_key, out_end)
+                             - self._cumulative_cost(layers, out_key, out_end - outflow_qty[outflow]))
+        return layers, out_cost
+
+    def _apply(self, events):
+        """Met à jour stock et couches avec un lot trié ; retourne le lot avec `delta` et `cost`."""
+        codes = self._key_codes(events['location'], events['ingredient'])
+        kind = events['event'].to_numpy(dtype=object)
+        qty = events['qty'].to_numpy(dtype=float)
+        is_inflow = np.isin(kind, INFLOWS)
+        is_count = kind == 'count'
+        delta = np.where(is_inflow, np.abs(qty), -np.abs(qty))
+        delta[is_count] = 0.0
+
+        # Comptage : ajustement = niveau compté - stock théorique juste avant
+        if is_count.any():
+            running = _group_cumsum(codes, delta)
+            rows = np.flatnonzero(is_count)
+            previous = pd.Series(rows).groupby(codes[rows]).shift().to_numpy()
+            has_previous = ~np.isnan(previous)
+            prev_rows = np.where(has_previous, previous, 0).astype(np.int64)
+            reference = np.where(has_previous, qty[prev_rows] - running[prev_rows],
+                                 (self.received - self.consumed)[codes[rows]])
+            delta[rows] = qty[rows] - (reference + running[rows])
+
+        inflow_qty = np.maximum(delta, 0.0)
+        outflow_qty = np.maximum(-delta, 0.0)
+        # Entrées sans coût (gains de comptage, transferts) : coût de la dernière entrée valorisée,
+        # y compris une réception plus tôt dans le même lot
+        priced = np.where(np.isin(kind, INFLOWS), events['unit_cost'].to_numpy(dtype=float), np.nan)
+        unit = self._carry_costs(codes, priced)
+
+        layers, out_cost = self._value_flows(codes, inflow_qty, unit, outflow_qty)
+
+        # Transferts entrants sans coût : coût FIFO de la sortie de même référence, puis revalorisation
+        transfer_in = (kind == 'transfer_in') & events['unit_cost'].isna().to_numpy()
+        if transfer_in.any():
+            outgoing = pd.Series(out_cost / np.where(outflow_qty > 0, outflow_qty, 1),
+                                 index=events['reference'].to_numpy())[kind == 'transfer_out']
+            matched = outgoing[~outgoing.index.duplicated()].reindex(events['reference'].to_numpy()[transfer_in])
+            priced[transfer_in] = matched.to_numpy()
+            unit = self._carry_costs(codes, priced)
+            layers, out_cost = self._value_flows(codes, inflow_qty, unit, outflow_qty)
+
+        n_keys = len(self.keys)
+        self.received += np.bincount(codes, weights=inflow_qty, minlength=n_keys)
+        self.consumed += np.bincount(codes, weights=outflow_qty, minlength=n_keys)
+        inflow = inflow_qty > 0
+        self.last_cost[codes[inflow]] = unit[inflow]  # Dernière entrée de chaque clé (ordre chronologique)
+
+        # Couches entièrement consommées retirées ; la dernière de chaque clé reste (dernier coût)
+        layer_key, layer_end = layers[0], layers[1]
+        is_last = np.append(layer_key[1:] != layer_key[:-1], True)
+        keep = (layer_end > self.consumed[layer_key]) | is_last
+        self._layers = tuple(array[keep] for array in layers)
+
+        return events.assign(delta=delta, cost=np.where(inflow, inflow_qty * unit, -out_cost))
+
+    def _normalize(self, events):
+        missing = set(COLUMNS) - set(events.columns) - {'unit_cost', 'reference'}
+        if missing:
+            raise ValueError(f"Colonnes manquantes : {', '.join(sorted(missing))}")
+        unknown = set(events['event'].unique()) - set(EVENTS)
+        if unknown:
+            raise ValueError(f"Événements inconnus : {', '.join(sorted(map(str, unknown)))}")
+        events = events.assign(
+            timestamp=events['timestamp'].astype('datetime64[ns]'),
+            location=events['location'].astype(str),
+            ingredient=events['ingredient'].astype(str),
+            event=events['event'].astype(str),
+            qty=events['qty'].astype(float),
+            unit_cost=events['unit_cost'].astype(float) if 'unit_cost' in events else np.nan,
+            reference=events['reference'].astype(object) if 'reference' in events else None,
+        )[COLUMNS]
+        return events.sort_values('timestamp', kind='stable', ignore_index=True)
+
+    # --- Ajouts et instantanés ----------------------------------------------
+
+    def append(self, events):
+        """Ajoute un lot d'événements (triés par date dans le lot).
+
+        Le journal est chronologique : un lot antérieur au dernier événement
+        enregistré lève `ValueError` (saisir une correction datée du jour).
+        """
+        events = self._normalize(events)
+        if not len(events):
+            return self
+        if self.last_timestamp is not None and events['timestamp'].iloc[0] < self.last_timestamp:
+            raise ValueError(f"Événements antérieurs au {self.last_timestamp} : le journal n'accepte que des ajouts")
+
+        enriched = self._apply(events)
+        part = {'start': enriched['timestamp'].iloc[0], 'end': enriched['timestamp'].iloc[-1], 'rows': len(enriched)}
+        if self.path:
+            part['file'] = os.path.join('events', f"part-{len(self._parts):06d}.parquet")
+            os.makedirs(os.path.join(self.path, 'events'), exist_ok=True)
+            enriched.to_parquet(os.path.join(self.path, part['file']), index=False)
+        else:
+            part['frame'] = enriched
+        self._parts.append(part)
+        self.n_events += len(enriched)
+        self.last_timestamp = part['end']
+
+        since = self.n_events - (self._snapshots[-1]['offset'] if self._snapshots else 0)
+        if since >= self.snapshot_every:
+            self.snapshot()
+        elif self.path:
+            self._write_manifest()
+        return self
+
+    def _state(self):
+        locations, ingredients = (list(col) for col in zip(*self.keys)) if self.keys else ([], [])
+        balances = pd.DataFrame({'location': locations, 'ingredient': ingredients, 'received': self.received,
+                                 'consumed': self.consumed, 'last_cost': self.last_cost})
+        layers = pd.DataFrame(dict(zip(['key', 'end', 'cum_cost', 'unit_cost'], self._layers)))
+        return balances, layers
+
+    def _restore(self, balances, layers):
+        self.keys = list(zip(balances['location'], balances['ingredient']))
+        self._codes = {key: code for code, key in enumerate(self.keys)}
+        self.received = balances['received'].to_numpy(dtype=float).copy()
+        self.consumed = balances['consumed'].to_numpy(dtype=float).copy()
+        self.last_cost = balances['last_cost'].to_numpy(dtype=float).copy()
+        self._layers = (layers['key'].to_numpy(dtype=np.int64).copy(),) + tuple(
+            layers[col].to_numpy(dtype=float).copy() for col in ['end', 'cum_cost', 'unit_cost']
+        )
+
+    def snapshot(self):
+        """Enregistre l'état courant (soldes et couches FIFO) à la position actuelle du journal."""
+        balances, layers = self._state()
+        snapshot = {'offset': self.n_events, 'parts': len(self._parts), 'timestamp': self.last_timestamp}
+        if self.path:
+            snapshot['file'] = os.path.join('snapshots', f"snapshot-{self.n_events:012d}")
+            os.makedirs(os.path.join(self.path, 'snapshots'), exist_ok=True)
+            balances.to_parquet(os.path.join(self.path, snapshot['file'] + '-balances.parquet'), index=False)
+            layers.to_parquet(os.path.join(self.path, snapshot['file'] + '-layers.parquet'), index=False)
+        else:
+            snapshot['state'] = (balances, layers)
+        self._snapshots.append(snapshot)
+        if self.path:
+            self._write_manifest()
+        return self
+
+    def _write_manifest(self):
+        def entry(item):
+            return {k: (str(v) if isinstance(v, pd.Timestamp) else v) for k, v in item.items()}
+        manifest = {
+            'n_events': self.n_events,
+            'last_timestamp': str(self.last_timestamp) if self.last_timestamp is not None else None,
+            'parts': [entry(part) for part in self._parts],
+            'snapshots': [entry(snapshot) for snapshot in self._snapshots],
+        }
+        with open(os.path.join(self.path, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    def _snapshot_state(self, snapshot):
+        if 'state' in snapshot:
+            return snapshot['state']
+        return tuple(pd.read_parquet(os.path.join(self.path, snapshot['file'] + f'-{name}.parquet'))
+                     for name in ('balances', 'layers'))
+
+    def _part_frame(self, part, columns=None):
+        if 'frame' in part:
+            return part['frame'] if columns is None else part['frame'][columns]
+        return pd.read_parquet(os.path.join(self.path, part['file']), columns=columns)
+
+    @classmethod
+    def open(cls, path, snapshot_every=SNAPSHOT_EVERY, standard_costs=None):
+        """Rouvre un journal écrit sur disque : dernier instantané, puis seuls les lots suivants."""
+        ledger = cls(path, snapshot_every, standard_costs)
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+
+        def parse(item):
+            return dict(item, **{k: pd.Timestamp(item[k]) for k in ('start', 'end', 'timestamp') if item.get(k)})
+        parts = [parse(part) for part in manifest['parts']]
+        ledger._snapshots = [parse(snapshot) for snapshot in manifest['snapshots']]
+
+        replay_from = 0
+        if ledger._snapshots:
+            ledger._restore(*ledger._snapshot_state(ledger._snapshots[-1]))
+            replay_from = ledger._snapshots[-1]['parts']
+        ledger._parts = parts[:replay_from]
+        for part in parts[replay_from:]:
+            ledger._apply(ledger._part_frame(part, COLUMNS))
+            ledger._parts.append(part)
+        ledger.n_events = manifest['n_events']
+        ledger.last_timestamp = pd.Timestamp(manifest['last_timestamp']) if manifest['last_timestamp'] else None
+        return ledger
+
+    # --- Consultation -------------------------------------------------------
+
+    def positions(self):
+        """Stock par (location, ingredient) : quantité, valeur FIFO et coût unitaire moyen des couches restantes."""
+        codes = np.arange(len(self.keys))
+        value = self._cumulative_cost(self._layers, codes, self.received) - \
+            self._cumulative_cost(self._layers, codes, self.consumed)
+        balances = self._state()[0][['location', 'ingredient']]
+        on_hand = self.received - self.consumed
+        return balances.assign(
+            on_hand=on_hand,
+            value=value,
+            unit_cost=np.where(on_hand > 0, value / np.where(on_hand > 0, on_hand, 1), self.last_cost),
+        ).sort_values(['location', 'ingredient'], ignore_index=True)
+
+    def position_at(self, timestamp):
+        """Stock à une date passée : instantané le plus proche, puis lots suivants jusqu'à `timestamp`."""
+        timestamp = pd.Timestamp(timestamp)
+        replay = InventoryLedger(standard_costs=self.standard_costs)
+        start = 0
+        for snapshot in reversed(self._snapshots):
+            if snapshot['timestamp'] is not None and snapshot['timestamp'] <= timestamp:
+                replay._restore(*self._snapshot_state(snapshot))
+                start = snapshot['parts']
+                break
+        for part in self._parts[start:]:
+            if part['start'] > timestamp:
+                break
+            frame = self._part_frame(part, COLUMNS)
+            replay._apply(frame[frame['timestamp'] <= timestamp])
+        return replay.positions()
+
+    def movements(self, start=None, end=None):
+        """Événements enrichis (`delta` signé, `cost` FIFO signé) dont la date est dans `[start, end]`.
+
+        Les bornes sont des jours inclus ; seuls les lots qui recoupent l'intervalle sont lus.
+        """
+        lo = pd.Timestamp(start) if start is not None else None
+        hi = pd.Timestamp(end) + pd.Timedelta(days=1) if end is not None else None
+        frames = []
+        for part in self._parts:
+            if (lo is not None and part['end'] < lo) or (hi is not None and part['start'] >= hi):
+                continue
+            frame = self._part_frame(part)
+            mask = np.ones(len(frame), dtype=bool)
+            if lo is not None:
+                mask &= (frame['timestamp'] >= lo).to_numpy()
+            if hi is not None:
+                mask &= (frame['timestamp'] < hi).to_numpy()
+            frames.append(frame[mask])
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS + ['delta', 'cost'])
+        return pd.concat(frames, ignore_index=True)
+
+    def losses(self, start=None, end=None):
+        """Pertes par (location, ingredient, reason) : pertes déclarées par motif et écarts négatifs de comptage."""
+        moves = self.movements(start, end)
+        lost = moves[(moves['event'] == 'waste') | ((moves['event'] == 'count') & (moves['delta'] < 0))]
+        reason = np.where(lost['event'] == 'count', COUNT_LOSS, lost['reference'].fillna('Non précisé'))
+        return lost.assign(reason=reason, qty=-lost['delta'], cost=-lost['cost']).groupby(
+            ['location', 'ingredient', 'reason'], observed=True, as_index=False
+        )[['qty', 'cost']].sum().sort_values('cost', ascending=False, ignore_index=True)
+
+    def actual_usage(self, start=None, end=None):
+        """Consommation réelle par (location, ingredient) : ventes, pertes et écarts de comptage (hors transferts)."""
+        moves = self.movements(start, end)
+        used = moves[moves['event'].isin(['depletion', 'waste', 'count'])]
+        return used.assign(qty=-used['delta'], cost=-used['cost']).groupby(
+            ['location', 'ingredient'], observed=True, as_index=False
+        )[['qty', 'cost']].sum()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai du journal d'inventaire")
+    parser.add_argument('--locations', type=int, default=10)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--batch-days', type=int, default=1, help="Jours d'événements par lot ajouté")
+    parser.add_argument('--snapshot-every', type=int, default=SNAPSHOT_EVERY)
+    parser.add_argument('--path', default=None, help="Répertoire du journal (Parquet)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from optimisation.generation import generate_inventory_events, generate_menu_sales
+    from optimisation.inventory import RecipeMatrix
+
+    daily_usage = RecipeMatrix.from_recipes().usage(
+        generate_menu_sales(days=args.days, locations=args.locations, seed=args.seed)
+    )
+    events = generate_inventory_events(daily_usage, INGREDIENTS, seed=args.seed)
+    print(f"{len(events):,} événements sur {args.days} jours, {args.locations} établissements")
+
+    ledger = InventoryLedger(args.path, snapshot_every=args.snapshot_every)
+    days = events['timestamp'].dt.normalize()
+    bounds = np.searchsorted(days.to_numpy(), pd.date_range(days.iloc[0], days.iloc[-1], freq=f"{args.batch_days}D"))
+    started = time.perf_counter()
+    for lo, hi in zip(bounds, np.append(bounds[1:], len(events))):
+        ledger.append(events.iloc[lo:hi])
+    elapsed = time.perf_counter() - started
+    print(f"ajout : {elapsed:.2f} s ({len(events) / elapsed:,.0f} événements/s, {len(bounds)} lots)")
+
+    started = time.perf_counter()
+    positions = ledger.positions()
+    print(f"position courante : {(time.perf_counter() - started) * 1000:.1f} ms, "
+          f"valeur du stock {positions['value'].sum():,.0f}$")
+    if args.path:
+        started = time.perf_counter()
+        InventoryLedger.open(args.path, args.snapshot_every)
+        print(f"réouverture : {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Ingénierie du menu : classification vectorisée des plats.
+
+Chaque plat est classé selon sa popularité (quantité vendue) et sa marge par
+rapport aux moyennes de son groupe : toute la carte, une catégorie, un
+établissement ou un couple établissement × catégorie. Seuils, classes et
+potentiels sont calculés colonne par colonne, sans boucle sur les plats.
+"""
+import numpy as np
+import pandas as pd
+
+CLASSES = ['Vedette', 'Populaire', 'Potentiel', 'À revoir']
+
+# Grain des seuils proposé dans l'onglet Menu : colonnes de regroupement
+THRESHOLD_GROUPS = {
+    'Carte entière': [],
+    'Par catégorie': ['category'],
+    'Par établissement': ['location'],
+    'Par établissement et catégorie': ['location', 'category'],
+}
+
+# Hausse de prix testée sur les plats Populaires
+PRICE_INCREASE_PCT = 0.10
+
+
+def classify_menu(df_menu, by=None, price_increase_pct=PRICE_INCREASE_PCT):
+    """Ajoute seuils, classe et potentiels à chaque plat de `df_menu`.
+
+    `by` liste les colonnes qui définissent les groupes de seuils (aucune =
+    moyennes de toute la carte). Colonnes ajoutées : `qty_threshold`,
+    `margin_threshold`, `classification` (catégorielle, ordre de `CLASSES`),
+    `contribution_margin`, `price_increase` et `price_increase_potential`
+    (non nul pour les Populaires uniquement).
+    """
+    menu = df_menu.copy()
+    by = [col for col in (by or []) if col in menu.columns]
+
+    if by:
+        groups = menu.groupby(by, observed=True, sort=False)
+        menu['qty_threshold'] = groups['qty'].transform('mean')
+        menu['margin_threshold'] = groups['margin'].transform('mean')
+    else:
+        menu['qty_threshold'] = menu['qty'].mean()
+        menu['margin_threshold'] = menu['margin'].mean()
+
+    popular = menu['qty'].to_numpy() >= menu['qty_threshold'].to_numpy()
+    profitable = menu['margin'].to_numpy() >= menu['margin_threshold'].to_numpy()
+    codes = np.select(
+        [popular & profitable, popular & ~profitable, ~popular & profitable],
+        [0, 1, 2],
+        default=3,
+    )
+    menu['classification'] = pd.Categorical.from_codes(codes, categories=CLASSES)
+
+    menu['contribution_margin'] = menu['revenue'] * menu['margin'] / 100
+    menu['price_increase'] = menu['price'] * price_increase_pct
+    menu['price_increase_potential'] = np.where(codes == 1, menu['qty'] * menu['price_increase'], 0.0)
+    return menu
+
+
+def class_summary(menu):
+    """Nombre de plats, plats (liste ordonnée) et potentiel de hausse de prix par classe."""
+    groups = menu.groupby('classification', observed=False)
+    return pd.DataFrame({
+        'count': groups.size(),
+        'names': groups['name'].agg(list),
+        'price_increase_potential': groups['price_increase_potential'].sum(),
+    }).reindex(CLASSES)
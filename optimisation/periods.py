@@ -0,0 +1,78 @@
+"""Périodes d'analyse et découpage temporel par recherche binaire.
+
+Les tables datées sont triées une fois sur un `DatetimeIndex` ; une période
+se découpe ensuite en deux `searchsorted` et une tranche positionnelle, sans
+masque booléen sur l'ensemble de l'historique.
+"""
+import pandas as pd
+
+# Périodes proposées dans la barre latérale (nombre de jours jusqu'à la dernière date)
+PERIOD_DAYS = {
+    "Aujourd'hui": 1,
+    "Cette semaine": 7,
+    "4 semaines roulantes": 28,
+}
+CUSTOM_PERIOD = "Période personnalisée"
+
+ONE_DAY = pd.Timedelta(days=1)
+
+
+def period_bounds(choice, last_date, custom_range=None):
+    """Bornes inclusives `(début, fin)` de la période choisie, en jours calendaires."""
+    if choice == CUSTOM_PERIOD:
+        start, end = custom_range
+        return pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+
+    end = pd.Timestamp(last_date).normalize()
+    return end - (PERIOD_DAYS[choice] - 1) * ONE_DAY, end
+
+
+def previous_bounds(start, end):
+    """Période de même durée précédant immédiatement `(début, fin)`."""
+    length = end - start + ONE_DAY
+    return start - length, start - ONE_DAY
+
+
+class TimeSlicer:
+    """Tranches par période d'un tableau daté (`date` normalisée, plusieurs lignes par jour possibles)."""
+
+    def __init__(self, frame, column='date'):
+        if not frame[column].is_monotonic_increasing:
+            frame = frame.sort_values(column, kind='stable', ignore_index=True)
+        self.frame = frame
+        self.index = pd.DatetimeIndex(frame[column])
+
+    @property
+    def first_date(self):
+        return self.index[0] if len(self.index) else None
+
+    @property
+    def last_date(self):
+        return self.index[-1] if len(self.index) else None
+
+    def slice(self, start=None, end=None):
+        """Lignes dont la date est dans `[début, fin]` (bornes `None` = ouvertes)."""
+        lo = 0 if start is None else self.index.searchsorted(pd.Timestamp(start), 'left')
+        hi = len(self.index) if end is None else self.index.searchsorted(pd.Timestamp(end) + ONE_DAY, 'left')
+        return self.frame.iloc[lo:hi]
+
+
+def menu_for_period(cube, df_menu, start, end, location=None):
+    """Carte avec les quantités et revenus de la période, tirés du cube.
+
+    Prix, coûts et marges restent ceux de `df_menu` ; un plat non vendu sur la
+    période apparaît avec une quantité nulle. `location` restreint la carte et
+    les ventes à un établissement.
+    """
+    where = {'date': (start, end)}
+    if location is not None:
+        where['location'] = location
+        df_menu = df_menu[df_menu['location'] == location]
+    sold = cube.query(['qty', 'revenue'], by=['name'], where=where)
+    sold.index = sold.index.astype(str)
+
+    menu = df_menu.drop(columns=['qty', 'revenue'])
+    menu = menu.join(sold, on='name')
+    menu['qty'] = menu['qty'].fillna(0).astype('int64')
+    menu['revenue'] = menu['revenue'].fillna(0.0)
+    return menu[df_menu.columns].reset_index(drop=True)
@@ -0,0 +1,158 @@
+"""Simulateur de prix de la carte : réponse de la demande par Monte Carlo.
+
+La demande de chaque plat suit une élasticité-prix constante,
+q' = q × (p'/p)^ε, avec une élasticité incertaine (tirée autour de celle de
+sa catégorie) et un bruit de demande multiplicatif. Tous les scénarios de
+prix (variations par plat ou par catégorie) et tous les tirages sont évalués
+en un seul calcul NumPy (scénarios × tirages × plats) ; la situation actuelle
+utilise les mêmes tirages, si bien que les écarts de revenus et de marge
+sont appariés.
+"""
+import numpy as np
+import pandas as pd
+
+# Élasticité-prix de la demande par catégorie (hausse de 1 % -> variation de ε % des quantités)
+CATEGORY_ELASTICITY = {
+    'Entrées': -0.8,
+    'Viandes': -1.1,
+    'Poissons': -1.2,
+    'Pâtes': -0.9,
+    'Pizzas': -1.3,
+    'Burgers': -1.0,
+}
+DEFAULT_ELASTICITY = -1.0
+
+# Sensibilité de la clientèle au prix : facteur appliqué aux élasticités
+SENSITIVITY = {'Faible': 0.6, 'Moyenne': 1.0, 'Forte': 1.5}
+
+# Incertitude : écart-type de l'élasticité et bruit relatif de la demande
+ELASTICITY_SD = 0.25
+DEMAND_SD = 0.08
+
+DRAWS = 2000
+# Variations de prix testées : -10 % à +25 % par pas de 1 %
+PRICE_STEPS = np.round(np.arange(-0.10, 0.2501, 0.01), 2)
+# Bandes de distribution (percentiles)
+BANDS = (5, 95)
+
+# Éléments (scénarios × tirages × plats) calculés à la fois
+CHUNK_ELEMENTS = 4_000_000
+
+
+def scaled_elasticity(sensitivity='Moyenne', elasticity=CATEGORY_ELASTICITY):
+    """Élasticités par catégorie multipliées par le facteur de `sensitivity` (voir `SENSITIVITY`)."""
+    factor = SENSITIVITY[sensitivity]
+    return {category: value * factor for category, value in elasticity.items()}
+
+
+def _draws(menu, elasticity, draws, seed, elasticity_sd, demand_sd):
+    rng = np.random.default_rng(seed)
+    base = np.array([elasticity.get(category, DEFAULT_ELASTICITY) for category in menu['category']], dtype=float)
+    # Une demande ne croît pas avec le prix : élasticité bornée à -0,05
+    elasticities = np.minimum(rng.normal(base, elasticity_sd, (draws, len(menu))), -0.05)
+    noise = rng.lognormal(-demand_sd ** 2 / 2, demand_sd, (draws, len(menu)))
+    return elasticities, noise
+
+
+def _outcomes(menu, changes, elasticity, draws, seed, elasticity_sd, demand_sd, per_dish):
+    """Revenus et marges (scénarios, tirages[, plats]) et ceux de la situation actuelle."""
+    changes = np.asarray(changes, dtype=float)
+    if changes.ndim == 1:
+        changes = np.broadcast_to(changes[:, None], (len(changes), len(menu)))
+    if (changes <= -1).any():
+        raise ValueError("Une variation de prix doit rester supérieure à -100 %")
+
+    price = menu['price'].to_numpy(dtype=float)
+    cost = menu['cost'].to_numpy(dtype=float)
+    elasticities, noise = _draws(menu, elasticity, draws, seed, elasticity_sd, demand_sd)
+    base_qty = menu['qty'].to_numpy(dtype=float) * noise  # (tirages, plats)
+
+    shape = changes.shape[:1] + base_qty.shape if per_dish else (changes.shape[0], draws)
+    revenue, margin = np.empty(shape), np.empty(shape)
+    # Carte vide : la somme sur zéro plat donne des revenus et marges nuls
+    step = max(1, CHUNK_ELEMENTS // max(base_qty.size, 1))
+    for start in range(0, len(changes), step):
+        ratio = 1 + changes[start:start + step, None, :]  # (scénarios, 1, plats)
+        qty = base_qty * ratio ** elasticities
+        dish_revenue = qty * price * ratio
+        dish_margin = qty * (price * ratio - cost)
+        if per_dish:
+            revenue[start:start + step], margin[start:start + step] = dish_revenue, dish_margin
+        else:
+            revenue[start:start + step], margin[start:start + step] = dish_revenue.sum(-1), dish_margin.sum(-1)
+
+    base_revenue, base_margin = base_qty * price, base_qty * (price - cost)
+    if not per_dish:
+        base_revenue, base_margin = base_revenue.sum(-1), base_margin.sum(-1)
+    return revenue, margin, base_revenue, base_margin
+
+
+def simulate_prices(menu, changes, elasticity=CATEGORY_ELASTICITY, draws=DRAWS, seed=None,
+                    elasticity_sd=ELASTICITY_SD, demand_sd=DEMAND_SD, bands=BANDS):
+    """Revenus et marge attendus de chaque scénario de prix, avec bandes de distribution.
+
+    `menu` a les colonnes name, category, qty, price, cost (quantités de la
+    période). `changes` est soit un vecteur de variations appliquées à toute
+    la carte (ex. `PRICE_STEPS`), soit une matrice (scénarios, plats) — voir
+    `price_changes`. Une ligne par scénario : valeurs moyennes et bandes
+    (`_low`/`_high`) des revenus, de la marge et de leurs écarts à la
+    situation actuelle, plus la probabilité que la marge augmente. Une carte
+    vide donne des valeurs nulles.
+    """
+    revenue, margin, base_revenue, base_margin = _outcomes(
+        menu, changes, elasticity, draws, seed, elasticity_sd, demand_sd, per_dish=False
+    )
+    result = {}
+    for name, values in [('revenue', revenue), ('margin', margin),
+                         ('revenue_delta', revenue - base_revenue), ('margin_delta', margin - base_margin)]:
+        low, high = np.percentile(values, bands, axis=1)
+        result.update({name: values.mean(axis=1), f'{name}_low': low, f'{name}_high': high})
+    result['gain_probability'] = (margin > base_margin).mean(axis=1)
+    return pd.DataFrame(result)
+
+
+def price_changes(menu, steps=PRICE_STEPS, selected=None):
+    """Matrice (pas, plats) : chaque pas appliqué aux plats sélectionnés (masque ou catégories), 0 ailleurs."""
+    if selected is None:
+        mask = np.ones(len(menu), dtype=bool)
+    elif isinstance(selected, (list, tuple, set)):
+        mask = menu['category'].isin(selected).to_numpy()
+    else:
+        mask = np.asarray(selected, dtype=bool)
+    return np.asarray(steps, dtype=float)[:, None] * mask[None, :]
+
+
+def best_prices(menu, steps=PRICE_STEPS, min_probability=0.8, elasticity=CATEGORY_ELASTICITY, draws=DRAWS,
+                seed=None, elasticity_sd=ELASTICITY_SD, demand_sd=DEMAND_SD, bands=BANDS):
+    """Meilleure variation de prix de chaque plat sur la grille `steps`.
+
+    Les plats étant indépendants (pas d'élasticité croisée), chaque pas est
+    évalué pour tous les plats à la fois. La variation retenue maximise
+    l'écart de marge attendu parmi celles dont la probabilité de gain atteint
+    `min_probability` (0 sinon). Une ligne par plat de `menu` (aucune si la
+    carte est vide).
+    """
+    steps = np.asarray(steps, dtype=float)
+    _, margin, _, base_margin = _outcomes(
+        menu, steps, elasticity, draws, seed, elasticity_sd, demand_sd, per_dish=True
+    )
+    delta = margin - base_margin  # (pas, tirages, plats)
+    expected = delta.mean(axis=1)
+    probability = (delta > 0).mean(axis=1)
+    eligible = np.where(probability >= min_probability, expected, -np.inf)
+    eligible[steps == 0] = 0.0  # Prix actuel toujours admissible
+    best = eligible.argmax(axis=0)
+
+    dishes = np.arange(len(menu))
+    low, high = np.percentile(delta[best, :, dishes], bands, axis=1)
+    return pd.DataFrame({
+        'name': menu['name'].to_numpy(),
+        'category': menu['category'].to_numpy(),
+        'price': menu['price'].to_numpy(dtype=float),
+        'best_change': steps[best],
+        'new_price': menu['price'].to_numpy(dtype=float) * (1 + steps[best]),
+        'margin_delta': expected[best, dishes],
+        'margin_delta_low': low,
+        'margin_delta_high': high,
+        'gain_probability': probability[best, dishes],
+    })
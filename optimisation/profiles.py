@@ -0,0 +1,119 @@
+"""Profils de demande jour de semaine × heure, mis à jour jour par jour.
+
+Pour chaque établissement, le modèle conserve deux matrices (7 jours × 24
+heures) : somme pondérée des couverts (et des revenus) et somme des poids.
+Chaque nouveau jour n'actualise que la ligne de son jour de semaine, avec un
+amortissement qui donne plus de poids aux semaines récentes. La prévision du
+lendemain est une simple lecture de ligne, pour tous les établissements à la fois.
+"""
+import numpy as np
+import pandas as pd
+
+HOURS = np.arange(24)
+
+# Poids d'une semaine par rapport à la suivante (demi-vie ≈ 6-7 semaines)
+DEFAULT_DECAY = 0.9
+
+
+class DemandProfiles:
+    """Profils horaires par jour de semaine de plusieurs établissements."""
+
+    def __init__(self, decay=DEFAULT_DECAY):
+        self.decay = decay
+        self.locations = []
+        self.last_date = None
+        self._index = {}
+        self._covers = np.zeros((0, 7, len(HOURS)))
+        self._revenue = np.zeros((0, 7, len(HOURS)))
+        self._weights = np.zeros((0, 7))
+        self._open = np.zeros((0, len(HOURS)), dtype=bool)  # Heures où l'établissement a déjà servi
+
+    def _add_locations(self, locations):
+        new = [loc for loc in locations if loc not in self._index]
+        if not new:
+            return
+        for loc in new:
+            self._index[loc] = len(self.locations)
+            self.locations.append(loc)
+        n = len(new)
+        self._covers = np.concatenate([self._covers, np.zeros((n, 7, len(HOURS)))])
+        self._revenue = np.concatenate([self._revenue, np.zeros((n, 7, len(HOURS)))])
+        self._weights = np.concatenate([self._weights, np.zeros((n, 7))])
+        self._open = np.concatenate([self._open, np.zeros((n, len(HOURS)), dtype=bool)])
+
+    def update(self, df_hourly):
+        """Intègre les jours de `df_hourly` postérieurs au dernier jour déjà intégré."""
+        if self.last_date is not None:
+            df_hourly = df_hourly[df_hourly['date'] > self.last_date]
+        if df_hourly.empty:
+            return self
+
+        self._add_locations(list(df_hourly['location'].unique()))
+
+        # Grille dense (jours × établissements × heures) des nouveaux jours
+        day_codes, days = pd.factorize(df_hourly['date'], sort=True)
+        loc_codes = df_hourly['location'].map(self._index).to_numpy(dtype=np.int64)
+        hours = df_hourly['hour_num'].to_numpy(dtype=np.int64)
+
+        shape = (len(days), len(self.locations), len(HOURS))
+        covers = np.zeros(shape)
+        revenue = np.zeros(shape)
+        observed = np.zeros(shape[:2], dtype=bool)
+        np.add.at(covers, (day_codes, loc_codes, hours), df_hourly['covers'].to_numpy(dtype=float))
+        np.add.at(revenue, (day_codes, loc_codes, hours), df_hourly['revenue'].to_numpy(dtype=float))
+        observed[day_codes, loc_codes] = True
+        self._open[loc_codes, hours] = True
+
+        # Un pas par jour, vectorisé sur les établissements et les heures
+        day_of_week = np.asarray(pd.DatetimeIndex(days).dayofweek)
+        for day, dow in enumerate(day_of_week):
+            seen = observed[day]
+            self._covers[seen, dow] = self.decay * self._covers[seen, dow] + covers[day, seen]
+            self._revenue[seen, dow] = self.decay * self._revenue[seen, dow] + revenue[day, seen]
+            self._weights[seen, dow] = self.decay * self._weights[seen, dow] + 1.0
+
+        last_date = days[-1]
+        self.last_date = last_date if self.last_date is None else max(self.last_date, last_date)
+        return self
+
+    def profile(self, location, measure='covers'):
+        """Matrice moyenne (jours de semaine × heures d'ouverture) d'un établissement."""
+        i = self._index[location]
+        values = self._covers[i] if measure == 'covers' else self._revenue[i]
+        weights = self._weights[i][:, None]
+        matrix = np.divide(values, weights, out=np.zeros_like(values), where=weights > 0)
+        hours = HOURS[self._open[i]]
+        return pd.DataFrame(matrix[:, hours], index=range(7), columns=hours)
+
+    def next_day(self, date=None, locations=None):
+        """Couverts et revenus prévus par heure pour `date` (par défaut le lendemain du dernier jour).
+
+        Retourne le schéma de `df_next_day` (location, hour, hour_label,
+        predicted_covers) complété de `predicted_revenue`, pour les heures où
+        chaque établissement a déjà servi.
+        """
+        date = self.last_date + pd.Timedelta(days=1) if date is None else pd.Timestamp(date)
+        dow = date.dayofweek
+        locations = self.locations if locations is None else list(locations)
+        idx = np.array([self._index[loc] for loc in locations], dtype=np.int64)
+
+        weights = self._weights[idx, dow][:, None]
+        covers = np.divide(self._covers[idx, dow], weights, out=np.zeros((len(idx), len(HOURS))), where=weights > 0)
+        revenue = np.divide(self._revenue[idx, dow], weights, out=np.zeros((len(idx), len(HOURS))), where=weights > 0)
+
+        loc_codes, hours = np.nonzero(self._open[idx])
+        return pd.DataFrame({
+            'location': pd.Categorical(np.asarray(locations, dtype=object)[loc_codes], categories=sorted(locations)),
+            'hour': hours,
+            'hour_label': [f"{hour}h" for hour in hours],
+            'predicted_covers': np.rint(covers[loc_codes, hours]).astype(np.int64),
+            'predicted_revenue': revenue[loc_codes, hours],
+        })
+
+    def average_day_covers(self, locations=None):
+        """Couverts d'une journée moyenne (moyenne des 7 profils quotidiens) par établissement."""
+        locations = self.locations if locations is None else list(locations)
+        idx = np.array([self._index[loc] for loc in locations], dtype=np.int64)
+        weights = self._weights[idx][:, :, None]
+        daily = np.divide(self._covers[idx], weights, out=np.zeros_like(self._covers[idx]), where=weights > 0).sum(axis=2)
+        return pd.Series(daily.mean(axis=1), index=locations)
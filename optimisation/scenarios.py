@@ -0,0 +1,148 @@
+"""Planification budgétaire : seuil de rentabilité, coût principal et marge nette par scénario.
+
+Chaque hypothèse (coût nourriture %, taux horaire, ticket moyen, places) est
+un axe d'une grille ; les indicateurs de toutes les combinaisons sont
+calculés en une seule opération diffusée (axes × axes × …), si bien qu'un
+changement de curseur ne fait que lire une tranche de la grille.
+
+Modèle journalier : couverts = places × couverts par place ; la main d'œuvre
+(heures planifiées × taux horaire) et les autres coûts sont fixes, la
+nourriture proportionnelle aux ventes. Le seuil de rentabilité est donc
+(main d'œuvre + autres coûts) / (ticket × (1 - coût nourriture %)).
+
+    python -m optimisation.scenarios --x food_cost_pct --y avg_ticket
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from optimisation.generation import REFERENCE_SEATS
+
+AXES = ['food_cost_pct', 'hourly_rate', 'avg_ticket', 'seats']
+METRICS = ['break_even_covers', 'prime_cost_pct', 'net_margin_pct']
+
+# Valeurs testées : coût nourriture en %, autres axes en multiples de la valeur actuelle
+FOOD_COST_PCTS = np.arange(22, 41, dtype=float)
+RELATIVE_STEPS = np.round(np.arange(0.70, 1.3001, 0.05), 2)
+
+
+def baseline(df_sales, df_staff, seats=REFERENCE_SEATS):
+    """Hypothèses actuelles tirées des ventes d'une période et du personnel.
+
+    Le coût de la main d'œuvre est celui des ventes (`labor_cost`) ; le taux
+    horaire est la moyenne pondérée par les heures de `df_staff`, d'où les
+    heures planifiées par jour.
+    """
+    days = max(df_sales['date'].nunique(), 1)
+    revenue = df_sales['revenue'].sum()
+    covers = df_sales['covers'].sum()
+    food_cost = df_sales['food_cost'].sum()
+    labor_cost = df_sales['labor_cost'].sum()
+    hours = df_staff['monthly_hours'].sum()
+    hourly_rate = df_staff['monthly_cost'].sum() / hours if hours > 0 else 0.0
+    return {
+        'food_cost_pct': (food_cost / revenue * 100) if revenue > 0 else 0.0,
+        'hourly_rate': hourly_rate,
+        'avg_ticket': revenue / covers if covers > 0 else 0.0,
+        'seats': float(seats),
+        'covers_per_seat': covers / days / seats,
+        'labor_hours': labor_cost / days / hourly_rate if hourly_rate > 0 else 0.0,
+        'fixed_costs': (df_sales['total_costs'].sum() - food_cost - labor_cost) / days,
+    }
+
+
+def default_axes(base, food_cost_pcts=FOOD_COST_PCTS, relative_steps=RELATIVE_STEPS):
+    """Valeurs de chaque axe autour des hypothèses actuelles (`baseline`)."""
+    return {
+        'food_cost_pct': np.asarray(food_cost_pcts, dtype=float),
+        'hourly_rate': np.unique(np.round(base['hourly_rate'] * relative_steps, 2)),
+        'avg_ticket': np.unique(np.round(base['avg_ticket'] * relative_steps, 2)),
+        'seats': np.unique(np.maximum(np.rint(base['seats'] * relative_steps), 1)),
+    }
+
+
+class ScenarioGrid:
+    """Indicateurs journaliers de toutes les combinaisons d'hypothèses.
+
+    `metrics[nom]` est un tableau de forme (len(axes[a]) pour a dans `AXES`) :
+    `break_even_covers` (couverts par jour), `prime_cost_pct` et
+    `net_margin_pct` (% des revenus).
+    """
+
+    def __init__(self, base, axes=None):
+        self.base = base
+        self.axes = axes or default_axes(base)
+        food_pct, rate, ticket, seats = np.ix_(*(np.asarray(self.axes[name], dtype=float) for name in AXES))
+        shape = tuple(len(self.axes[name]) for name in AXES)
+
+        food_share = food_pct / 100
+        revenue = seats * base['covers_per_seat'] * ticket
+        labor = rate * base['labor_hours']
+        fixed = labor + base['fixed_costs']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            contribution = ticket * (1 - food_share)
+            metrics = {
+                'break_even_covers': np.where(contribution > 0, fixed / contribution, np.inf),
+                'prime_cost_pct': np.where(revenue > 0, (food_share * revenue + labor) / revenue * 100, np.nan),
+                'net_margin_pct': np.where(revenue > 0, (revenue * (1 - food_share) - fixed) / revenue * 100, np.nan),
+            }
+        self.metrics = {name: np.broadcast_to(values, shape) for name, values in metrics.items()}
+
+    def nearest(self, axis, value):
+        """Indice de la valeur de `axis` la plus proche de `value`."""
+        return int(np.abs(np.asarray(self.axes[axis]) - value).argmin())
+
+    def slice(self, metric, x, y, **fixed):
+        """Tableau (valeurs de `y` × valeurs de `x`) de `metric`.
+
+        Les autres axes sont fixés à la valeur la plus proche de celle donnée
+        dans `fixed`, ou à la valeur actuelle (`base`) à défaut.
+        """
+        if x == y:
+            raise ValueError("Les deux axes de la tranche doivent être différents")
+        index = tuple(
+            slice(None) if name in (x, y) else self.nearest(name, fixed.get(name, self.base[name]))
+            for name in AXES
+        )
+        values = self.metrics[metric][index]
+        if AXES.index(x) < AXES.index(y):
+            values = values.T
+        return pd.DataFrame(values, index=pd.Index(self.axes[y], name=y), columns=pd.Index(self.axes[x], name=x))
+
+    def current(self):
+        """Indicateurs aux hypothèses actuelles (point de la grille le plus proche)."""
+        index = tuple(self.nearest(name, self.base[name]) for name in AXES)
+        return {name: float(values[index]) for name, values in self.metrics.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grille de scénarios budgétaires")
+    parser.add_argument('--metric', choices=METRICS, default='net_margin_pct')
+    parser.add_argument('--x', choices=AXES, default='food_cost_pct')
+    parser.add_argument('--y', choices=AXES, default='avg_ticket')
+    parser.add_argument('--steps', type=int, default=None, help="Valeurs par axe (grille plus fine)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from optimisation.generation import generate_data
+
+    df_sales, _, _, _, df_staff = generate_data(seed=args.seed)[:5]
+    base = baseline(df_sales, df_staff)
+    axes = None
+    if args.steps:
+        axes = default_axes(base, np.linspace(FOOD_COST_PCTS[0], FOOD_COST_PCTS[-1], args.steps),
+                            np.linspace(RELATIVE_STEPS[0], RELATIVE_STEPS[-1], args.steps))
+
+    started = time.perf_counter()
+    grid = ScenarioGrid(base, axes)
+    elapsed = time.perf_counter() - started
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(grid.slice(args.metric, args.x, args.y).round(1))
+    print(f"{grid.metrics[args.metric].size:,} scénarios en {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Simulateur de tickets de caisse (POS) ligne par ligne.
+
+Produit des tickets réalistes (canal, table, couverts, heures d'ouverture et de
+fermeture, lignes tirées de la carte) par blocs de jours, et les écrit en
+Parquet partitionné par mois. La mémoire reste bornée par `chunk_rows`, ce qui
+permet de générer des dizaines de millions de lignes pour les tests de charge.
+
+    python -m optimisation.simulator sortie/tickets --days 1095 --locations 200
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from optimisation.generation import (
+    CHANNEL_SHARES,
+    CHANNELS,
+    DAY_MULTIPLIERS,
+    HOURLY_COVERS_HIGH,
+    HOURLY_COVERS_LOW,
+    MENU_ITEMS,
+    OPENING_HOURS,
+    REFERENCE_SEATS,
+    location_ids,
+)
+
+# Couverts par ticket : 1 + Poisson(λ) selon le canal (tables de 2-4, bar en solo, livraison en duo)
+CHANNEL_EXTRA_COVERS = np.array([1.5, 0.3, 0.8])
+
+# Durée d'un ticket en minutes : base + par couvert (service en salle plus long)
+CHANNEL_BASE_MINUTES = np.array([35, 15, 12])
+CHANNEL_MINUTES_PER_COVER = np.array([12, 8, 3])
+
+# Plats commandés par couvert (ticket moyen ≈ 52$ avec la carte actuelle)
+ITEMS_PER_COVER = 2.3
+
+# Chiffre d'affaires quotidien de référence pour 80 places (cohérent avec generate_data)
+BASE_DAILY_REVENUE = 2000
+
+TICKET_COLUMNS = [
+    'ticket_id', 'line_no', 'location', 'opened_at', 'closed_at', 'table', 'channel',
+    'covers', 'item', 'category', 'qty', 'unit_price', 'unit_cost',
+]
+
+
+def _menu_arrays():
+    catalog = pd.DataFrame(MENU_ITEMS)
+    mix = catalog['qty'].to_numpy(dtype=float)
+    return catalog, mix / mix.sum()
+
+
+def iter_ticket_chunks(days=90, locations=1, seats=REFERENCE_SEATS, seed=None, end=None, chunk_rows=1_000_000):
+    """Génère les lignes de tickets par blocs de jours d'environ `chunk_rows` lignes.
+
+    Chaque bloc est un DataFrame au schéma `TICKET_COLUMNS`. Les couverts sont
+    répétés sur chaque ligne du ticket ; seule la ligne `line_no == 0` doit
+    être comptée lors de l'agrégation.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+    dates = pd.date_range(end=end.normalize(), periods=days, freq='D')
+
+    seats = np.broadcast_to(np.asarray(seats, dtype=float), (locations,))
+    scale = seats / REFERENCE_SEATS
+    tables_per_location = np.maximum(seats // 4, 1).astype(np.int64)
+
+    catalog, menu_mix = _menu_arrays()
+    menu_names = catalog['name'].to_numpy()
+    menu_categories = catalog['category'].to_numpy()
+    menu_prices = catalog['price'].to_numpy(dtype=float)
+    menu_costs = catalog['cost'].to_numpy(dtype=float)
+    avg_item_price = (menu_prices * menu_mix).sum()
+
+    # Heure d'ouverture du ticket tirée selon le profil horaire moyen des couverts
+    hour_weights = (HOURLY_COVERS_LOW + HOURLY_COVERS_HIGH) / 2
+    hour_weights = hour_weights / hour_weights.sum()
+
+    # Couverts attendus par jour et établissement, puis tickets attendus par canal
+    covers_per_day = BASE_DAILY_REVENUE / (avg_item_price * ITEMS_PER_COVER)
+    covers_per_ticket = 1 + CHANNEL_EXTRA_COVERS
+
+    est_lines_per_day = covers_per_day * DAY_MULTIPLIERS.max() * ITEMS_PER_COVER * scale.sum()
+    chunk_days = int(max(1, chunk_rows // max(est_lines_per_day, 1)))
+
+    location_categories = location_ids(locations)
+    next_ticket_id = 0
+
+    for start in range(0, days, chunk_days):
+        chunk_dates = dates[start:start + chunk_days]
+
+        # Nombre de tickets : grille (jour, établissement, canal)
+        day_mult = DAY_MULTIPLIERS[np.asarray(chunk_dates.dayofweek)]
+        expected_covers = covers_per_day * day_mult[:, None] * scale
+        lam = expected_covers[:, :, None] * CHANNEL_SHARES / covers_per_ticket
+        n_tickets = rng.poisson(lam).ravel()
+        total_tickets = int(n_tickets.sum())
+        if total_tickets == 0:
+            continue
+
+        cell = np.repeat(np.arange(n_tickets.size), n_tickets)
+        day_idx, cell = np.divmod(cell, locations * len(CHANNELS))
+        loc_idx, channel_idx = np.divmod(cell, len(CHANNELS))
+
+        covers = 1 + rng.poisson(CHANNEL_EXTRA_COVERS[channel_idx])
+
+        # Horodatage d'ouverture et de fermeture
+        hours = rng.choice(OPENING_HOURS, size=total_tickets, p=hour_weights)
+        seconds = rng.integers(0, 3600, total_tickets)
+        opened_at = (
+            chunk_dates.to_numpy()[day_idx]
+            + (hours * 3600 + seconds).astype('timedelta64[s]')
+        )
+        duration = (
+            CHANNEL_BASE_MINUTES[channel_idx]
+            + CHANNEL_MINUTES_PER_COVER[channel_idx] * covers
+        ) * rng.gamma(8.0, 1 / 8.0, total_tickets)
+        closed_at = opened_at + np.rint(duration * 60).astype('timedelta64[s]')
+
+        # Tables : numérotées par établissement en salle, 0 pour le comptoir du bar, vide en livraison
+        table = rng.integers(0, tables_per_location[loc_idx]) + 1
+        table = np.where(channel_idx == 0, table, 0).astype(np.int16)
+
+        # Lignes de ticket : plats tirés selon le mix de la carte
+        n_lines = np.maximum(rng.poisson(ITEMS_PER_COVER * covers), 1)
+        total_lines = int(n_lines.sum())
+        line_ticket = np.repeat(np.arange(total_tickets), n_lines)
+        line_starts = np.cumsum(n_lines) - n_lines
+        line_no = np.arange(total_lines) - line_starts[line_ticket]
+        item_idx = rng.choice(len(menu_names), size=total_lines, p=menu_mix)
+
+        chunk = pd.DataFrame({
+            'ticket_id': next_ticket_id + line_ticket,
+            'line_no': line_no.astype(np.int16),
+            'location': pd.Categorical.from_codes(loc_idx[line_ticket], categories=location_categories),
+            'opened_at': opened_at[line_ticket].astype('datetime64[ns]'),
+            'closed_at': closed_at[line_ticket].astype('datetime64[ns]'),
+            'table': pd.arrays.IntegerArray(table[line_ticket], channel_idx[line_ticket] == 2),
+            'channel': pd.Categorical.from_codes(channel_idx[line_ticket], categories=CHANNELS),
+            'covers': covers[line_ticket].astype(np.int16),
+            'item': pd.Categorical.from_codes(item_idx, categories=menu_names),
+            'category': menu_categories[item_idx],
+            'qty': np.ones(total_lines, dtype=np.int16),
+            'unit_price': menu_prices[item_idx],
+            'unit_cost': menu_costs[item_idx],
+        })
+        chunk['category'] = chunk['category'].astype('category')
+        next_ticket_id += total_tickets
+
+        yield chunk
+
+
+def write_tickets(path, days=90, locations=1, seats=REFERENCE_SEATS, seed=None, end=None,
+                  chunk_rows=1_000_000, progress=None):
+    """Écrit les tickets simulés en Parquet partitionné par mois (`month=AAAA-MM/`).
+
+    Retourne un dictionnaire de statistiques (lignes, tickets, blocs, durée).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(path, exist_ok=True)
+    started = time.perf_counter()
+    stats = {'rows': 0, 'tickets': 0, 'chunks': 0}
+
+    chunks = iter_ticket_chunks(days, locations, seats, seed, end, chunk_rows)
+    for i, chunk in enumerate(chunks):
+        months, month_codes = np.unique(chunk['opened_at'].to_numpy().astype('datetime64[M]'), return_inverse=True)
+        chunk['month'] = pd.Categorical.from_codes(month_codes, categories=months.astype(str))
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        pq.write_to_dataset(
+            table,
+            root_path=path,
+            partition_cols=['month'],
+            basename_template=f"part-{i:05d}-{{i}}.parquet",
+        )
+
+        stats['rows'] += len(chunk)
+        stats['tickets'] += int((chunk['line_no'] == 0).sum())
+        stats['chunks'] += 1
+        if progress is not None:
+            progress(stats)
+
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulateur de tickets POS (Parquet partitionné)")
+    parser.add_argument('path', help="Répertoire de sortie")
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--locations', type=int, default=1)
+    parser.add_argument('--seats', type=int, default=REFERENCE_SEATS)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--end', default=None, help="Dernier jour simulé (AAAA-MM-JJ)")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    def report(stats):
+        print(f"bloc {stats['chunks']}: {stats['rows']:,} lignes, {stats['tickets']:,} tickets", flush=True)
+
+    stats = write_tickets(
+        args.path, args.days, args.locations, args.seats, args.seed, args.end,
+        args.chunk_rows, progress=report,
+    )
+    print(f"Terminé: {stats['rows']:,} lignes en {stats['seconds']:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""Planification des effectifs à partir des couverts prévus par heure.
+
+Pour chaque poste, le besoin horaire est le plus grand de la présence
+minimale et des couverts prévus divisés par la productivité du poste. Les
+quarts de coût minimal sont obtenus exactement par un flot de coût minimal
+sur les heures de chaque série (jour × établissement × poste), résolu pour
+toutes les séries à la fois. Chaque quart est payé au moins `MIN_PAID_HOURS`
+heures, dure au plus `MAX_SHIFT_HOURS` et ne recouvre pas d'heure fermée.
+
+    python -m optimisation.staffing --days 7 --locations 200
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+HOURS = 24
+
+# Couverts servis par heure travaillée, par poste (None : présence fixe, indépendante de l'affluence)
+COVERS_PER_HOUR = {
+    'Serveurs': 12,
+    'Cuisiniers': 20,
+    'Aide-cuisine': 35,
+    'Plongeurs': 45,
+    'Bar': 30,
+    'Gérance': None,
+}
+
+# Effectif minimal par heure d'ouverture
+MIN_STAFF = {
+    'Serveurs': 1,
+    'Cuisiniers': 1,
+    'Aide-cuisine': 0,
+    'Plongeurs': 1,
+    'Bar': 0,
+    'Gérance': 1,
+}
+
+# Un quart est payé au moins 3 heures (règle du rappel au travail) et dure au plus 8 heures
+MIN_PAID_HOURS = 3
+MAX_SHIFT_HOURS = 8
+
+
+def requirements(covers, productivity, min_staff):
+    """Effectif requis (…, postes, heures) à partir des couverts (…, heures) et d'un masque d'ouverture.
+
+    `covers` vaut NaN aux heures fermées ; `productivity` vaut inf pour une présence fixe.
+    """
+    covers = covers[..., None, :]
+    needed = np.ceil(np.nan_to_num(covers) / productivity[:, None])
+    required = np.maximum(needed, min_staff[:, None])
+    return np.where(np.isnan(covers), 0, required).astype(np.int64)
+
+
+def _shift_costs(open_hours, min_paid_hours, max_shift_hours):
+    # Heures payées du quart [début, fin[ par série (séries × nœuds × nœuds) ; inf si le quart
+    # dépasse la durée maximale ou recouvre une heure fermée
+    n, hours = open_hours.shape
+    closures = np.concatenate([np.zeros((n, 1), dtype=np.int64), np.cumsum(~open_hours, axis=1)], axis=1)
+    length = np.arange(hours + 1)[None, :] - np.arange(hours + 1)[:, None]
+    allowed = (length >= 1) & (length <= max_shift_hours) & (closures[:, :, None] == closures[:, None, :])
+    return np.where(allowed, np.maximum(length, min_paid_hours).astype(float), np.inf)
+
+
+def solve_shifts(required, open_hours, min_paid_hours=MIN_PAID_HOURS, max_shift_hours=MAX_SHIFT_HOURS):
+    """Quarts de coût minimal couvrant `required` (séries × heures).
+
+    Flot de coût minimal sur les nœuds 0..heures, résolu pour toutes les
+    séries à la fois (chemins les plus courts successifs, Bellman-Ford
+    vectorisé). Les séries identiques ne sont résolues qu'une fois.
+    Retourne `(staffed, shifts)` : l'effectif présent par heure et un tableau
+    (série, début, fin, nombre) des quarts.
+    """
+    n, hours = required.shape
+    keys, series = np.unique(np.concatenate([required, open_hours], axis=1), axis=0, return_inverse=True)
+    series = series.reshape(-1)
+    required, open_hours = keys[:, :hours], keys[:, hours:].astype(bool)
+    counts = _min_cost_shifts(required, open_hours, min_paid_hours, max_shift_hours)
+
+    # Effectif présent : quarts commencés moins quarts terminés, cumulés
+    changes = counts.sum(axis=2) - counts.sum(axis=1)
+    staffed = np.cumsum(changes, axis=1)[:, :hours][series]
+    rows, start, end = np.nonzero(counts[series])
+    shifts = np.column_stack([rows, start, end, counts[series][rows, start, end]])
+    return staffed, shifts
+
+
+def _min_cost_shifts(required, open_hours, min_paid_hours, max_shift_hours):
+    # Formulation en flot (différences des contraintes de couverture) : un quart [s, e[ est un arc
+    # s -> e de coût ses heures payées, un présent en surplus à l'heure h un arc h+1 -> h gratuit ;
+    # chaque hausse du besoin est une offre, chaque baisse une demande. Une unité de flot est
+    # acheminée par tour et par série le long d'un plus court chemin du graphe résiduel.
+    n, hours = required.shape
+    cost = _shift_costs(open_hours, min_paid_hours, max_shift_hours)
+    padded = np.pad(required, ((0, 0), (1, 1)))
+    excess = np.diff(padded, axis=1)  # Offre (> 0) ou demande (< 0) de chaque nœud
+    counts = np.zeros(cost.shape, dtype=np.int64)  # Quarts [début, fin[
+    surplus = np.zeros((n, hours + 1), dtype=np.int64)  # Présents au-delà du besoin, par heure
+    hour, nodes = np.arange(hours), np.arange(hours + 1)
+    upper = nodes[:, None] < nodes[None, :]
+    unlimited = np.iinfo(np.int64).max
+
+    while True:
+        active = np.flatnonzero((excess > 0).any(axis=1))
+        if not len(active):
+            return counts
+        x, y = counts[active], surplus[active]
+        rows = np.arange(len(active))
+
+        # Graphe résiduel : quarts (ou surplus déjà posé, gratuit à retirer) vers l'avant,
+        # retrait d'un quart posé ou surplus ajouté vers l'arrière
+        residual = np.where(upper, cost[active], np.where(x.transpose(0, 2, 1) > 0, -cost[active].transpose(0, 2, 1), np.inf))
+        residual[:, hour, hour + 1] = np.where(y[:, :hours] > 0, 0.0, residual[:, hour, hour + 1])
+        back = residual[:, hour + 1, hour]
+        residual[:, hour + 1, hour] = np.where(np.isinf(back) & open_hours[active], 0.0, back)
+
+        # Plus courts chemins depuis les nœuds en offre (Bellman-Ford vectorisé)
+        dist = np.where(excess[active] > 0, 0.0, np.inf)
+        pred = np.full(dist.shape, -1)
+        for _ in range(hours + 1):
+            candidates = dist[:, :, None] + residual
+            best = candidates.argmin(axis=1)
+            value = np.take_along_axis(candidates, best[:, None, :], axis=1)[:, 0]
+            better = value < dist
+            if not better.any():
+                break
+            dist = np.where(better, value, dist)
+            pred = np.where(better, best, pred)
+
+        # Demande la plus proche ; remontée du chemin et capacité résiduelle de ses arcs
+        target = np.where(excess[active] < 0, dist, np.inf).argmin(axis=1)
+        amount = -excess[active, target]
+        path, node = [], target
+        while True:
+            origin = pred[rows, node]
+            moving = origin >= 0
+            if not moving.any():
+                break
+            r, u, v = rows[moving], origin[moving], node[moving]
+            freed = (v == u + 1) & (y[r, u] > 0)
+            undone = (v < u) & (x[r, v, u] > 0)
+            capacity = np.where(freed, y[r, u], np.where(undone, x[r, v, u], unlimited))
+            amount[r] = np.minimum(amount[r], capacity)
+            path.append((r, u, v, freed, undone))
+            node = np.where(moving, origin, node)
+        source = node
+        amount = np.minimum(amount, excess[active, source])
+
+        for r, u, v, freed, undone in path:
+            a = amount[r]
+            added = (u < v) & ~freed
+            y[r[freed], u[freed]] -= a[freed]
+            x[r[added], u[added], v[added]] += a[added]
+            x[r[undone], v[undone], u[undone]] -= a[undone]
+            kept = (v < u) & ~undone
+            y[r[kept], v[kept]] += a[kept]
+        excess[active, source] -= amount
+        excess[active, target] += amount
+        counts[active], surplus[active] = x, y
+
+
+def _position_rates(df_staff, locations, positions):
+    # Taux horaire par (établissement, poste) ; moyenne du poste pour un établissement absent de df_staff
+    rates = df_staff.pivot_table(index='location', columns='position', values='avg_hourly_rate', observed=True)
+    fallback = df_staff.groupby('position', observed=True)['avg_hourly_rate'].mean()
+    rates = rates.reindex(index=locations, columns=positions).astype(float)
+    return rates.fillna(fallback.reindex(positions)).to_numpy()
+
+
+def plan_staffing(forecast, df_staff, covers_per_hour=COVERS_PER_HOUR, min_staff=MIN_STAFF,
+                  min_paid_hours=MIN_PAID_HOURS, max_shift_hours=MAX_SHIFT_HOURS):
+    """Plan d'effectifs de coût minimal pour des couverts prévus par heure.
+
+    `forecast` a les colonnes date, location, hour, predicted_covers (heures
+    d'ouverture seulement, ex. `DemandProfiles.next_day` complété de la date).
+    Retourne `(plan, shifts)` : `plan` a une ligne par (date, établissement,
+    poste, heure) avec l'effectif requis et planifié ; `shifts` une ligne par
+    groupe de quarts identiques avec heures payées et coût.
+    """
+    positions = list(pd.unique(df_staff['position']))
+    productivity = np.array([covers_per_hour.get(p) or np.inf for p in positions], dtype=float)
+    minimum = np.array([min_staff.get(p, 0) for p in positions], dtype=np.int64)
+
+    date_codes, dates = pd.factorize(forecast['date'], sort=True)
+    loc_codes, locations = pd.factorize(forecast['location'], sort=True)
+    hours = forecast['hour'].to_numpy(dtype=np.int64)
+    covers = np.full((len(dates), len(locations), HOURS), np.nan)
+    covers[date_codes, loc_codes, hours] = forecast['predicted_covers'].to_numpy(dtype=float)
+
+    required = requirements(covers, productivity, minimum)  # (jours, établissements, postes, heures)
+    shape = required.shape
+    open_hours = np.broadcast_to(~np.isnan(covers)[:, :, None, :], shape).reshape(-1, HOURS)
+    staffed, shifts = solve_shifts(required.reshape(-1, HOURS), open_hours, min_paid_hours, max_shift_hours)
+
+    day, loc, pos = np.unravel_index(np.arange(np.prod(shape[:3])), shape[:3])
+    rates = _position_rates(df_staff, list(locations), positions)
+    keep = open_hours.reshape(-1)
+    plan = pd.DataFrame({
+        'date': np.repeat(np.asarray(dates)[day], HOURS),
+        'location': pd.Categorical(np.repeat(np.asarray(locations, dtype=object)[loc], HOURS), categories=list(locations)),
+        'position': pd.Categorical(np.repeat(np.asarray(positions, dtype=object)[pos], HOURS), categories=positions),
+        'hour': np.tile(np.arange(HOURS), len(day)),
+        'required': required.reshape(-1),
+        'staffed': staffed.reshape(-1),
+    })[keep].reset_index(drop=True)
+
+    series, start, end, count = shifts.T
+    paid = np.maximum(end - start, min_paid_hours) * count
+    shifts = pd.DataFrame({
+        'date': np.asarray(dates)[day[series]],
+        'location': pd.Categorical(np.asarray(locations, dtype=object)[loc[series]], categories=list(locations)),
+        'position': pd.Categorical(np.asarray(positions, dtype=object)[pos[series]], categories=positions),
+        'start': start,
+        'end': end,
+        'count': count,
+        'paid_hours': paid,
+        'cost': paid * rates[loc[series], pos[series]],
+    })
+    return plan, shifts
+
+
+def staffing_summary(plan, shifts, df_staff, days):
+    """Par (établissement, poste) : heures requises, payées et coût du plan vs heures actuelles.
+
+    Les heures actuelles (`weekly_hours`) sont ramenées à `days` jours ;
+    `savings` est l'écart de coût correspondant (positif : le plan coûte moins).
+    """
+    keys = ['location', 'position']
+    columns = ['headcount', 'weekly_hours', 'avg_hourly_rate']
+    summary = plan.groupby(keys, observed=True).agg(required_hours=('required', 'sum'), peak_staff=('staffed', 'max'))
+    summary = summary.join(shifts.groupby(keys, observed=True)[['paid_hours', 'cost']].sum()).fillna(0)
+
+    # Effectifs de l'établissement s'il figure dans df_staff, sinon moyenne du poste
+    staff = df_staff.astype({'location': object, 'position': object}).set_index(keys)[columns]
+    fallback = staff.groupby(level='position').mean()
+    summary = summary.join(staff, on=keys)
+    summary[columns] = summary[columns].fillna(fallback.reindex(summary.index.get_level_values('position')).set_axis(summary.index))
+    summary['current_hours'] = summary['weekly_hours'] * days / 7
+    summary['savings'] = (summary['current_hours'] - summary['paid_hours']) * summary['avg_hourly_rate']
+    summary['understaffed'] = summary['peak_staff'] > summary['headcount']
+    return summary.drop(columns='weekly_hours').reset_index()
+
+
+def week_forecast(profiles, days=7, locations=None):
+    """Couverts prévus par heure pour les `days` jours suivant le dernier jour intégré aux profils."""
+    start = profiles.last_date + pd.Timedelta(days=1)
+    return pd.concat([
+        profiles.next_day(date, locations).assign(date=date)
+        for date in pd.date_range(start, periods=days, freq='D')
+    ], ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan d'effectifs à partir des profils de demande")
+    parser.add_argument('--days', type=int, default=7, help="Jours planifiés")
+    parser.add_argument('--history', type=int, default=365, help="Historique simulé")
+    parser.add_argument('--locations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=None, help="Fichier Parquet des quarts")
+    args = parser.parse_args(argv)
+
+    from optimisation.generation import generate_data
+    from optimisation.profiles import DemandProfiles
+
+    data = generate_data(days=args.history, locations=args.locations, seed=args.seed)
+    df_hourly, df_staff = data[1], data[4]
+    forecast = week_forecast(DemandProfiles().update(df_hourly), args.days)
+
+    started = time.perf_counter()
+    plan, shifts = plan_staffing(forecast, df_staff)
+    elapsed = time.perf_counter() - started
+
+    summary = staffing_summary(plan, shifts, df_staff, args.days)
+    totals = summary.groupby('position', observed=True)[['required_hours', 'paid_hours', 'current_hours', 'cost', 'savings']].sum()
+    with pd.option_context('display.width', 160):
+        print(totals.round(0))
+    print(f"{len(shifts)} groupes de quarts, {args.locations} établissements × {args.days} jours en {elapsed:.3f} s")
+    if args.output:
+        shifts.to_parquet(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Mesure du démarrage du tableau de bord et budget de démarrage à froid.
+
+`StartupTimer` chronomètre les phases d'une exécution du script (imports,
+chargement des données, premier affichage, exécution complète). Seule la
+première exécution d'un processus compte comme démarrage à froid. Les mesures
+sont journalisées et, si `OPTIMISATION_STARTUP_LOG` est défini, ajoutées à un
+fichier JSONL.
+
+    python -m optimisation.startup app.py --runs 5
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Budget de démarrage à froid, en secondes écoulées depuis le début du script
+STARTUP_BUDGET = {
+    'imports': 0.5,
+    'data': 1.5,
+    'first_paint': 2.0,
+    'total': 4.0,
+}
+
+STARTUP_LOG_ENV = 'OPTIMISATION_STARTUP_LOG'
+
+# Vrai tant qu'aucune exécution n'a été mesurée dans ce processus
+_cold = True
+
+
+class StartupTimer:
+    """Phases d'une exécution du script, en secondes depuis `started` (time.perf_counter)."""
+
+    def __init__(self, started=None, budget=STARTUP_BUDGET):
+        global _cold
+        self.started = time.perf_counter() if started is None else started
+        self.budget = budget
+        self.cold = _cold
+        self.phases = {}
+        _cold = False
+
+    def mark(self, phase):
+        """Enregistre la fin d'une phase (la première marque d'une phase fait foi)."""
+        self.phases.setdefault(phase, time.perf_counter() - self.started)
+        return self.phases[phase]
+
+    def over_budget(self):
+        """Phases mesurées qui dépassent le budget : `{phase: (mesure, budget)}`."""
+        return {
+            phase: (elapsed, self.budget[phase])
+            for phase, elapsed in self.phases.items()
+            if phase in self.budget and elapsed > self.budget[phase]
+        }
+
+    def report(self):
+        """Journalise les phases ; ajoute une ligne au fichier JSONL si configuré."""
+        record = {'cold': self.cold, 'pid': os.getpid(), **{k: round(v, 4) for k, v in self.phases.items()}}
+        level = logging.WARNING if self.cold and self.over_budget() else logging.INFO
+        logger.log(level, "démarrage %s", record)
+
+        path = os.environ.get(STARTUP_LOG_ENV)
+        if path:
+            with open(path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        return record
+
+
+def measure(app_path, runs=3):
+    """Lance `runs` processus neufs exécutant `app_path` et retourne leurs mesures à froid."""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'startup.jsonl')
+        env = dict(os.environ, **{STARTUP_LOG_ENV: log_path})
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(app_path)), env.get('PYTHONPATH')]))
+        script = (
+            "from streamlit.testing.v1 import AppTest; "
+            f"AppTest.from_file({os.path.abspath(app_path)!r}, default_timeout=300).run()"
+        )
+        for _ in range(runs):
+            subprocess.run([sys.executable, '-c', script], env=env, check=True)
+        with open(log_path) as f:
+            return [record for record in map(json.loads, f) if record['cold']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure du démarrage à froid du tableau de bord")
+    parser.add_argument('app', nargs='?', default='app.py')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    records = measure(args.app, args.runs)
+    exceeded = False
+    for phase, budget in STARTUP_BUDGET.items():
+        values = [record[phase] for record in records if phase in record]
+        if not values:
+            continue
+        median = statistics.median(values)
+        exceeded |= median > budget
+        status = 'OK' if median <= budget else 'DÉPASSÉ'
+        print(f"{phase:<12} médiane {median:6.3f} s  max {max(values):6.3f} s  budget {budget:.1f} s  {status}")
+    sys.exit(1 if exceeded else 0)
+
+
+if __name__ == '__main__':
+    main()
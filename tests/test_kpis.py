@@ -0,0 +1,17 @@
+import pytest
+
+from optimisation.generation import generate_data
+from optimisation.kpis import RollingKPIEngine, period_kpis
+from optimisation.scenarios import AXES, ScenarioGrid, baseline
+
+
+def test_prime_cost_matches_scenario_grid():
+    df_sales, df_hourly, _, _, df_staff = generate_data(days=30, locations=1, seed=0)[:5]
+    base = baseline(df_sales, df_staff)
+    grid = ScenarioGrid(base, axes={name: [base[name]] for name in AXES})
+
+    kpis = period_kpis(df_sales, df_hourly)
+    assert kpis['prime_cost_pct'] == pytest.approx(grid.current()['prime_cost_pct'])
+    assert RollingKPIEngine.from_frames(df_sales, df_hourly).kpis()['prime_cost_pct'] == pytest.approx(
+        kpis['prime_cost_pct']
+    )
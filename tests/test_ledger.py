@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from optimisation.ledger import InventoryLedger
+
+
+def events(rows):
+    return pd.DataFrame(rows, columns=['timestamp', 'location', 'ingredient', 'event', 'qty', 'unit_cost'])
+
+
+@pytest.mark.parametrize('ingredient', ['Parmesan', 'Hors catalogue'])
+def test_count_gain_uses_receipt_cost_from_same_batch(ingredient):
+    ledger = InventoryLedger().append(events([
+        ('2026-01-01 08:00', 'R001', ingredient, 'receipt', 10.0, 4.0),
+        ('2026-01-01 12:00', 'R001', ingredient, 'depletion', 3.0, None),
+        ('2026-01-01 22:00', 'R001', ingredient, 'count', 9.0, None),
+    ]))
+
+    moves = ledger.movements()
+    gain = moves[moves['event'] == 'count'].iloc[0]
+    assert gain['delta'] == pytest.approx(2.0)
+    assert gain['cost'] == pytest.approx(8.0)
+    assert ledger.positions()['unit_cost'].iloc[0] == pytest.approx(4.0)
+
+
+def test_count_gain_before_receipt_keeps_previous_cost():
+    ledger = InventoryLedger(standard_costs={'Parmesan': 2.0}).append(events([
+        ('2026-01-01 08:00', 'R001', 'Parmesan', 'count', 5.0, None),
+        ('2026-01-01 12:00', 'R001', 'Parmesan', 'receipt', 10.0, 4.0),
+    ]))
+
+    moves = ledger.movements()
+    assert moves['cost'].tolist() == pytest.approx([10.0, 40.0])
@@ -0,0 +1,72 @@
+import functools
+import itertools
+
+import numpy as np
+import pytest
+
+from optimisation.staffing import solve_shifts
+
+
+def brute_force_paid_hours(required, open_hours, min_paid_hours, max_shift_hours):
+    # Exploration exhaustive heure par heure : état = heures déjà travaillées par chaque présent
+    hours, cap = len(required), max(required) + 1
+
+    def paid(ages):
+        return sum(max(age, min_paid_hours) for age in ages)
+
+    @functools.lru_cache(maxsize=None)
+    def best(hour, ages):
+        if hour == hours:
+            return paid(ages)
+        if not open_hours[hour]:
+            return paid(ages) + best(hour + 1, ())
+        forced = [age for age in ages if age >= max_shift_hours]
+        free = [age for age in ages if 0 < age < max_shift_hours]
+        cost = np.inf
+        for k in range(len(free) + 1):
+            for leaving in set(itertools.combinations(free, k)):
+                staying = list(free)
+                for age in leaving:
+                    staying.remove(age)
+                for added in range(max(required[hour] - len(staying), 0), cap - len(staying) + 1):
+                    present = tuple(sorted(age + 1 for age in staying + [0] * added))
+                    cost = min(cost, paid(forced) + paid(leaving) + best(hour + 1, present))
+        return cost
+
+    return best(0, ())
+
+
+def paid_hours(shifts, series, min_paid_hours):
+    shifts = shifts[shifts[:, 0] == series]
+    return int((np.maximum(shifts[:, 2] - shifts[:, 1], min_paid_hours) * shifts[:, 3]).sum())
+
+
+def test_all_unit_demands_match_brute_force():
+    required = np.array(list(itertools.product([0, 1], repeat=10)))
+    open_hours = np.ones(required.shape, dtype=bool)
+    staffed, shifts = solve_shifts(required, open_hours, min_paid_hours=3, max_shift_hours=8)
+
+    assert (staffed >= required).all()
+    for series, row in enumerate(required):
+        assert paid_hours(shifts, series, 3) == brute_force_paid_hours(tuple(row), (True,) * 10, 3, 8)
+
+
+def test_isolated_peaks_share_one_shift():
+    required = np.array([[0, 1, 0, 0, 0, 0, 1, 0, 0, 1]])
+    _, shifts = solve_shifts(required, np.ones(required.shape, dtype=bool), min_paid_hours=3, max_shift_hours=8)
+    assert paid_hours(shifts, 0, 3) == 7
+
+
+@pytest.mark.parametrize('min_paid_hours, max_shift_hours', [(3, 8), (2, 4), (3, 3), (1, 2)])
+def test_random_demands_with_closures_match_brute_force(min_paid_hours, max_shift_hours):
+    rng = np.random.default_rng(0)
+    open_hours = rng.random((80, 9)) > 0.15
+    required = np.where(open_hours, rng.integers(0, 4, open_hours.shape), 0)
+    staffed, shifts = solve_shifts(required, open_hours, min_paid_hours, max_shift_hours)
+
+    assert (staffed >= required).all()
+    assert (staffed[~open_hours] == 0).all()
+    assert (shifts[:, 2] - shifts[:, 1] <= max_shift_hours).all()
+    for series, (row, mask) in enumerate(zip(required, open_hours)):
+        expected = brute_force_paid_hours(tuple(row), tuple(mask), min_paid_hours, max_shift_hours)
+        assert paid_hours(shifts, series, min_paid_hours) == expected